@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from lru import LRUCache
+
+# 그래프를 그리기 전에 x 값(또는 x 구간/기간)별로 묶어서 요약하는 단계
+# 행이 수천 개여도 막대/점은 묶음 개수만큼만 그린다.
+# 같은 데이터 + 같은 요약 설정이면 한 번 계산한 결과를 다시 쓴다.
+
+# 요약 방법: 이름 -> 화면에 보일 이름
+AGGREGATIONS = {
+    "mean": "평균",
+    "sum": "합계",
+    "count": "개수",
+    "median": "중앙값",
+    "min": "최솟값",
+    "max": "최댓값",
+    "p10": "10% 백분위",
+    "p25": "25% 백분위",
+    "p75": "75% 백분위",
+    "p90": "90% 백분위",
+}
+
+# 묶는 방법: None = 같은 x 값끼리, "bins" = 숫자 x 를 같은 폭의 구간으로, 나머지는 날짜 x 의 기간
+BUCKETS = {
+    None: "같은 x 값끼리",
+    "bins": "구간으로 나누기",
+    "H": "시간별",
+    "D": "일별",
+    "W": "주별",
+    "M": "월별",
+}
+TIME_BUCKETS = ("H", "D", "W", "M")
+
+DEFAULT_BINS = 20
+MAX_CACHED = 64
+
+
+def bucket_choices(x):
+    """x 열에 쓸 수 있는 묶는 방법 (BUCKETS 의 키). 기간은 날짜 x, 구간은 숫자 x 에만."""
+    if x.dtype.kind == "M":
+        return [None, *TIME_BUCKETS]
+    if pd.api.types.is_numeric_dtype(x.dtype) and not pd.api.types.is_bool_dtype(x.dtype):
+        return [None, "bins"]
+    return [None]
+
+
+def bucket_keys(x, bucket, bins):
+    """묶음 기준이 될 Series (이름은 원래 x 열 이름)"""
+    if bucket is None:
+        return x
+    if bucket not in bucket_choices(x):
+        # 숫자/글자 x 를 날짜로 바꾸면 전부 1970-01-01 이나 빈칸이 되어 빈 그래프가 나온다
+        raise ValueError(f"{x.dtype} x 열은 '{BUCKETS[bucket]}' 로 묶을 수 없습니다")
+    if bucket == "bins":
+        values = x.to_numpy(dtype="float64", na_value=np.nan)
+        if np.isnan(values).all():
+            return pd.Series(values, index=x.index, name=x.name)
+        lo, hi = np.nanmin(values), np.nanmax(values)
+        width = (hi - lo) / bins if hi > lo else 1.0
+        # 구간 번호 -> 구간 가운데 값 (맨 끝 값은 마지막 구간에 넣는다)
+        index = np.minimum(np.floor((values - lo) / width), bins - 1)
+        return pd.Series(lo + (index + 0.5) * width, index=x.index, name=x.name)
+    if bucket in ("H", "D"):
+        return x.dt.floor("h" if bucket == "H" else "D")
+    return x.dt.to_period(bucket).dt.start_time
+
+
+def _reduce(grouped, agg):
+    if agg.startswith("p"):
+        return grouped.quantile(int(agg[1:]) / 100)
+    return grouped.agg(agg)
+
+
+def summarize(df, x_col, y_cols, agg="mean", bucket=None, bins=DEFAULT_BINS):
+    """x 묶음별로 y_cols 를 요약한 DataFrame (열: x_col, *y_cols, x 순서대로)"""
+    if agg not in AGGREGATIONS:
+        raise ValueError(f"지원하지 않는 요약 방법: {agg}")
+    if bucket not in BUCKETS:
+        raise ValueError(f"지원하지 않는 묶음 방법: {bucket}")
+    y_cols = [col for col in y_cols if col != x_col]
+    frame = df[y_cols]
+    if agg != "count":
+        # 숫자가 아닌 열은 숫자로 바꿔 보고, 안 되는 칸은 빈칸으로
+        frame = frame.apply(lambda s: s if pd.api.types.is_numeric_dtype(s) else pd.to_numeric(s, errors="coerce"))
+    keys = bucket_keys(df[x_col], bucket, bins)
+    grouped = frame.groupby(keys.rename(x_col), observed=True, sort=True)
+    return _reduce(grouped, agg).reset_index()
+
+
+_results = LRUCache(MAX_CACHED)
+
+
+def aggregate(df, x_col, y_cols, agg="mean", bucket=None, bins=DEFAULT_BINS, data_key=None):
+    """summarize 와 같지만 data_key 를 주면 설정별로 결과를 캐시한다.
+
+    돌려받은 DataFrame 은 캐시와 공유되므로 고치지 말 것.
+    """
+    if data_key is None:
+        return summarize(df, x_col, y_cols, agg=agg, bucket=bucket, bins=bins)
+    key = (data_key, x_col, tuple(y_cols), agg, bucket, bins)
+    return _results.get_or_compute(key, lambda: summarize(df, x_col, y_cols, agg=agg, bucket=bucket, bins=bins))
+
+
+def clear_cache():
+    _results.clear()
+
+
+def aggregate_controls(x, key="agg"):
+    """Streamlit 페이지용: 요약 방법/묶는 방법/구간 수 선택 상자. (agg, bucket, bins) 를 돌려준다.
+
+    묶는 방법은 x 열에 맞는 것만 보여 준다 (bucket_choices).
+    """
+    import streamlit as st
+
+    agg = st.selectbox("▶ x 값별로 묶어서 요약", [None] + list(AGGREGATIONS), key=key,
+                       format_func=lambda a: "묶지 않음 (행 그대로)" if a is None else AGGREGATIONS[a])
+    bucket, bins = None, DEFAULT_BINS
+    choices = bucket_choices(x)
+    if agg and len(choices) > 1:
+        # x 종류마다 보기가 다르므로 key 도 따로 둔다
+        bucket = st.selectbox("▶ 묶는 방법", choices, format_func=BUCKETS.get, key=f"{key}_bucket_{choices[-1]}")
+        if bucket == "bins":
+            bins = st.slider("구간 수", 5, 100, DEFAULT_BINS, key=f"{key}_bins")
+    return agg, bucket, bins
@@ -0,0 +1,228 @@
+import argparse
+import io
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+import columnar_cache
+from chart_engine import ChartSpec, build_figure
+from correlation import numeric_columns
+
+# 그래프 여러 장을 한 번에 이미지로 내보내기
+# 차트 설정(ChartSpec) 목록을 받아서 Kaleido 프로세스 여러 개로 나눠 그리고,
+# 다 된 것부터 ZIP(png/svg) 이나 여러 쪽 PDF 에 바로 써 넣는다 (전부 메모리에 모아 두지 않는다).
+#
+# 사용법:
+#   python batch_export.py "교육부_학생건강검사 결과_20151201(예시파일).xlsx" --x 학년 --out charts.zip
+#   python batch_export.py data.xlsx --x 일시 --type line --out report.pdf -j 4
+
+FORMATS = ("png", "svg", "pdf")
+DEFAULT_SIZE = (1000, 600)
+# 페이지에서 만든 ZIP/PDF 는 세션 상태에 바이트로 들고 있지 않고 이 폴더의 파일로 둔다
+OUTPUT_DIR = Path(os.environ.get("GRAPH_BATCH_DIR", Path(tempfile.gettempdir()) / "graph-batch"))
+OUTPUT_MAX_AGE = 60 * 60   # 이보다 오래된 결과 파일은 새로 만들 때 지운다 (초)
+
+_worker_df = None
+_worker_warm = False
+
+
+def specs_per_column(df, x_col, chart_type="line", theme="pastel"):
+    """x_col 을 뺀 숫자 열마다 그래프 한 장씩"""
+    return [
+        ChartSpec(x_col=x_col, y_cols=(col,), chart_type=chart_type, title=str(col), theme=theme)
+        for col in numeric_columns(df) if col != x_col
+    ]
+
+
+def _init_worker(source):
+    # 작업 프로세스마다 데이터를 한 번만 읽는다 (Arrow 파일이면 memory-map)
+    global _worker_df
+    if isinstance(source, str):
+        _worker_df = columnar_cache.read_frame(source)
+    else:
+        _worker_df = pickle.loads(source)
+
+
+def _render(job):
+    global _worker_warm
+    index, spec, fmt, width, height = job
+    start = time.perf_counter()
+    fig = build_figure(_worker_df, spec, data_key="batch")
+    data = fig.to_image(format=fmt, width=width, height=height)
+    if not _worker_warm:
+        # 첫 장이 성공하면 이 프로세스의 Kaleido(1.x) 브라우저를 계속 띄워 둔다
+        _worker_warm = True
+        try:
+            import kaleido
+            start_server = getattr(kaleido, "start_sync_server", None)
+            if start_server is not None:
+                start_server(silence_warnings=True)
+        except Exception:
+            pass
+    return index, data, time.perf_counter() - start
+
+
+def _file_name(index, spec, fmt):
+    safe = "".join(ch if ch not in '\\/:*?"<>|' else "_" for ch in str(spec.title or spec.y_cols[0]))
+    return f"{index + 1:03d}_{safe}.{fmt}"
+
+
+def _data_source(df, tmp_dir):
+    # 작업 프로세스에 넘길 데이터: 가능하면 Arrow 파일 경로, 안 되면 pickle 바이트
+    # (Arrow 파일도 2016 같은 숫자 열 이름을 그대로 되돌려 준다)
+    path = os.path.join(tmp_dir, "data.arrow")
+    if columnar_cache.enabled() and columnar_cache.write_frame(df, path):
+        return path
+    return pickle.dumps(df)
+
+
+class _PdfWriter:
+    # PNG 를 한 쪽씩 PDF 에 덧붙인다 (Pillow 의 append 저장 사용)
+    def __init__(self, out):
+        self.out = out
+        self.pages = 0
+
+    def add(self, name, data):
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as im:
+            page = im.convert("RGB")
+        page.save(self.out, "PDF", resolution=100.0, append=self.pages > 0)
+        self.pages += 1
+
+    def close(self):
+        pass
+
+
+class _ZipWriter:
+    def __init__(self, out):
+        self.zf = zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, name, data):
+        self.zf.writestr(name, data)
+
+    def close(self):
+        self.zf.close()
+
+
+def export_charts(df, specs, out, fmt="png", workers=None, width=DEFAULT_SIZE[0],
+                  height=DEFAULT_SIZE[1], progress=None):
+    """specs 를 그려서 out 에 쓴다.
+
+    out 이 .pdf 로 끝나면 여러 쪽 PDF, 아니면 ZIP (fmt = png | svg | pdf 한 장씩).
+    out 은 파일 경로나 쓰기용 파일 객체. progress(done, total) 를 주면 한 장마다 불린다.
+    처리량/지연 시간 요약 dict 를 돌려준다.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    as_pdf = isinstance(out, (str, os.PathLike)) and str(out).lower().endswith(".pdf")
+    render_fmt = "png" if as_pdf else fmt
+    workers = workers or min(4, os.cpu_count() or 1)
+    total = len(specs)
+    latencies = []
+    started = time.perf_counter()
+
+    if as_pdf and os.path.exists(out):
+        os.remove(out)
+    writer = _PdfWriter(out) if as_pdf else _ZipWriter(out)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = _data_source(df, tmp_dir)
+        # Streamlit 서버 안에서도 안전하도록 fork 대신 spawn
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(source,)) as pool:
+            jobs = iter((i, spec, render_fmt, width, height) for i, spec in enumerate(specs))
+            running = set()
+            # 한 번에 작업 수의 두 배까지만 맡겨서 결과가 쌓이지 않게 한다
+            for job in jobs:
+                running.add(pool.submit(_render, job))
+                if len(running) >= workers * 2:
+                    break
+            try:
+                while running:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index, data, latency = future.result()
+                        writer.add(_file_name(index, specs[index], render_fmt), data)
+                        latencies.append(latency)
+                        if progress is not None:
+                            progress(len(latencies), total)
+                        job = next(jobs, None)
+                        if job is not None:
+                            running.add(pool.submit(_render, job))
+            finally:
+                writer.close()
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "images": total,
+        "seconds": elapsed,
+        "images_per_second": total / elapsed if elapsed > 0 else 0.0,
+        "latency_mean": sum(latencies) / total if total else 0.0,
+        "latency_p50": latencies[total // 2] if total else 0.0,
+        "latency_max": latencies[-1] if total else 0.0,
+    }
+
+
+def new_output(suffix):
+    """내려받기용 결과 파일 경로 하나 (오래된 결과 파일은 지운다)"""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    now = time.time()
+    for path in OUTPUT_DIR.iterdir():
+        try:
+            if now - path.stat().st_mtime > OUTPUT_MAX_AGE:
+                path.unlink()
+        except FileNotFoundError:   # 다른 세션이 먼저 지웠다
+            pass
+    fd, path = tempfile.mkstemp(dir=OUTPUT_DIR, suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def remove_output(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def format_report(report):
+    return (f"{report['images']}장, {report['seconds']:.1f}초 "
+            f"({report['images_per_second']:.2f}장/초, 한 장 평균 {report['latency_mean'] * 1000:.0f} ms, "
+            f"중앙값 {report['latency_p50'] * 1000:.0f} ms, 최대 {report['latency_max'] * 1000:.0f} ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="열마다 그래프를 그려서 한 번에 저장")
+    parser.add_argument("workbook", help="엑셀(.xlsx) 또는 CSV 파일")
+    parser.add_argument("--x", required=True, help="x축 열 이름")
+    parser.add_argument("--type", default="line", choices=["line", "scatter", "bar"])
+    parser.add_argument("--format", default="png", choices=FORMATS, help="ZIP 안의 이미지 형식")
+    parser.add_argument("--out", default="charts.zip", help=".zip 또는 .pdf")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.workbook.lower().endswith(".csv"):
+        df = pd.read_csv(args.workbook)
+    else:
+        df = pd.read_excel(args.workbook)
+    specs = specs_per_column(df, args.x, args.type)
+
+    def progress(done, total):
+        print(f"\r{done}/{total}", end="", flush=True)
+
+    report = export_charts(df, specs, args.out, fmt=args.format, workers=args.workers, progress=progress)
+    print()
+    print(f"{args.out}: {format_report(report)}")
+
+
+if __name__ == "__main__":
+    main()
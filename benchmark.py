@@ -0,0 +1,335 @@
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+import aggregate
+import chart_engine
+import figure_codec
+import resample
+from chart_engine import ChartSpec, build_figure
+from correlation import correlation_matrix, numeric_columns
+from csv_ingest import read_csv
+from frame_compact import compact
+from samples import SAMPLES
+from stats_service import regress
+
+# 브라우저 없이 돌리는 성능 측정: 파일 읽기 / 타입 줄이기 / 그래프 만들기 / 보내는 크기 / 회귀·상관 / PNG 내보내기
+# 같은 seed 로 만든 가짜 데이터(1천~1천만 행)와 저장소의 예시 엑셀 두 개로 잰다.
+# 결과는 JSON 으로 남기고, 예전 결과(baseline)와 비교해서 느려진 단계를 알려 준다.
+#
+# 사용법:
+#   python benchmark.py run --out result.json
+#   python benchmark.py run --sizes 1k,10k,100k,1M,10M --repeat 5
+#   python benchmark.py run --baseline baseline.json --threshold 0.2   # 느려지면 종료 코드 1
+#   python benchmark.py compare result.json baseline.json
+
+ROOT = Path(__file__).resolve().parent
+BENCH_DIR = Path(os.environ.get("GRAPH_BENCH_DIR", ROOT / ".cache" / "bench"))
+
+DEFAULT_SIZES = "1k,10k,100k,1M"
+STAGES = ("load", "dtypes", "figure", "payload", "stats", "export")
+# 엑셀은 104만 행이 한계이고 만드는 데도 오래 걸려서 가짜 엑셀은 이 크기까지만
+XLSX_MAX_ROWS = 100_000
+# 이보다 짧은 시간 차이는 잡음으로 보고 느려졌다고 하지 않는다
+MIN_SECONDS = 0.002
+DEFAULT_THRESHOLD = 0.2
+
+REGIONS = ("서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기",
+           "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주")
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000"""
+    text = text.strip()
+    scale = {"k": 1_000, "K": 1_000, "m": 1_000_000, "M": 1_000_000}.get(text[-1])
+    return int(float(text[:-1]) * scale) if scale else int(text)
+
+
+def synthetic_frame(rows, seed=0):
+    """학생건강검사와 비슷한 모양의 가짜 데이터 (seed 가 같으면 항상 같은 값)"""
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(rows)
+    days = pd.date_range("2015-03-02", periods=rows // 1440 + 1, freq="D")
+    day_labels = np.array([f"{d.year}년 {d.month}월 {d.day}일" for d in days])
+    height = np.round(rng.normal(150, 15, rows), 1)
+    return pd.DataFrame({
+        "측정일시": np.datetime64("2015-03-02T00:00") + minutes.astype("timedelta64[m]"),
+        "측정일": day_labels[minutes // 1440],
+        "지역": np.array(REGIONS)[rng.integers(0, len(REGIONS), rows)],
+        "성별": np.array(("남", "여"))[rng.integers(0, 2, rows)],
+        "학년": rng.integers(1, 7, rows),
+        "키(cm)": height,
+        "몸무게(kg)": np.round(45 + 0.8 * (height - 150) + rng.normal(0, 6, rows), 1),
+    })
+
+
+def _cached_file(name, make):
+    """BENCH_DIR 에 만들어 둔 파일 바이트 (없으면 make() 로 만들어 저장)"""
+    path = BENCH_DIR / name
+    if path.exists():
+        return path.read_bytes()
+    data = make()
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return data
+
+
+def synthetic_csv(rows, seed=0):
+    return _cached_file(f"synthetic-{rows}-{seed}.csv",
+                        lambda: synthetic_frame(rows, seed).to_csv(index=False).encode("utf-8"))
+
+
+def synthetic_xlsx(rows, seed=0):
+    def make():
+        buffer = io.BytesIO()
+        synthetic_frame(rows, seed).to_excel(buffer, index=False)
+        return buffer.getvalue()
+
+    return _cached_file(f"synthetic-{rows}-{seed}.xlsx", make)
+
+
+def measure(func, repeat, setup=None):
+    """func 를 repeat 번 돌린 시간 (setup 은 매번 재기 전에 부른다). 마지막 결과도 같이 돌려준다."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "runs": len(times)}, result
+
+
+def _clear_chart_caches():
+    chart_engine.clear_cache()
+    aggregate.clear_cache()
+    resample.clear_cache()
+
+
+def _chart_specs(df):
+    """데이터 모양에 맞춰 (그래프 종류, ChartSpec) 을 고른다"""
+    numeric = numeric_columns(df)
+    times = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    labels = [col for col in df.columns if col not in numeric and col not in times]
+    specs = []
+    if numeric:
+        x_line = times[0] if times else numeric[0]
+        specs.append(("line", ChartSpec(x_line, tuple(c for c in numeric if c != x_line)[:2], "line")))
+    if len(numeric) >= 2:
+        specs.append(("scatter", ChartSpec(numeric[-2], (numeric[-1],), "scatter",
+                                           regression=True, correlation=True)))
+    if numeric and labels:
+        specs.append(("bar", ChartSpec(labels[0], (numeric[-1],), "bar", agg="mean")))
+    return specs
+
+
+def bench_dataset(name, raw, kind, stages, repeat):
+    """한 데이터셋의 단계별 시간 목록. raw 는 파일 바이트, kind 는 'csv' | 'xlsx'."""
+    results = []
+
+    def record(stage, timing, **extra):
+        results.append({"dataset": name, "stage": stage, **timing, **extra})
+        print(f"  {stage:<18} {timing['min'] * 1000:10,.1f}ms", file=sys.stderr)
+
+    if kind == "csv":
+        load = lambda: read_csv(raw, compact_dtypes=False)
+    else:
+        load = lambda: pd.read_excel(io.BytesIO(raw))
+    timing, df = measure(load, repeat if "load" in stages else 1)
+    if "load" in stages:
+        record(f"load.{kind}", timing, rows=len(df), bytes=len(raw))
+
+    timing, compacted = measure(lambda: compact(df), repeat if "dtypes" in stages else 1)
+    if "dtypes" in stages:
+        record("dtypes", timing, bytes_before=int(df.memory_usage(deep=True).sum()),
+               bytes_after=int(compacted.memory_usage(deep=True).sum()))
+    df = compacted
+
+    specs = _chart_specs(df)
+    if "figure" in stages:
+        for chart_type, spec in specs:
+            timing, _ = measure(lambda: build_figure(df, spec, data_key=name), repeat, setup=_clear_chart_caches)
+            record(f"figure.{chart_type}", timing, traces=len(spec.y_cols))
+
+    if "payload" in stages:
+        for chart_type, spec in specs:
+            # 인코딩하지 않은 그래프(숫자/날짜/글자를 JSON 목록으로)와 figure_codec 으로 인코딩한 그래프 비교
+            _clear_chart_caches()
+            figure_codec.ENABLED = False
+            try:
+                plain = build_figure(df, spec, data_key=name)
+            finally:
+                figure_codec.ENABLED = True
+            _clear_chart_caches()
+            fig = build_figure(df, spec, data_key=name)
+            report = figure_codec.payload_report(fig, plain=plain)
+            timing, _ = measure(lambda: pio.to_json(fig, validate=False), repeat)
+            record(f"payload.{chart_type}", timing,
+                   bytes_before=report["plain_bytes"], bytes_after=report["bytes"],
+                   deflate_before=report["plain_deflate_bytes"], deflate_after=report["deflate_bytes"],
+                   seconds_before=report["plain_seconds"])
+            print(f"  {'':<18} {figure_codec.format_payload_report(report)}", file=sys.stderr)
+
+    numeric = numeric_columns(df)
+    if "stats" in stages and len(numeric) >= 2:
+        timing, _ = measure(lambda: regress(df, numeric[0], numeric[1:]), repeat)
+        record("stats.regression", timing, columns=len(numeric))
+        timing, _ = measure(lambda: correlation_matrix(df, numeric), repeat)
+        record("stats.correlation", timing, columns=len(numeric))
+
+    if "export" in stages and specs:
+        import export
+
+        _, spec = specs[0]
+        # 제목을 바꿔 가며 그려야 export 의 이미지 캐시에 걸리지 않는다
+        titles = iter(range(repeat + 1))
+        _clear_chart_caches()
+        try:
+            export.to_image(build_figure(df, spec, data_key=name))   # Kaleido 를 띄우는 시간은 빼고 잰다
+            timing, _ = measure(
+                lambda: export.to_image(build_figure(df, replace(spec, title=f"bench {next(titles)}"), data_key=name)),
+                repeat,
+            )
+        except Exception as e:
+            results.append({"dataset": name, "stage": "export.png", "skipped": str(e).strip().splitlines()[0]})
+            print(f"  {'export.png':<18} 건너뜀: {results[-1]['skipped']}", file=sys.stderr)
+        else:
+            record("export.png", timing)
+    return results
+
+
+def _datasets(sizes, bundled):
+    """(이름, 파일 바이트, 종류) 를 하나씩 만든다 (큰 데이터를 한꺼번에 메모리에 올리지 않도록)"""
+    for rows in sizes:
+        yield f"synthetic-{rows}.csv", lambda rows=rows: synthetic_csv(rows), "csv"
+        if rows <= XLSX_MAX_ROWS:
+            yield f"synthetic-{rows}.xlsx", lambda rows=rows: synthetic_xlsx(rows), "xlsx"
+    if bundled:
+        for file_name in SAMPLES.values():
+            path = ROOT / file_name
+            if path.exists():
+                yield file_name, path.read_bytes, "xlsx"
+
+
+def _versions():
+    versions = {"python": platform.python_version()}
+    for package in ("numpy", "pandas", "plotly", "pyarrow", "kaleido", "streamlit"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def run(sizes, repeat=3, stages=STAGES, bundled=True):
+    results = []
+    for name, read, kind in _datasets(sizes, bundled):
+        print(f"{name}", file=sys.stderr)
+        results.extend(bench_dataset(name, read(), kind, stages, repeat))
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "machine": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": repeat,
+            "versions": _versions(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, min_seconds=MIN_SECONDS):
+    """(데이터셋, 단계) 별 최솟값 비교 목록과 느려진 항목 목록"""
+    before = {(r["dataset"], r["stage"]): r for r in baseline["results"] if "min" in r}
+    rows, regressions = [], []
+    for r in current["results"]:
+        old = before.get((r["dataset"], r["stage"]))
+        if old is None or "min" not in r:
+            continue
+        ratio = r["min"] / old["min"] if old["min"] > 0 else float("inf")
+        slower = ratio > 1 + threshold and r["min"] - old["min"] > min_seconds
+        row = {"dataset": r["dataset"], "stage": r["stage"], "before": old["min"], "after": r["min"],
+               "ratio": ratio, "regression": slower}
+        rows.append(row)
+        if slower:
+            regressions.append(row)
+    return rows, regressions
+
+
+def format_comparison(rows, threshold=DEFAULT_THRESHOLD):
+    lines = [f"{'데이터셋':<40} {'단계':<18} {'이전':>10} {'지금':>10} {'비율':>7}"]
+    for row in rows:
+        mark = "  ⚠️ 느려짐" if row["regression"] else ""
+        lines.append(f"{row['dataset']:<40} {row['stage']:<18} {row['before'] * 1000:8,.1f}ms "
+                     f"{row['after'] * 1000:8,.1f}ms {row['ratio']:6.2f}x{mark}")
+    slower = sum(row["regression"] for row in rows)
+    lines.append(f"\n{len(rows)}개 비교, {slower}개가 {threshold:.0%} 넘게 느려졌습니다." if slower
+                 else f"\n{len(rows)}개 비교, 느려진 단계 없음 (기준 {threshold:.0%}).")
+    return "\n".join(lines)
+
+
+def _load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="파일 읽기/그래프/통계/내보내기 성능 측정")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = sub.add_parser("run", help="측정하기")
+    run_cmd.add_argument("--sizes", default=DEFAULT_SIZES, help=f"가짜 데이터 행 수 (기본: {DEFAULT_SIZES})")
+    run_cmd.add_argument("--repeat", type=int, default=3, help="단계마다 반복 횟수 (가장 빠른 값으로 비교)")
+    run_cmd.add_argument("--stages", default=",".join(STAGES), help="잴 단계 (쉼표로 구분)")
+    run_cmd.add_argument("--no-bundled", action="store_true", help="예시 엑셀 파일은 빼기")
+    run_cmd.add_argument("--out", help="결과 JSON 파일 (없으면 화면에)")
+    run_cmd.add_argument("--baseline", help="비교할 예전 결과 JSON")
+    run_cmd.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="느려졌다고 볼 비율 (0.2 = 20%%)")
+
+    compare_cmd = sub.add_parser("compare", help="두 결과 JSON 비교하기")
+    compare_cmd.add_argument("current")
+    compare_cmd.add_argument("baseline")
+    compare_cmd.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        stages = tuple(stage for stage in args.stages.split(",") if stage)
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            parser.error(f"모르는 단계: {', '.join(sorted(unknown))}")
+        sizes = [parse_size(size) for size in args.sizes.split(",") if size]
+        current = run(sizes, repeat=args.repeat, stages=stages, bundled=not args.no_bundled)
+        text = json.dumps(current, ensure_ascii=False, indent=2)
+        if args.out:
+            Path(args.out).write_text(text, encoding="utf-8")
+        else:
+            print(text)
+        if not args.baseline:
+            return 0
+        baseline = _load_json(args.baseline)
+    else:
+        current, baseline = _load_json(args.current), _load_json(args.baseline)
+
+    rows, regressions = compare(current, baseline, threshold=args.threshold)
+    print(format_comparison(rows, threshold=args.threshold), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+import hashlib
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from aggregate import AGGREGATIONS, DEFAULT_BINS, aggregate
+from downsample import downsample_many
+from figure_codec import XEncoder, encode_values
+from instrument import stage
+from lru import LRUCache
+from resample import WINDOWS, band_columns, choose_window, clip, is_datetime, resample
+from stats_service import DATETIME_UNIT, regress
+
+# 모든 페이지가 같이 쓰는 그래프 생성 엔진 (Streamlit 없이도 쓸 수 있다)
+# 페이지는 위젯으로 ChartSpec 을 만들고 build_figure 만 부르면 된다.
+# 같은 데이터 + 같은 설정이면 이전에 만든 Figure 를 그대로 돌려준다.
+
+PASTEL_COLORS = (
+    "#A0D8B3", "#AED9E0", "#FFB5E8", "#FFDAC1", "#CBAACB", "#F6DFEB",
+    "#C7CEEA", "#E0BBE4", "#B5EAD7", "#FFABAB",
+)
+
+# 페이지의 라디오 버튼 문구 -> 그래프 종류
+CHART_TYPES = {
+    "꺾은선 그래프": "line",
+    "산점도": "scatter",
+    "막대그래프": "bar",
+    "막대 그래프": "bar",
+}
+
+MAX_CACHED_FIGURES = 64
+
+# 점이 이만큼보다 많으면 WebGL(Scattergl)로 그린다
+WEBGL_THRESHOLD = 5000
+# 꺾은선 그래프는 대략 그래프 가로 픽셀 수만큼만 점을 남긴다
+LINE_POINT_BUDGET = 2000
+# 오른쪽 y축이 3개 이상일 때 축 사이 간격 (그래프 너비 비율)
+AXIS_GAP = 0.08
+
+_UNIT_PATTERN = re.compile(r"\((.*?)\)")
+
+
+def extract_unit(col_name):
+    """열 이름의 괄호 안 단위를 꺼낸다. 예: '키(cm)' -> 'cm'"""
+    match = _UNIT_PATTERN.search(str(col_name))
+    return match.group(1) if match else ""
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """그래프 한 장의 설정. 값이 같으면 같은 그래프다."""
+
+    x_col: str
+    y_cols: tuple
+    chart_type: str = "line"      # "line" | "scatter" | "bar"
+    dual_y: bool = False          # 단위가 다른 열을 다른 y축에 (axis_groups)
+    regression: bool = False      # 첫 번째 열의 회귀선 (산점도만)
+    correlation: bool = False     # 첫 번째 열의 상관계수 표시 (산점도만)
+    title: str = ""
+    theme: str = "pastel"         # "pastel" | "basic"
+    colors: tuple = None          # None 이면 테마 기본 색
+    webgl_threshold: int = WEBGL_THRESHOLD
+    max_points: int = LINE_POINT_BUDGET   # 꺾은선 다운샘플링 목표 (0 이면 안 함)
+    agg: str = None               # None 이면 행을 그대로, 아니면 aggregate.AGGREGATIONS 중 하나로 요약
+    bucket: str = None            # 요약할 때 x 를 묶는 방법 (aggregate.BUCKETS)
+    bins: int = DEFAULT_BINS      # bucket="bins" 일 때 구간 수
+    resample: str = None          # 날짜 x 축: None(원래 행) | "auto" | resample.WINDOWS 중 하나. 쓰면 agg 는 무시
+    x_range: tuple = None         # 날짜 x 축에서 보여줄 (시작, 끝)
+
+    @property
+    def columns(self):
+        return (self.x_col,) + tuple(c for c in self.y_cols if c != self.x_col)
+
+
+def frame_digest(df, columns=None):
+    """DataFrame 내용의 해시 (data_key 를 따로 주지 않을 때 사용)"""
+    part = df if columns is None else df[list(columns)]
+    hashed = pd.util.hash_pandas_object(part, index=False).to_numpy()
+    h = hashlib.sha256(hashed.tobytes())
+    h.update(repr(list(part.columns)).encode("utf-8"))
+    return h.hexdigest()
+
+
+_figures = LRUCache(MAX_CACHED_FIGURES)
+
+
+def build_figure(df, spec, data_key=None):
+    """spec 대로 Figure 를 만든다.
+
+    data_key 는 df 내용을 나타내는 값(예: 업로드 파일 해시)으로, 주지 않으면 df 를 해시한다.
+    돌려받은 Figure 는 캐시에 있는 것과 같은 객체이므로 고치지 말 것.
+    """
+    key = (data_key if data_key is not None else frame_digest(df, spec.columns), spec)
+    return _figures.get_or_compute(key, lambda: _build(df, spec, key[0]))
+
+
+def clear_cache():
+    _figures.clear()
+
+
+def _palette(spec):
+    if spec.colors:
+        return spec.colors
+    return PASTEL_COLORS if spec.theme == "pastel" else None
+
+
+def axis_groups(y_cols, dual_y):
+    """y 열마다 몇 번째 y축에 그릴지 (0 = 왼쪽 축).
+
+    dual_y 면 단위(괄호 안)가 같은 열끼리 한 축을 쓴다.
+    단위가 모두 같거나 없으면 단위로 나눌 수 없으므로 열마다 축을 따로 쓴다.
+    """
+    if not dual_y:
+        return [0] * len(y_cols)
+    units = {}
+    groups = [units.setdefault(extract_unit(col), len(units)) for col in y_cols]
+    if len(units) == 1:
+        return list(range(len(y_cols)))
+    return groups
+
+
+def _axis_name(k):
+    return "y" if k == 0 else f"y{k + 1}"
+
+
+def _series(x, y, spec, col):
+    """trace 에 넣을 (x, y, 이름). 점 개수는 다운샘플링한 trace 에만 적는다 (_line_series)."""
+    if spec.agg:
+        col = f"{col} ({AGGREGATIONS[spec.agg]})"
+    return x, y, col
+
+
+def _line_series(x, df, spec):
+    """꺾은선: 긴 열은 LTTB 로 한꺼번에 줄이고 범례에 줄어든 점 개수를 적는다."""
+    if not (spec.max_points and len(df) > spec.max_points):
+        return [_series(x, encode_values(df[col]), spec, col) for col in spec.y_cols]
+    series = []
+    reduced = downsample_many(x, [df[col] for col in spec.y_cols], spec.max_points)
+    for col, (x_kept, y, n) in zip(spec.y_cols, reduced):
+        name = f"{col} ({AGGREGATIONS[spec.agg]})" if spec.agg else col
+        series.append((x_kept, y, f"{name} ({n:,}→{len(y):,}점)" if len(y) < n else name))
+    return series
+
+
+def _trace(spec, i, col, color, axis, series, n_rows):
+    hovertemplate = f"{col}: %{{y}} {extract_unit(col)}<extra></extra>"
+    x, y, name = series
+    if spec.chart_type == "bar":
+        return go.Bar(
+            x=x,
+            y=y,
+            name=name,
+            marker_color=color,
+            yaxis=axis,
+            offsetgroup=str(i),
+            hovertemplate=hovertemplate,
+        )
+    scatter = spec.chart_type == "scatter"
+    # 원래 점 개수 기준으로 WebGL 을 쓸지 정한다 (다운샘플링해도 무거운 경우가 있으므로)
+    trace_cls = go.Scattergl if n_rows > spec.webgl_threshold else go.Scatter
+    if spec.theme == "basic":
+        return trace_cls(
+            x=x,
+            y=y,
+            mode="markers" if scatter else "lines+markers",
+            name=name,
+            marker=dict(color=color, size=8),
+            line=dict(color=color, width=3) if color else None,
+            yaxis=axis,
+            hovertemplate=hovertemplate,
+        )
+    return trace_cls(
+        x=x,
+        y=y,
+        mode="markers" if scatter else "lines+markers",
+        name=name,
+        marker=dict(color=color, size=8, opacity=0.6 if scatter else 1),
+        line=dict(color=color, width=2),
+        yaxis=axis,
+        hovertemplate=hovertemplate,
+    )
+
+
+def _resample_window(df, spec):
+    if spec.resample != "auto":
+        return spec.resample
+    # 보이는 기간을 채울 수 있는 가장 굵은 간격
+    start, end = spec.x_range if spec.x_range is not None else (df[spec.x_col].min(), df[spec.x_col].max())
+    if pd.isna(start) or pd.isna(end):
+        return None
+    return choose_window(start, end)
+
+
+def _band(x, df, i, col, color, axis):
+    """간격별 최솟값~최댓값을 옅은 띠로 (최댓값 선 + 최솟값까지 채우기)"""
+    low, high = band_columns(col)
+    fill = _rgba(color, 0.2) if color else "rgba(128, 128, 128, 0.2)"
+    common = dict(x=x, mode="lines", line=dict(width=0), yaxis=axis,
+                  legendgroup=f"band{i}", hoverinfo="skip")
+    return [
+        go.Scatter(y=df[high].to_numpy(), showlegend=False, **common),
+        go.Scatter(y=df[low].to_numpy(), fill="tonexty", fillcolor=fill, name=f"{col} 최솟값~최댓값", **common),
+    ]
+
+
+def _rgba(color, alpha):
+    color = color.lstrip("#")
+    if len(color) != 6:
+        return f"rgba(128, 128, 128, {alpha})"
+    r, g, b = (int(color[k:k + 2], 16) for k in (0, 2, 4))
+    return f"rgba({r}, {g}, {b}, {alpha})"
+
+
+def _regression(df, spec, fig, data_key, encode_x):
+    col = spec.y_cols[0]
+    # x, y 가 둘 다 있는 행만 같이 쓴다 (stats_service 에서 캐시)
+    fit = regress(df, spec.x_col, [col], data_key=data_key).loc[col]
+    if np.isnan(fit["slope"]):
+        return
+    slope, intercept, r_value = fit["slope"], fit["intercept"], fit["r"]
+    x_dtype = df[spec.x_col].dtype
+    if spec.regression and (x_dtype.kind == "M" or pd.api.types.is_numeric_dtype(x_dtype)):
+        x_line = np.array([fit["x_min"], fit["x_max"]])
+        y_line = slope * x_line + intercept
+        if x_dtype.kind == "M":
+            # 날짜 x 는 DATETIME_UNIT 의 정수로 회귀했으므로 다시 날짜로 바꿔 데이터 trace 와 같이 인코딩한다
+            x_line = np.round(x_line).astype("int64").astype(f"datetime64[{DATETIME_UNIT}]")
+        fig.add_trace(go.Scatter(
+            x=encode_x(x_line),
+            y=y_line,
+            mode="lines",
+            name=f"회귀선 ({col})",
+            line=dict(color="#003366", dash="dot"),
+            hoverinfo="skip",
+        ))
+    if spec.correlation:
+        fig.add_annotation(
+            xref="paper", yref="paper",
+            x=0.98, y=0.98,
+            text=f"<b>상관계수 r = {r_value:.2f}</b>",
+            showarrow=False,
+            font=dict(size=14, color="black"),
+            bgcolor="rgba(255, 243, 211, 0.3)",
+            bordercolor="#666",
+            borderwidth=1,
+            borderpad=6,
+        )
+
+
+def _axis_title(cols):
+    if len(cols) == 1:
+        return cols[0]
+    units = {extract_unit(col) for col in cols}
+    if len(units) == 1 and "" not in units:
+        return units.pop()
+    return ", ".join(cols) if len(cols) == 2 else f"{cols[0]} 외 {len(cols) - 1}개"
+
+
+def _y_axes(spec, axes, **extra):
+    """layout 의 yaxis, yaxis2, ... 설정. 세 번째 축부터는 그래프 오른쪽 바깥에 차례로 붙인다."""
+    n_axes = max(axes) + 1
+    gap = min(AXIS_GAP, 0.4 / (n_axes - 2)) if n_axes > 2 else 0
+    right = 1 - gap * max(n_axes - 2, 0)
+    result = {}
+    for k in range(n_axes):
+        title = _axis_title([col for col, axis in zip(spec.y_cols, axes) if axis == k])
+        if k == 0:
+            result["yaxis"] = {"title": title}
+            continue
+        axis = {"title": title, "overlaying": "y", "side": "right", **extra}
+        if k > 1:
+            axis.update(anchor="free", position=right + gap * (k - 1))
+        result[f"yaxis{k + 1}"] = axis
+    if n_axes > 2:
+        result["xaxis"] = {"domain": [0, right]}
+    return result
+
+
+def _layout(spec, axes):
+    if spec.theme == "basic":
+        layout = {
+            "title": {
+                "text": f"<b>{spec.title}</b>",
+                "x": 0.5,
+                "xanchor": "center",
+                "font": {"size": 20, "family": "Nanum Gothic, sans-serif"},
+            },
+            "font": {"family": "Nanum Gothic, sans-serif", "size": 14},
+            "legend": {"x": 0, "y": 1.15, "orientation": "h"},
+            "margin": {"t": 100, "b": 50, "l": 60, "r": 60},
+        }
+        layout.update(_y_axes(spec, axes))
+        layout["xaxis"] = {"title": spec.x_col, **layout.get("xaxis", {})}
+        return layout
+
+    layout = dict(
+        title=dict(text=spec.title, x=0.5, xanchor="center", y=0.95, font=dict(size=24)),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5),
+        height=500,
+        width=900,
+        margin=dict(t=80, b=100),
+    )
+    layout.update(_y_axes(spec, axes, showgrid=False))
+    layout["xaxis"] = dict(title=spec.x_col, **layout.get("xaxis", {}))
+    return layout
+
+
+def _build(df, spec, data_key):
+    palette = _palette(spec)
+    # 요약을 켜면 묶음별 요약값만 그린다 (회귀/상관은 원래 행으로 계산)
+    plot_df = df
+    window = None
+    x_is_time = is_datetime(df[spec.x_col])
+    if spec.resample and x_is_time:
+        window = _resample_window(df, spec)
+        if window is not None:
+            plot_df = resample(df, spec.x_col, spec.y_cols, window, data_key=data_key)
+    elif spec.agg:
+        plot_df = aggregate(df, spec.x_col, spec.y_cols, agg=spec.agg, bucket=spec.bucket,
+                            bins=spec.bins, data_key=data_key)
+    if spec.x_range is not None and x_is_time:
+        # 보여줄 기간은 간격별 평균이든 원래 행이든 똑같이 자른다
+        plot_df = clip(plot_df, spec.x_col, spec.x_range)
+
+    with stage("traces"):
+        # x 는 한 번만 numpy 배열로 바꿔 모든 trace 가 같이 쓴다 (열마다 Series 를 복사하지 않는다)
+        x = plot_df[spec.x_col].to_numpy()
+        axes = axis_groups(spec.y_cols, spec.dual_y)
+        if spec.chart_type == "line":
+            series = _line_series(x, plot_df, spec)
+        else:
+            series = [_series(x, encode_values(plot_df[col]), spec, col) for col in spec.y_cols]
+        # 날짜 x 는 epoch 밀리초, 반복되는 범주 x 는 정수 코드로 보낸다 (figure_codec)
+        encode_x = XEncoder(x)
+        series = [(encode_x(xs), ys, name) for xs, ys, name in series]
+
+        traces = []
+        for i, col in enumerate(spec.y_cols):
+            color = palette[i % len(palette)] if palette else None
+            axis = _axis_name(axes[i])
+            if window is not None and spec.chart_type == "line":
+                traces.extend(_band(encode_x(x), plot_df, i, col, color, axis))
+            trace = _trace(spec, i, col, color, axis, series[i], len(plot_df))
+            if window is not None:
+                trace.name = f"{col} ({WINDOWS[window][0]} 평균)"
+            traces.append(trace)
+
+    with stage("layout"):
+        # trace 를 다 만든 다음 Figure 를 한 번에 만든다 (add_trace 를 여러 번 부르지 않는다)
+        layout = _layout(spec, axes)
+        if encode_x.axis:
+            layout["xaxis"] = {**layout.get("xaxis", {}), **encode_x.axis}
+        fig = go.Figure(data=traces, layout=layout)
+
+    if spec.chart_type == "scatter" and (spec.regression or spec.correlation):
+        _regression(df, spec, fig, data_key, encode_x)
+    return fig
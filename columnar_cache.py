@@ -0,0 +1,202 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# 한 번 파싱한 엑셀/CSV 를 Arrow(Feather v2) 파일로 저장해 두는 디스크 캐시
+# 같은 파일을 다시 올리거나 서버를 재시작해도 XML 파싱 없이 memory-map 으로 바로 연다.
+# 파일 하나를 여러 세션(프로세스)이 같이 읽는다.
+#
+# 사용법:
+#   python columnar_cache.py stats
+#   python columnar_cache.py prune --max-mb 500
+#   python columnar_cache.py clear
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow 가 없으면 디스크 캐시 없이 동작
+    pa = None
+    feather = None
+
+CACHE_DIR = Path(os.environ.get("GRAPH_COLUMNAR_DIR", Path(__file__).resolve().parent / ".cache" / "columnar"))
+MAX_MB = int(os.environ.get("GRAPH_COLUMNAR_MB", "2048"))
+SUFFIX = ".arrow"
+# Arrow 열 이름은 글자뿐이라 2016 같은 숫자 머리행은 원래 이름을 메타데이터에 따로 적어 둔다
+LABELS_KEY = b"graph_columns"
+# 바꿀 수 없는 데이터, 잘렸거나 다른 버전이 쓴 파일
+ARROW_ERRORS = (
+    (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OSError, ValueError, TypeError)
+    if pa is not None else (OSError, ValueError, TypeError)
+)
+
+
+def enabled():
+    return feather is not None
+
+
+def _path(digest, opts_key):
+    opts_hash = hashlib.sha256(opts_key.encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / f"{digest}-{opts_hash}{SUFFIX}"
+
+
+def _labels_json(columns):
+    labels = [col.item() if hasattr(col, "item") else col for col in columns]
+    # 날짜/튜플(여러 줄 머리행) 같은 이름은 JSON 으로 그대로 되돌릴 수 없으므로 캐시하지 않는다
+    if not all(label is None or isinstance(label, (str, int, float)) for label in labels):
+        raise TypeError("열 이름을 저장할 수 없습니다")
+    return json.dumps(labels, ensure_ascii=False)
+
+
+def write_frame(df, path):
+    """df 를 path 에 압축 없는 Feather 파일로 쓴다. Arrow 로 바꿀 수 없는 데이터면 False"""
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), LABELS_KEY: _labels_json(df.columns).encode("utf-8")})
+    except ARROW_ERRORS:
+        return False
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 다른 세션이 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 이름을 바꾼다
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        # memory-map 으로 바로 쓸 수 있게 압축하지 않는다
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+    return True
+
+
+def read_frame(path, columns=None):
+    """write_frame 으로 쓴 파일을 memory-map 으로 읽는다. columns 는 원래 열 이름 (없는 열이면 KeyError).
+
+    파일이 잘렸거나 읽을 수 없으면 ARROW_ERRORS 중 하나가 난다.
+    """
+    table = feather.read_table(path, memory_map=True)
+    metadata = table.schema.metadata or {}
+    labels = json.loads(metadata[LABELS_KEY]) if LABELS_KEY in metadata else table.column_names
+    if len(labels) != table.num_columns:
+        raise ValueError(f"열 이름 수가 맞지 않습니다: {path}")
+    if columns is not None:
+        positions = []
+        for col in columns:
+            if col not in labels:
+                raise KeyError(col)
+            positions.append(labels.index(col))
+        table = table.select(positions)
+        labels = [labels[i] for i in positions]
+    df = table.to_pandas(split_blocks=True)
+    df.columns = labels
+    return df
+
+
+def load(digest, opts_key, columns=None):
+    """캐시된 파일이 있으면 memory-map 으로 읽어서 DataFrame으로, 없으면 None
+
+    잘렸거나 읽을 수 없는 파일은 지우고 None (불러 쓰는 쪽은 엑셀을 다시 읽고 새로 저장한다).
+    """
+    if not enabled():
+        return None
+    path = _path(digest, opts_key)
+    try:
+        df = read_frame(path, columns)
+    except FileNotFoundError:
+        return None
+    except (KeyError, *ARROW_ERRORS):
+        # 찾는 열이 없는 것도 열 이름을 적어 두기 전의 파일이면 생길 수 있으므로 같이 다시 만든다
+        _remove(path)
+        return None
+    try:
+        os.utime(path)  # 최근 사용 시각 (정리할 때 오래된 것부터 지움)
+    except OSError:
+        pass
+    return df
+
+
+def _remove(path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def store(digest, opts_key, df):
+    """DataFrame을 캐시에 저장. Arrow 로 바꿀 수 없는 데이터면 조용히 건너뛴다."""
+    if not enabled():
+        return False
+    path = _path(digest, opts_key)
+    if path.exists():
+        return True
+    if not write_frame(df, path):
+        return False
+    prune(MAX_MB * 1024 * 1024)
+    return True
+
+
+def _entries():
+    if not CACHE_DIR.exists():
+        return []
+    entries = []
+    for path in CACHE_DIR.glob(f"*{SUFFIX}"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    return sorted(entries)
+
+
+def stats():
+    entries = _entries()
+    return {
+        "dir": str(CACHE_DIR),
+        "files": len(entries),
+        "bytes": sum(size for _, size, _ in entries),
+        "max_bytes": MAX_MB * 1024 * 1024,
+    }
+
+
+def prune(max_bytes):
+    """전체 크기가 max_bytes 이하가 될 때까지 오래 안 쓴 파일부터 지운다. 지운 개수를 돌려준다."""
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+        removed += 1
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arrow 변환 캐시 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="캐시 파일 수와 크기 보기")
+    prune_cmd = sub.add_parser("prune", help="크기 상한에 맞게 오래된 파일 지우기")
+    prune_cmd.add_argument("--max-mb", type=float, default=MAX_MB)
+    sub.add_parser("clear", help="캐시 전부 지우기")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        info = stats()
+        print(f"{info['dir']}: {info['files']}개, {info['bytes'] / 1024 / 1024:.1f} MB "
+              f"(상한 {info['max_bytes'] / 1024 / 1024:.0f} MB)")
+    elif args.command == "prune":
+        removed = prune(int(args.max_mb * 1024 * 1024))
+        print(f"{removed}개 파일을 지웠습니다.")
+    elif args.command == "clear":
+        removed = prune(0)
+        print(f"{removed}개 파일을 지웠습니다.")
+
+
+if __name__ == "__main__":
+    main()
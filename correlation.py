@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from lru import LRUCache
+
+# 숫자 열 전체의 상관행렬을 한 번에 계산하는 모듈
+# 빈칸(NaN)이 있어도 두 열이 모두 있는 행만으로 계산한다 (pairwise-complete, df.corr() 와 같은 값).
+# 열을 BLOCK 개씩 묶어서 행렬곱으로 처리하므로 열이 수백 개여도 빠르다.
+# 다만 빈칸이 있으면 계산량이 행 수 × 열 수² 에 비례해서, 1코어에서 열 500개면 행 1만은 약 1초, 행 10만은 10초쯤 걸린다.
+# 그래서 결과는 (data_key, 방법, 열) 로 캐시하고, 처음 계산할 때는 progress 로 진행률을 알린다.
+
+BLOCK = 256
+MAX_CACHED = 16
+
+
+def numeric_columns(df):
+    return [col for col in df.columns
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+
+
+def _as_matrix(df, columns, method):
+    frame = df[list(columns)]
+    if method == "spearman":
+        # 열마다 순위로 바꾼 뒤 피어슨 상관을 구한다.
+        # 순위는 각 열의 값 전체로 매기므로, 빈칸이 있는 열은 쌍마다 다시 순위를 매기는 df.corr() 와 조금 다를 수 있다.
+        frame = frame.rank(method="average")
+    X = frame.to_numpy(dtype="float64", na_value=np.nan)
+    # 열 평균을 빼 두면 합을 낼 때 오차가 줄어든다
+    with np.errstate(invalid="ignore"):
+        means = np.nanmean(X, axis=0) if len(X) else np.zeros(X.shape[1])
+    return X - np.nan_to_num(means)
+
+
+def pairwise_corr(X, block=BLOCK, progress=None):
+    """(n, p) 배열의 상관행렬과 쌍마다 쓴 행 수를 돌려준다.
+
+    progress(0~1) 를 주면 열 묶음 쌍 하나를 끝낼 때마다 불린다.
+    """
+    n_rows, p = X.shape
+    mask = ~np.isnan(X)
+    if mask.all():
+        # 빈칸이 없으면 한 번의 행렬곱으로 끝난다
+        X0 = X - X.mean(axis=0)
+        cov = X0.T @ X0
+        sd = np.sqrt(np.diag(cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(sd, sd)
+        return np.clip(corr, -1, 1), np.full((p, p), n_rows, dtype="int64")
+
+    M = mask.astype("float64")
+    X0 = np.where(mask, X, 0.0)
+    X2 = X0 * X0
+    corr = np.empty((p, p))
+    counts = np.empty((p, p), dtype="int64")
+    n_blocks = -(-p // block)
+    total, done = n_blocks * (n_blocks + 1) // 2, 0
+    for i0 in range(0, p, block):
+        bi = slice(i0, min(i0 + block, p))
+        for j0 in range(i0, p, block):
+            bj = slice(j0, min(j0 + block, p))
+            n = M[:, bi].T @ M[:, bj]
+            sx = X0[:, bi].T @ M[:, bj]          # 열 i 의 합 (열 j 도 있는 행만)
+            sy = M[:, bi].T @ X0[:, bj]          # 열 j 의 합 (열 i 도 있는 행만)
+            sxx = X2[:, bi].T @ M[:, bj]
+            syy = M[:, bi].T @ X2[:, bj]
+            sxy = X0[:, bi].T @ X0[:, bj]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cov = n * sxy - sx * sy
+                var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+                r = np.clip(cov / np.sqrt(var), -1, 1)
+            r[n < 2] = np.nan
+            corr[bi, bj] = r
+            corr[bj, bi] = r.T
+            counts[bi, bj] = n
+            counts[bj, bi] = n.T
+            done += 1
+            if progress is not None:
+                progress(done / total)
+    return corr, counts
+
+
+_results = LRUCache(MAX_CACHED)
+
+
+def correlation_matrix(df, columns=None, method="pearson", data_key=None, progress=None):
+    """(상관행렬 DataFrame, 쌍별 행 수 DataFrame). data_key 를 주면 결과를 캐시한다.
+
+    progress(0~1) 는 실제로 계산할 때만 불린다 (캐시에 있으면 불리지 않음).
+    """
+    columns = tuple(numeric_columns(df) if columns is None else columns)
+
+    def compute():
+        if progress is not None:
+            progress(0.0)
+        corr, counts = pairwise_corr(_as_matrix(df, columns, method), progress=progress)
+        return (
+            pd.DataFrame(corr, index=list(columns), columns=list(columns)),
+            pd.DataFrame(counts, index=list(columns), columns=list(columns)),
+        )
+
+    if data_key is None:
+        return compute()
+    return _results.get_or_compute((data_key, method, columns), compute)
+
+
+def top_pairs(corr, k=20):
+    """|r| 이 큰 순서로 열 쌍 k 개 (대각선, 중복 쌍 제외)"""
+    values = corr.to_numpy()
+    iu = np.triu_indices_from(values, k=1)
+    r = values[iu]
+    keep = ~np.isnan(r)
+    order = np.argsort(-np.abs(r[keep]))[:k]
+    rows, cols = iu[0][keep][order], iu[1][keep][order]
+    return pd.DataFrame({
+        "x": corr.index[rows],
+        "y": corr.columns[cols],
+        "r": r[keep][order],
+    })
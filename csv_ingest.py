@@ -0,0 +1,103 @@
+import codecs
+import io
+
+import pandas as pd
+
+from frame_compact import compact
+
+# CSV 읽기: 인코딩은 앞부분 몇 KB 만 보고 정하고, 파일은 한 번만 파싱한다
+# 공공데이터 CSV 는 대부분 cp949(euc-kr) 라서 "UTF-8 로 읽어 보고 실패하면 다시" 는 매번 두 번 읽게 된다.
+# pyarrow 가 있으면 pyarrow CSV 리더로 블록 단위로 읽고 (블록마다 progress 호출),
+# 없으면 pandas 로 chunksize 만큼씩 읽는다.
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow 가 없으면 pandas 로 읽는다
+    pa = None
+    pa_csv = None
+
+SNIFF_BYTES = 64 * 1024
+BLOCK_SIZE = 4 * 1024 * 1024
+PANDAS_CHUNK_ROWS = 200_000
+_DECODE_ERRORS = (UnicodeDecodeError,) if pa is None else (UnicodeDecodeError, pa.ArrowInvalid)
+
+
+def sniff_encoding(prefix):
+    """앞부분 바이트로 인코딩을 고른다: utf-8-sig / utf-16 / utf-8 / cp949"""
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    # 잘린 글자가 끝에 걸려도 실패하지 않도록 final=False 로 디코딩해 본다
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        # euc-kr 은 cp949 에 포함된다
+        return "cp949"
+
+
+def read_csv(data, encoding=None, progress=None, block_size=BLOCK_SIZE, compact_dtypes=True):
+    """CSV 바이트를 DataFrame 으로 (compact_dtypes 면 frame_compact.compact 까지).
+
+    progress(읽은 비율 0~1) 를 주면 블록마다 불린다.
+    """
+    sniffed = encoding is None
+    encoding = encoding or sniff_encoding(data[:SNIFF_BYTES])
+    try:
+        df = _read(data, encoding, progress, block_size)
+    except _DECODE_ERRORS:
+        # 앞부분은 UTF-8 이었는데 뒤에서 깨진 경우에만 cp949 로 한 번 더 읽는다
+        if not (sniffed and encoding == "utf-8"):
+            raise
+        df = _read(data, "cp949", progress, block_size)
+    if progress is not None:
+        progress(1.0)
+    return compact(df) if compact_dtypes else df
+
+
+def _read(data, encoding, progress, block_size):
+    if pa_csv is not None:
+        return _read_arrow(data, encoding, progress, block_size)
+    return _read_pandas(data, encoding, progress)
+
+
+def _arrow_encoding(encoding):
+    # Arrow 는 UTF-8 BOM 을 알아서 건너뛴다
+    return "utf8" if encoding in ("utf-8", "utf-8-sig") else encoding
+
+
+def _read_arrow(data, encoding, progress, block_size):
+    read_opts = pa_csv.ReadOptions(encoding=_arrow_encoding(encoding), block_size=block_size)
+    total = max(len(data), 1)
+    batches = []
+    try:
+        reader = pa_csv.open_csv(pa.BufferReader(data), read_options=read_opts)
+        for batch in reader:
+            batches.append(batch)
+            if progress is not None:
+                # 블록 크기로 어림잡은 진행률 (인코딩을 바꾸면 조금 다를 수 있다)
+                progress(min(len(batches) * block_size / total, 0.99))
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+    except pa.ArrowInvalid:
+        # 스트리밍 리더는 첫 블록으로 열 형식을 정하므로, 뒤에서 형식이 바뀌면
+        # (예: 정수 열에 뒤늦게 소수가 나오면) 파일 전체를 보고 형식을 정하는 방식으로 다시 읽는다
+        table = pa_csv.read_csv(pa.BufferReader(data), read_options=read_opts)
+    if read_opts.encoding == "utf8" and any(pa.types.is_binary(field.type) for field in table.schema):
+        # UTF-8 로 풀 수 없는 열은 Arrow 가 바이트(binary) 열로 읽어 버린다
+        raise UnicodeDecodeError("utf-8", b"", 0, 1, "UTF-8 이 아닌 글자가 있는 열")
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _read_pandas(data, encoding, progress):
+    total = max(len(data), 1)
+    buffer = io.BytesIO(data)
+    chunks = []
+    for chunk in pd.read_csv(buffer, encoding=encoding, chunksize=PANDAS_CHUNK_ROWS):
+        chunks.append(chunk)
+        if progress is not None:
+            progress(min(buffer.tell() / total, 0.99))
+    if not chunks:
+        return pd.read_csv(io.BytesIO(data), encoding=encoding)
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,357 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import columnar_cache
+import samples
+from csv_ingest import read_csv
+from frame_compact import column_nbytes, compact, format_report
+from instrument import stage
+from lru import LRUCache
+from sessions import SessionSweep, current_session_id, ended_sessions
+from xlsx_stream import PREVIEW_ROWS, preview_kinds, read_columns, read_preview, sheet_info
+
+# 업로드 파일 파싱 결과를 프로세스 안에서 재사용하기 위한 캐시
+# 체크박스 하나 누를 때마다 엑셀 전체를 다시 읽지 않도록 한다.
+# 내용 해시로 찾으므로 같은 파일을 올린 세션(학생)들은 DataFrame 하나를 같이 쓴다.
+
+DEFAULT_MAX_MB = int(os.environ.get("GRAPH_CACHE_MB", "512"))
+
+# 공유하는 DataFrame 을 어느 세션이 고쳐도 다른 세션에 번지지 않도록 (pandas 3 부터는 항상 켜져 있다)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def file_digest(data):
+    """업로드된 바이트의 내용 해시 (sha256)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+_digest_memo = LRUCache(256)   # (업로드 file_id, 크기) -> 해시
+
+
+def upload_digest(uploaded_file):
+    """업로드 파일의 해시. 같은 업로드 객체는 재실행마다 다시 해시하지 않는다."""
+    data = uploaded_file.getvalue()
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is None:
+        with stage("upload_hash"):
+            return data, file_digest(data)
+    memo_key = (file_id, len(data))
+    digest = _digest_memo.get(memo_key)
+    if digest is None:
+        with stage("upload_hash"):
+            digest = _digest_memo.put(memo_key, file_digest(data))
+    _track_session(digest)
+    return data, digest
+
+
+def options_key(**read_opts):
+    """읽기 옵션을 캐시 키에 넣을 수 있는 문자열로 정리"""
+    return repr(sorted(read_opts.items()))
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _dataset_of(key):
+    # 캐시 키는 (파일 해시, 옵션) 모양이다
+    return key[0] if isinstance(key, tuple) else key
+
+
+class FrameCache(LRUCache):
+    """메모리 상한이 있는 LRU DataFrame 캐시 (모든 세션이 같이 쓴다)
+
+    - 같은 키를 여러 세션이 동시에 읽으면 한 번만 파싱하고 나머지는 기다렸다가 같은 객체를 받는다.
+    - 세션이 쓰고 있는 데이터(pin)는 상한을 넘어도 지우지 않는다. 지우면 다음 재실행에서
+      다시 파싱한 복사본이 하나 더 생길 뿐이므로, 아무도 쓰지 않는 것부터 오래된 순으로 지운다.
+    """
+
+    def __init__(self, max_bytes):
+        super().__init__(max_bytes, sizeof=frame_nbytes)
+        self._loading = {}           # key -> [Lock, 기다리는 수]
+        self._pins = {}              # 파일 해시 -> 쓰고 있는 세션 id 집합
+        self.shared_loads = 0        # 다른 세션이 파싱한 결과를 기다렸다가 받은 횟수
+
+    def _keep(self, key):
+        # 아무 세션도 pin 하지 않은 것만 지운다
+        return _dataset_of(key) in self._pins
+
+    def get_or_load(self, key, loader):
+        """캐시에 있으면 그것을, 없으면 loader() 결과를 넣고 돌려준다 (같은 키는 동시에 한 번만 loader 호출)."""
+        df = self.get(key)
+        if df is not None:
+            return df
+        with self._lock:
+            slot = self._loading.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                with self._lock:
+                    item = self._items.get(key)
+                    if item is not None:
+                        self._items.move_to_end(key)
+                        self.shared_loads += 1
+                        return item[0]
+                return self.put(key, loader())
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    self._loading.pop(key, None)
+
+    def pin(self, dataset, session_id):
+        with self._lock:
+            self._pins.setdefault(dataset, set()).add(session_id)
+
+    def unpin(self, dataset, session_id):
+        with self._lock:
+            sessions = self._pins.get(dataset)
+            if sessions is not None:
+                sessions.discard(session_id)
+                if not sessions:
+                    del self._pins[dataset]
+            self._evict()
+
+    def stats(self):
+        with self._lock:
+            pinned = [key for key in self._items if _dataset_of(key) in self._pins]
+            return {
+                "entries": len(self._items),
+                "bytes": self.total_size,
+                "max_bytes": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "shared_loads": self.shared_loads,
+                "datasets_in_use": len(self._pins),
+                "sessions": len({sid for sessions in self._pins.values() for sid in sessions}),
+                "pinned_bytes": sum(self._items[key][1] for key in pinned),
+            }
+
+
+# 모든 세션(페이지)이 함께 쓰는 캐시
+frame_cache = FrameCache(DEFAULT_MAX_MB * 1024 * 1024)
+
+# 세션 id -> 그 세션이 최근에 올린 파일 해시들 (오래된 것부터)
+PINS_PER_SESSION = 4
+_session_datasets = {}
+_session_lock = threading.Lock()
+_sweep = SessionSweep()
+
+
+def _track_session(digest):
+    """지금 세션이 이 파일을 쓰고 있다고 표시한다 (세션마다 최근 PINS_PER_SESSION 개까지)."""
+    session_id = current_session_id()
+    if session_id is None:
+        return
+    released = []
+    with _session_lock:
+        recent = _session_datasets.setdefault(session_id, OrderedDict())
+        if digest in recent:
+            recent.move_to_end(digest)
+        else:
+            recent[digest] = True
+            frame_cache.pin(digest, session_id)
+            while len(recent) > PINS_PER_SESSION:
+                released.append(recent.popitem(last=False)[0])
+    for old in released:
+        frame_cache.unpin(old, session_id)
+    _sweep_sessions()
+
+
+def _sweep_sessions():
+    # 브라우저를 닫은 세션의 pin 을 푼다 (가끔 한 번씩만 확인)
+    if not _sweep.due():
+        return
+    with _session_lock:
+        dead = ended_sessions(list(_session_datasets))
+        gone = {sid: _session_datasets.pop(sid) for sid in dead}
+    for session_id, recent in gone.items():
+        for digest in recent:
+            frame_cache.unpin(digest, session_id)
+
+
+# 파일 해시 -> {열 이름: (줄이기 전 바이트, 줄인 뒤 바이트)}
+_memory_reports = {}
+_report_lock = threading.Lock()
+
+
+def _compact(digest, df):
+    """읽은 직후 dtype 을 줄이고, 줄이기 전/후 메모리를 열별로 기록한다."""
+    before = column_nbytes(df)
+    df = compact(df)
+    after = column_nbytes(df)
+    with _report_lock:
+        report = _memory_reports.setdefault(digest, {})
+        for col, nbytes in after.items():
+            report[col] = (before.get(col, nbytes), nbytes)
+    return df
+
+
+def memory_report(uploaded_file):
+    """(줄이기 전, 줄인 뒤) 바이트. 이 프로세스에서 파싱한 적이 없으면 (디스크 캐시에서 읽었으면) None"""
+    digest = upload_digest(uploaded_file)[1]
+    with _report_lock:
+        report = _memory_reports.get(digest)
+        if not report:
+            return None
+        return sum(b for b, _ in report.values()), sum(a for _, a in report.values())
+
+
+def memory_caption(uploaded_file):
+    """Streamlit 페이지용: dtype 을 줄여서 아낀 메모리를 한 줄로 보여준다."""
+    import streamlit as st
+
+    report = memory_report(uploaded_file)
+    if report is not None:
+        st.caption(format_report(*report))
+
+
+def _load_converted(digest, opts_key, columns=None):
+    """이미 Arrow 로 바꿔 둔 것: 저장소의 예시 파일(첫 시트) 이나 디스크 캐시"""
+    with stage("load_arrow"):
+        if opts_key == options_key(sheet_name=0):
+            df = samples.load(digest, columns=columns)
+            if df is not None:
+                return df
+        return columnar_cache.load(digest, opts_key, columns=columns)
+
+
+# (파일 해시, 시트) -> 실제로 읽은 행 수. 시트 선택 상자에서 <dimension> 대신 보여 준다.
+_sheet_rows = LRUCache(1024)
+
+
+def _remember_rows(digest, sheet_name, df):
+    # sheet_name 이 목록/None 이면 read_excel 이 {시트: DataFrame} 을 돌려준다
+    if isinstance(df, pd.DataFrame):
+        _sheet_rows.put((digest, sheet_name), len(df))
+
+
+def load_sheet_info(uploaded_file):
+    """시트 목록 DataFrame (열: 시트, 행, 열). 셀은 읽지 않는다.
+
+    행 수는 시트의 <dimension> 값이라 실제보다 많을 수 있다 (지운 행이 남아 있는 파일 등).
+    """
+    data, digest = upload_digest(uploaded_file)
+    key = (digest, options_key(sheets=True))
+    return frame_cache.get_or_load(
+        key, lambda: pd.DataFrame(sheet_info(data), columns=["시트", "행", "열"]).astype({"행": "Int64", "열": "Int64"}))
+
+
+def dataset_key(uploaded_file, sheet_name=0):
+    """그래프/통계 캐시에 넘길 data_key. 같은 파일이라도 시트가 다르면 다른 값."""
+    digest = upload_digest(uploaded_file)[1]
+    return digest if sheet_name == 0 else f"{digest}#{sheet_name}"
+
+
+def sheet_picker(uploaded_file, key="sheet"):
+    """Streamlit 페이지용: 시트가 여러 개면 이름과 크기를 보여주는 선택 상자. 고른 시트 번호를 돌려준다.
+
+    고른 시트만 읽고, 한 번 읽은 시트는 캐시에 남아서 다시 고르면 바로 나온다.
+    """
+    import streamlit as st
+
+    sheets = load_sheet_info(uploaded_file)
+    if len(sheets) <= 1:
+        return 0
+
+    def label(i):
+        name, rows, cols = sheets.iloc[i]
+        if pd.isna(rows):
+            return str(name)
+        # <dimension> 은 서식만 있는 빈 행까지 세므로 실제 행 수보다 많을 수 있다
+        return f"{name} (최대 {max(int(rows) - 1, 0):,}행 × {int(cols)}열)"
+
+    choice = st.selectbox("📑 시트 선택", range(len(sheets)), format_func=label, key=key)
+    # 한 번 읽은 시트는 실제 행 수를 알려 준다 (선택 상자 글자를 바꾸면 선택이 풀릴 수 있어서 따로 적는다)
+    read = _sheet_rows.get((upload_digest(uploaded_file)[1], choice))
+    rows = sheets.iloc[choice]["행"]
+    if read is not None and (pd.isna(rows) or read != int(rows) - 1):
+        st.caption(f"이 시트에 실제로 들어 있는 데이터는 {read:,}행입니다.")
+    return choice
+
+
+def load_excel(uploaded_file, **read_opts):
+    """업로드된 엑셀 파일을 읽는다. 같은 내용+옵션이면 캐시된 DataFrame을 돌려준다.
+
+    숫자 열은 작은 타입으로, 반복되는 문자열은 category 로, 날짜 문자열은 datetime64 로 바꿔서 돌려준다.
+
+    돌려받은 DataFrame은 다른 세션과 공유된다 (copy-on-write 라서 고치면 그 세션 쪽만 복사된다).
+    """
+    read_opts.setdefault("sheet_name", 0)
+    data, digest = upload_digest(uploaded_file)
+    key = (digest, options_key(**read_opts))
+
+    def parse():
+        # 메모리에 없으면 디스크의 Arrow 캐시(예시 파일 포함), 그것도 없으면 엑셀을 파싱
+        df = _load_converted(*key)
+        if df is None:
+            with stage("parse_excel"):
+                df = _compact(digest, pd.read_excel(io.BytesIO(data), **read_opts))
+            columnar_cache.store(*key, df)
+        _remember_rows(digest, read_opts["sheet_name"], df)
+        return df
+
+    return frame_cache.get_or_load(key, parse)
+
+
+def load_csv(uploaded_file, progress=None):
+    """업로드된 CSV 를 읽는다 (인코딩은 앞부분으로 판단). 캐시 구조는 load_excel 과 같다.
+
+    progress(0~1) 는 실제로 파싱할 때만 불린다 (캐시에 있으면 불리지 않음).
+    """
+    data, digest = upload_digest(uploaded_file)
+    key = (digest, options_key(format="csv"))
+
+    def parse():
+        with stage("load_arrow"):
+            df = columnar_cache.load(*key)
+        if df is None:
+            with stage("parse_csv"):
+                df = _compact(digest, read_csv(data, progress=progress, compact_dtypes=False))
+            columnar_cache.store(*key, df)
+        return df
+
+    return frame_cache.get_or_load(key, parse)
+
+
+def load_excel_preview(uploaded_file, sheet_name=0):
+    """머리행과 앞부분 몇 줄만 읽은 미리보기 (열 목록을 빨리 보여줄 때 사용)"""
+    data, digest = upload_digest(uploaded_file)
+    key = (digest, options_key(preview=True, sheet_name=sheet_name))
+
+    def parse():
+        # 예시 파일은 미리 바꿔 둔 Arrow 의 앞부분을 쓴다
+        converted = samples.load(digest) if sheet_name == 0 else None
+        if converted is not None:
+            return converted.head(PREVIEW_ROWS)
+        with stage("parse_excel"):
+            return read_preview(data, sheet_name=sheet_name, n_rows=PREVIEW_ROWS)
+
+    return frame_cache.get_or_load(key, parse)
+
+
+def load_excel_columns(uploaded_file, columns, sheet_name=0):
+    """선택한 열만 읽는다. 열 단위로 캐시해서 체크박스를 하나 더 누르면 그 열만 새로 읽는다."""
+    data, digest = upload_digest(uploaded_file)
+    with stage("select_columns"):
+        keys = {col: (digest, options_key(column=col, sheet_name=sheet_name)) for col in columns}
+        parts = {col: frame_cache.get(key) for col, key in keys.items()}
+        missing = [col for col, part in parts.items() if part is None]
+        if missing:
+            # 시트 전체가 Arrow 캐시에 있으면 필요한 열만 꺼낸다
+            fresh = _load_converted(digest, options_key(sheet_name=sheet_name), columns=missing)
+            if fresh is None:
+                kinds = preview_kinds(load_excel_preview(uploaded_file, sheet_name=sheet_name))
+                with stage("parse_excel"):
+                    fresh = _compact(digest, read_columns(data, missing, sheet_name=sheet_name, kinds=kinds))
+            _remember_rows(digest, sheet_name, fresh)
+            for col in missing:
+                parts[col] = frame_cache.put(keys[col], fresh[[col]])
+        return pd.concat([parts[col] for col in columns], axis=1)
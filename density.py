@@ -0,0 +1,38 @@
+import numpy as np
+
+from lru import LRUCache
+
+# 점이 아주 많은 산점도를 2차원 히스토그램(칸마다 점 개수)으로 바꾸는 모듈
+# 행이 몇 백만 개여도 그리는 비용은 칸 수(BINS x BINS)만큼으로 일정하다.
+# 같은 데이터, 같은 열 쌍이면 한 번 계산한 결과를 다시 쓴다.
+
+DENSITY_THRESHOLD = 50_000   # 점이 이보다 많으면 밀도 그림으로
+BINS = 200
+MAX_CACHED = 32
+
+
+def histogram2d(x, y, bins=BINS):
+    """(counts, x_edges, y_edges). counts[i, j] 는 y 칸 i, x 칸 j 의 점 개수 (그림 그릴 때의 행/열 순서)."""
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    keep = np.isfinite(x) & np.isfinite(y)
+    x, y = x[keep], y[keep]
+    if not len(x):
+        edges = np.linspace(0.0, 1.0, bins + 1)
+        return np.zeros((bins, bins), dtype="int64"), edges, edges
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    return counts.T.astype("int64"), x_edges, y_edges
+
+
+_results = LRUCache(MAX_CACHED)
+
+
+def density(df, x_col, y_col, bins=BINS, data_key=None):
+    """df 의 두 열로 histogram2d. data_key 를 주면 (data_key, x, y, bins) 로 캐시한다."""
+    def compute():
+        return histogram2d(df[x_col].to_numpy(dtype="float64", na_value=np.nan),
+                           df[y_col].to_numpy(dtype="float64", na_value=np.nan), bins=bins)
+
+    if data_key is None:
+        return compute()
+    return _results.get_or_compute((data_key, x_col, y_col, bins), compute)
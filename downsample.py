@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# 긴 시계열을 화면 픽셀 수 정도로 줄이는 LTTB(Largest-Triangle-Three-Buckets) 다운샘플링
+# 모양(봉우리/골짜기)은 살리고 점 개수만 줄인다.
+
+
+def numeric_axis(values):
+    """LTTB 계산용 숫자 x 값. 날짜는 정수로, 문자열/범주는 순서 번호로 바꾼다."""
+    series = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype="float64")
+    return np.arange(len(series), dtype="float64")
+
+
+def lttb_indices(x, y, n_out):
+    """x, y (NaN 없는 float 배열) 에서 남길 점의 위치를 n_out 개 고른다."""
+    return lttb_indices_many(x, np.asarray(y)[:, None], n_out)[:, 0]
+
+
+def lttb_indices_many(x, ys, n_out):
+    """x 를 같이 쓰는 여러 y 열(ys: 행 x 열, NaN 없음)의 LTTB 를 한 번에. 결과도 (n_out, 열 수)."""
+    n, k = ys.shape
+    if n_out >= n or n_out < 3:
+        return np.repeat(np.arange(n)[:, None], k, axis=1)
+
+    # 첫 점과 끝 점은 항상 남기고, 가운데를 n_out - 2 개 구간으로 나눈다
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts = edges[:-1]
+    # 구간마다의 평균점을 미리 한 번에 구해 두고, 각 구간은 "다음 구간의 평균점" 을 쓴다 (마지막 구간은 끝 점)
+    counts = np.diff(edges).astype("float64")
+    avg_x = np.add.reduceat(x[:edges[-1]], starts) / counts
+    avg_y = np.add.reduceat(ys[:edges[-1]], starts, axis=0) / counts[:, None]
+    nxt_x = np.append(avg_x[1:], x[n - 1])
+    nxt_y = np.vstack([avg_y[1:], ys[n - 1]])
+
+    cols = np.arange(k)
+    out = np.empty((n_out, k), dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    prev = np.zeros(k, dtype=np.int64)
+    for i in range(n_out - 2):
+        start, end = starts[i], edges[i + 1]
+        bx = x[start:end, None]
+        by = ys[start:end]
+        px, py = x[prev], ys[prev, cols]
+        # 이전에 고른 점, 후보점, 다음 구간 평균점으로 만든 삼각형 넓이(의 2배)
+        area = np.abs((px - nxt_x[i]) * (by - py) - (px - bx) * (nxt_y[i] - py))
+        prev = start + np.argmax(area, axis=0)
+        out[i + 1] = prev
+    return out
+
+
+def downsample(x_values, y_values, n_out):
+    """(x, y, 원래 점 개수) 를 돌려준다. y 가 빈 행은 먼저 뺀다."""
+    return downsample_many(x_values, [y_values], n_out)[0]
+
+
+def downsample_many(x_values, columns, n_out):
+    """x 를 같이 쓰는 여러 y 열을 한꺼번에 줄인다. 열마다 (x, y, 원래 점 개수) 목록.
+
+    x 변환은 한 번만 하고, 빈칸 위치가 같은 열끼리는 LTTB 도 한 번에 계산한다.
+    """
+    x_num = numeric_axis(x_values)
+    x_values = np.asarray(x_values)
+    ys = [pd.to_numeric(pd.Series(y), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+          for y in columns]
+    groups = {}
+    for j, y in enumerate(ys):
+        valid = ~(np.isnan(y) | np.isnan(x_num))
+        groups.setdefault(np.packbits(valid).tobytes(), (valid, []))[1].append(j)
+    result = [None] * len(ys)
+    for valid, members in groups.values():
+        x_kept, x_valid = x_values[valid], x_num[valid]
+        stacked = np.column_stack([ys[j][valid] for j in members])
+        idx = lttb_indices_many(x_valid, stacked, n_out)
+        for m, j in enumerate(members):
+            result[j] = (x_kept[idx[:, m]], stacked[idx[:, m], m], int(valid.sum()))
+    return result
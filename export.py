@@ -0,0 +1,152 @@
+import hashlib
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import plotly.graph_objects as go
+
+from instrument import stage
+from lru import LRUCache
+
+# 그래프 이미지(PNG 등) 내보내기
+# - 버튼을 눌렀을 때만 만든다 (재실행마다 fig.to_image 를 부르지 않는다)
+# - Kaleido 는 한 번 띄워 두고 계속 쓰는 작업 스레드에서만 돌린다. 페이지는 기다리지 않고
+#   "만드는 중" 을 보여 주다가, 다 되면 다운로드 버튼을 보여 준다 (png_download_button)
+# - 같은 그래프(JSON 해시가 같은 그래프)는 다시 그리지 않고 저장해 둔 바이트를 돌려준다
+
+EXPORT_WORKERS = int(os.environ.get("GRAPH_EXPORT_WORKERS", "1"))
+MAX_CACHED_IMAGES = 32
+DEFAULT_SIZE = (1000, 600)
+POLL_SECONDS = 0.5     # PNG 를 만드는 동안 다 됐는지 다시 볼 간격
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="kaleido")
+_images = LRUCache(MAX_CACHED_IMAGES)   # key -> bytes
+_pending = {}                    # key -> Future
+_fig_keys = {}                   # id(Figure) -> (weakref, JSON 해시). 같은 객체는 다시 직렬화하지 않는다
+_lock = threading.Lock()
+_warm = None
+
+
+def _start_kaleido():
+    import kaleido
+
+    # 먼저 한 장 그려 본다. 여기서 실패하면 (kaleido/Chrome 이 없으면) 서버를 띄우지 않는다.
+    # 작업 스레드에서 돌므로 페이지는 기다리지 않지만, 작업 스레드가 하나(EXPORT_WORKERS=1)면
+    # 그 사이에 맡긴 첫 이미지는 이 준비가 끝난 뒤에 만들어진다.
+    go.Figure().to_image(format="png", width=10, height=10)
+    # Kaleido 1.x 는 브라우저를 계속 띄워 둘 수 있다 (0.2.x 는 첫 호출 때 띄운 프로세스를 계속 쓴다)
+    start = getattr(kaleido, "start_sync_server", None)
+    if start is not None:
+        start(silence_warnings=True)
+
+
+def prewarm():
+    """Kaleido 를 백그라운드에서 미리 띄운다 (여러 번 불러도 한 번만)."""
+    global _warm
+    with _lock:
+        if _warm is None:
+            _warm = _executor.submit(_start_kaleido)
+    return _warm
+
+
+def figure_hash(fig):
+    with _lock:
+        ref, digest = _fig_keys.get(id(fig), (None, None))
+    if ref is not None and ref() is fig:
+        return digest
+    digest = hashlib.sha256(fig.to_json().encode("utf-8")).hexdigest()
+    fig_id = id(fig)
+    with _lock:
+        # Figure 는 해시가 안 되므로 id 로 찾고, 객체가 사라지면 지운다
+        _fig_keys[fig_id] = (weakref.ref(fig, lambda _: _fig_keys.pop(fig_id, None)), digest)
+    return digest
+
+
+def image_key(fig, fmt="png", width=DEFAULT_SIZE[0], height=DEFAULT_SIZE[1]):
+    return f"{figure_hash(fig)}-{fmt}-{width}x{height}"
+
+
+def cached_image(key):
+    return _images.get(key)
+
+
+def _render(fig, key, fmt, width, height):
+    try:
+        with stage("to_image"):
+            data = fig.to_image(format=fmt, width=width, height=height)
+        # 만드는 중 목록에서 빼기 전에 넣어야 그 사이에 같은 이미지를 다시 맡기지 않는다
+        return _images.put(key, data)
+    finally:
+        with _lock:
+            _pending.pop(key, None)
+
+
+def request_image(fig, fmt="png", width=DEFAULT_SIZE[0], height=DEFAULT_SIZE[1]):
+    """이미지를 만들어 달라고 작업 스레드에 맡기고 Future 를 돌려준다.
+
+    이미 만든 이미지나 만드는 중인 이미지면 새로 맡기지 않는다.
+    """
+    prewarm()
+    key = image_key(fig, fmt, width, height)
+    with _lock:
+        data = _images.get(key)
+        if data is None:
+            future = _pending.get(key)
+            if future is None:
+                future = _pending[key] = _executor.submit(_render, fig, key, fmt, width, height)
+            return future
+    future = Future()
+    future.set_result(data)
+    return future
+
+
+def to_image(fig, fmt="png", width=DEFAULT_SIZE[0], height=DEFAULT_SIZE[1]):
+    """이미지 바이트 (끝날 때까지 기다림)"""
+    return request_image(fig, fmt, width, height).result()
+
+
+def _request_png(fig, job_key):
+    import streamlit as st
+
+    st.session_state[job_key] = request_image(fig)
+
+
+def png_download_button(fig, file_name, label="📅 그래프 PNG로 저장하기"):
+    """Streamlit 페이지용: 'PNG 만들기' 를 누르면 작업 스레드에 맡기고, 다 되면 다운로드 버튼을 보여준다.
+
+    만드는 동안 스크립트는 기다리지 않는다. 이 부분만 POLL_SECONDS 마다 다시 실행해서 끝났는지 본다.
+    """
+    import streamlit as st
+
+    key = image_key(fig)
+    job_key = f"png_job_{key[:16]}"
+    job = st.session_state.get(job_key)
+    polling = job is not None and not job.done()
+
+    @st.fragment(run_every=POLL_SECONDS if polling else None)
+    def show():
+        job = st.session_state.get(job_key)
+        if job is not None and job.done() == polling:
+            # 방금 맡겼거나(폴링을 켜야 함) 폴링 중에 끝났으면(꺼야 함) 페이지를 다시 그린다
+            st.rerun()
+        data = cached_image(key)
+        if job is not None and job.done():
+            del st.session_state[job_key]
+            try:
+                data = job.result()
+            except Exception as e:
+                st.error(f"PNG 를 만들지 못했습니다: {e}")
+        if data is not None:
+            st.download_button(
+                label=label,
+                data=data,
+                file_name=file_name,
+                mime="image/png"
+            )
+        elif job is not None and not job.done():
+            st.caption("⏳ PNG 만드는 중...")
+        else:
+            st.button("🖼️ PNG 만들기", key=f"make_png_{key[:16]}", on_click=_request_png, args=(fig, job_key))
+
+    show()
@@ -0,0 +1,154 @@
+import base64
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+# 그래프를 브라우저로 보낼 때의 크기를 줄이는 인코딩
+# - 숫자 배열은 numpy 배열로 넘기면 plotly 가 base64 typed array({"dtype": "f4", "bdata": ...})로 보낸다.
+#   그래서 y 값은 pandas nullable 타입 등도 모두 숫자 numpy 배열로 바꿔서 넘긴다.
+# - 날짜 x 는 ISO 문자열 대신 epoch 밀리초 숫자로 (x 축 type="date" 면 plotly.js 가 날짜로 읽는다)
+# - 같은 글자가 여러 번 나오는 범주 x 는 사전 인코딩: 점마다 정수 코드만 보내고 글자는 축 눈금(ticktext)에 한 번만
+#   (범주가 MAX_TICK_LABELS 개보다 많으면 눈금은 같은 간격으로 골라서)
+# - 보내는 길 압축은 .streamlit/config.toml 의 server.enableWebsocketCompression
+#
+# GRAPH_FIGURE_CODEC=0 이면 날짜/범주 인코딩을 하지 않는다 (비교용)
+
+ENABLED = os.environ.get("GRAPH_FIGURE_CODEC", "1") != "0"
+
+# 범주가 이보다 많으면 글자 그대로 보낸다
+MAX_DICT_CATEGORIES = 500
+# 축 눈금 글자는 이 개수까지만 (범주가 많으면 같은 간격으로 골라 적는다. 다 적으면 글자가 겹친다)
+MAX_TICK_LABELS = 50
+# 점 개수가 범주 수의 이 배 이상일 때만 사전 인코딩 (반복이 적으면 눈금 목록만 늘어난다)
+MIN_REPEAT = 2
+
+
+def _smallest_int(n):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64 if n <= np.iinfo(np.int64).max else np.float64
+
+
+def encode_values(series):
+    """trace 에 넣을 y 값. 숫자 열은 typed array 로 보낼 수 있는 numpy 배열로."""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+        return series.to_numpy()
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        # Int64/Float64 같은 nullable 타입은 object 배열(pd.NA 섞임)이 되어 숫자 목록으로 나가므로 float 로
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+    values = series.to_numpy()
+    if values.dtype == np.float16:
+        return values.astype("float32")
+    if values.dtype.kind == "f" and len(values) and np.isfinite(values).all() and (values == np.round(values)).all():
+        # 정수뿐인 실수 열 (엑셀에서 읽은 학년 등) 은 정수로: f8 8바이트 대신 1~4바이트
+        return values.astype(_smallest_int(max(abs(values.min()), abs(values.max()))))
+    return values
+
+
+class XEncoder:
+    """한 그래프의 x 값 인코더. 전체 x 로 만들고, trace 마다 (다운샘플링된) x 를 넣으면 인코딩한 값을 준다.
+
+    axis 는 x 축 layout 에 더할 설정 (날짜면 type="date", 범주면 눈금 목록).
+    """
+
+    def __init__(self, x, enabled=None):
+        self.kind = None
+        self.axis = {}
+        self._x = x
+        self._codes = None
+        if not (ENABLED if enabled is None else enabled):
+            return
+        if x.dtype.kind == "M":
+            self.kind = "date"
+            self.axis = {"type": "date"}
+        elif x.dtype == object and len(x):
+            codes, uniques = pd.factorize(x)
+            if len(uniques) <= MAX_DICT_CATEGORIES and len(x) >= MIN_REPEAT * len(uniques):
+                self.kind = "category"
+                self._categories = pd.Index(uniques)
+                self._codes = self._pack(codes)
+                step = -(-len(uniques) // MAX_TICK_LABELS)
+                ticks = range(0, len(uniques), step)
+                self.axis = {
+                    "type": "linear",
+                    "tickmode": "array",
+                    "tickvals": list(ticks),
+                    "ticktext": [str(uniques[i]) for i in ticks],
+                    "showgrid": False,
+                    "zeroline": False,
+                }
+
+    def _pack(self, codes):
+        if (codes < 0).any():
+            # 빈칸(-1)은 NaN 으로 (그 점은 그리지 않는다)
+            return np.where(codes < 0, np.nan, codes).astype("float32")
+        return codes.astype(_smallest_int(len(self._categories)))
+
+    def __call__(self, values):
+        if self.kind is None:
+            return values
+        if self.kind == "date":
+            ms = values.astype("datetime64[ms]")
+            out = ms.astype("int64").astype("float64")
+            out[np.isnat(ms)] = np.nan
+            return out
+        if values is self._x:
+            return self._codes
+        return self._pack(self._categories.get_indexer(values))
+
+
+def _plain(value):
+    """typed array 를 쓰지 않던 때처럼 numpy 배열(과 plotly 가 미리 바꿔 둔 bdata)을 JSON 목록으로"""
+    if isinstance(value, dict):
+        if "bdata" in value and "dtype" in value:
+            array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+            return _plain(array.reshape(value["shape"]) if "shape" in value else array)
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "M":
+            return [None if nat else text for text, nat in zip(np.datetime_as_string(value), np.isnat(value))]
+        return [None if isinstance(v, float) and np.isnan(v) else v for v in value.tolist()]
+    return value
+
+
+def payload_report(fig, plain=None):
+    """Figure 를 st.plotly_chart 처럼 직렬화했을 때의 바이트와 시간.
+
+    plain 을 주면 (인코딩하지 않은 같은 그래프) 숫자/날짜/글자를 JSON 목록으로 보낼 때와 비교한다.
+    """
+    start = time.perf_counter()
+    encoded = pio.to_json(fig, validate=False).encode("utf-8")
+    seconds = time.perf_counter() - start
+    report = {
+        "bytes": len(encoded),
+        "seconds": seconds,
+        "deflate_bytes": len(zlib.compress(encoded, 6)),
+    }
+    if plain is not None:
+        start = time.perf_counter()
+        as_lists = json.dumps(_plain(plain.to_plotly_json()), ensure_ascii=False).encode("utf-8")
+        report["plain_bytes"] = len(as_lists)
+        report["plain_seconds"] = time.perf_counter() - start
+        report["plain_deflate_bytes"] = len(zlib.compress(as_lists, 6))
+    return report
+
+
+def format_payload_report(report):
+    def size(n):
+        return f"{n / 1024:,.0f}KB" if n < 1024 * 1024 else f"{n / 1024 / 1024:,.1f}MB"
+
+    text = (f"보내는 크기 {size(report['bytes'])} (압축 {size(report['deflate_bytes'])}), "
+            f"직렬화 {report['seconds'] * 1000:,.0f}ms")
+    if "plain_bytes" in report:
+        text = (f"인코딩 전 {size(report['plain_bytes'])} (압축 {size(report['plain_deflate_bytes'])}), "
+                f"{report['plain_seconds'] * 1000:,.0f}ms → 인코딩 후 " + text)
+    return text
@@ -0,0 +1,142 @@
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# 읽어 들인 DataFrame 의 메모리를 줄이는 모듈
+# - 정수 열은 값 범위에 맞는 가장 작은 정수형으로 (int64 -> int8/16/32)
+# - 실수 열은 float32 로 바꿔도 값이 그대로인 경우에만 float32 로
+# - 같은 글자가 반복되는 문자열 열은 category 로
+# - "2015년 12월 1일", "2025.06.09 오후 1:00" 같은 한국식 날짜 문자열 열은 datetime64 로
+#   (날짜로 읽히지 않는 값이 하나라도 있으면 글자 그대로 둔다)
+# 실수를 float32 로 바꾸는 것도 값이 그대로일 때만이므로 그래프/통계 결과는 그대로다.
+
+CATEGORY_RATIO = 0.5   # 서로 다른 값 개수 / 행 수 가 이보다 작으면 category
+DATE_SAMPLE = 200      # 날짜 열인지 먼저 빠르게 볼 때 앞에서부터 확인할 값 개수
+
+# 날짜처럼 시작하는 문자열만 후보로 (예: "1반", "서울" 은 건드리지 않는다)
+# 연도는 네 자리이거나 "년" 이 붙어야 한다 ("10-1", "01-02" 같은 번호는 날짜가 아니다)
+_DATE_LIKE = re.compile(r"^\s*(\d{4}\s*(년|[./-])|\d{2}\s*년)\s*\d{1,2}")
+_KOREAN_DATE_PARTS = [
+    (re.compile(r"\([월화수목금토일]\)"), " "),   # 요일 "(일)" 을 "일" 보다 먼저
+    (re.compile(r"\s*년\s*"), "-"),
+    (re.compile(r"\s*월\s*"), "-"),
+    (re.compile(r"\s*일\s*"), " "),
+    (re.compile(r"\s*시\s*"), ":"),
+    (re.compile(r"\s*분\s*"), ":"),
+    (re.compile(r"\s*초\s*"), ""),
+]
+
+
+def _compact_int(series):
+    return pd.to_numeric(series, downcast="integer")
+
+
+def _compact_float(series):
+    values = series.to_numpy()
+    small = values.astype("float32")
+    # NaN 끼리는 같다고 본다
+    same = (small == values) | (np.isnan(small) & np.isnan(values))
+    if same.all():
+        return series.astype("float32")
+    return series
+
+
+def _normalize_korean_date(text):
+    """'2015년 12월 1일 오후 3시 5분' -> '2015-12-1 3:5: PM' 처럼 pandas 가 읽을 수 있는 모양으로"""
+    text = str(text).strip()
+    meridiem = ""
+    for word, mark in (("오전", "AM"), ("오후", "PM")):
+        if word in text:
+            text = text.replace(word, " ")
+            meridiem = mark
+    for pattern, repl in _KOREAN_DATE_PARTS:
+        text = pattern.sub(repl, text)
+    text = " ".join(text.split()).rstrip(":-")
+    if meridiem:
+        text = f"{text} {meridiem}"
+    return text
+
+
+def _to_datetime(texts):
+    # 후보는 모두 연도로 시작하므로 "15년 3월 2일" 도 15년 3월 2일로 읽는다
+    return pd.to_datetime(texts.map(_normalize_korean_date), errors="coerce", format="mixed", yearfirst=True)
+
+
+def _parse_dates(series):
+    """날짜 문자열 열이면 datetime64 Series, 아니면 None"""
+    sample = series.dropna().head(DATE_SAMPLE)
+    if not len(sample) or not sample.astype(str).str.match(_DATE_LIKE).all():
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        parsed = _to_datetime(sample)
+        if parsed.isna().any():
+            return None
+        # 같은 문자열은 한 번만 바꾼다
+        uniques = pd.Series(series.dropna().unique())
+        lookup = pd.Series(_to_datetime(uniques).to_numpy(), index=uniques.to_numpy())
+    try:
+        dates = series.map(lookup).astype("datetime64[ns]")
+    except (pd.errors.OutOfBoundsDatetime, ValueError):
+        # datetime64[ns] 로 나타낼 수 없는 연도 (1677년 전, 2262년 뒤) 는 글자 그대로 둔다
+        return None
+    # 뒤쪽에 "미측정" 같은 글자가 섞여 있으면 NaT 로 잃지 않도록 열 전체를 글자 그대로 둔다
+    if dates.isna().sum() != series.isna().sum():
+        return None
+    return dates
+
+
+def _compact_object(series, category_ratio):
+    if not len(series):
+        return series
+    if pd.api.types.infer_dtype(series, skipna=True) != "string":
+        return series
+    dates = _parse_dates(series)
+    if dates is not None:
+        return dates
+    if series.nunique(dropna=True) / len(series) < category_ratio:
+        return series.astype("category")
+    return series
+
+
+def _compact_series(series, category_ratio):
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        return _compact_int(series)
+    if dtype == np.float64:
+        return _compact_float(series)
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        return _compact_object(series, category_ratio)
+    return series
+
+
+def compact(df, category_ratio=CATEGORY_RATIO):
+    """메모리를 줄인 새 DataFrame (원본은 건드리지 않는다)"""
+    if not df.shape[1]:
+        return df.copy()
+    # 열 이름이 겹쳐도 되도록 위치로 꺼낸다
+    parts = [_compact_series(df.iloc[:, i], category_ratio) for i in range(df.shape[1])]
+    result = pd.concat(parts, axis=1)
+    result.columns = df.columns
+    return result
+
+
+def column_nbytes(df):
+    """열 이름 -> 메모리 바이트 (문자열 내용까지 포함)"""
+    return dict(zip(df.columns, df.memory_usage(index=False, deep=True).to_numpy().tolist()))
+
+
+def format_report(before, after):
+    """줄이기 전/후 바이트로 화면에 보여줄 문구"""
+    saved = 1 - after / before if before else 0.0
+    return f"💾 메모리 {_size(before)} → {_size(after)} ({saved:.0%} 절약)"
+
+
+def _size(nbytes):
+    if nbytes >= 1024 ** 2:
+        return f"{nbytes / 1024 ** 2:.1f} MB"
+    return f"{nbytes / 1024:.1f} KB"
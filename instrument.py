@@ -0,0 +1,311 @@
+import bisect
+import math
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from sessions import SessionSweep, current_session_id, ended_sessions
+
+# 재실행이 왜 느린지 보기 위한 단계별 측정
+# - stage("이름") 으로 감싼 구간의 시간(과 메모리 추적을 켰으면 최대 할당량)을 기록한다
+# - 세션별, 프로세스 전체로 최근 WINDOW 번의 기록(분위수용)과 누적 히스토그램(Prometheus 용)을 따로 둔다
+# - 사이드바의 '성능 기록' 토글을 켠 세션이 있으면 tracemalloc 을 켠다 (켜져 있는 동안은 조금 느려진다)
+# - prometheus_text() 로 Prometheus/OpenMetrics 텍스트를 만들고, 파일로 쓰거나 HTTP 로 내보낼 수 있다
+#
+# 기록하는 단계:
+#   upload_hash    업로드 파일 해시 (data_cache)
+#   parse_excel    엑셀 읽기 (+ dtype 줄이기)
+#   parse_csv      CSV 읽기 (+ dtype 줄이기)
+#   load_arrow     디스크의 Arrow 캐시/예시 파일 읽기
+#   select_columns 고른 열만 꺼내기
+#   traces         trace 만들기 (go.Scatter / go.Bar)
+#   layout         Figure + layout 조립
+#   plotly_chart   st.plotly_chart (Figure 직렬화 포함)
+#   to_image       fig.to_image (Kaleido)
+#
+# 환경 변수:
+#   GRAPH_INSTRUMENT=0       기록하지 않기
+#   GRAPH_TRACE_MEMORY=1     처음부터 메모리 추적 켜기
+#   GRAPH_METRICS_FILE=경로   사이드바를 그릴 때마다 Prometheus 텍스트를 이 파일에 쓰기
+#   GRAPH_METRICS_PORT=9464  이 포트에서 /metrics 로 내보내기
+
+ENABLED = os.environ.get("GRAPH_INSTRUMENT", "1") != "0"
+METRICS_FILE = os.environ.get("GRAPH_METRICS_FILE")
+METRICS_PORT = os.environ.get("GRAPH_METRICS_PORT")
+
+WINDOW = 256                 # 분위수를 낼 때 쓰는 최근 기록 개수 (단계마다)
+MAX_SESSIONS = 64
+# 히스토그램 칸 경계 (초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+
+class StageStats:
+    """한 단계의 기록: 최근 WINDOW 번 (시간, 최대 할당 바이트) + 누적 히스토그램"""
+
+    def __init__(self, window=WINDOW):
+        self.recent = deque(maxlen=window)
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.last_peak_bytes = None
+
+    def add(self, seconds, peak_bytes=None):
+        self.recent.append((seconds, peak_bytes))
+        self.bucket_counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        if peak_bytes is not None:
+            self.last_peak_bytes = peak_bytes
+
+    def summary(self):
+        times = sorted(seconds for seconds, _ in self.recent)
+        peaks = [peak for _, peak in self.recent if peak is not None]
+        return {
+            "count": self.count,
+            "last": self.recent[-1][0] if self.recent else None,
+            "p50": _quantile(times, 0.5),
+            "p95": _quantile(times, 0.95),
+            "max": times[-1] if times else None,
+            "peak_bytes": max(peaks) if peaks else None,
+        }
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+_lock = threading.Lock()
+_process = {}                      # 단계 -> StageStats
+_sessions = OrderedDict()          # 세션 id -> {단계 -> StageStats}
+_memory_sessions = set()           # 메모리 추적을 켠 세션
+_local = threading.local()
+_sweep = SessionSweep()
+
+
+def record(name, seconds, peak_bytes=None, session_id=None):
+    """단계 기록 하나를 프로세스 전체와 (있으면) 세션 쪽에 더한다."""
+    with _lock:
+        _process.setdefault(name, StageStats()).add(seconds, peak_bytes)
+        if session_id is not None:
+            stages = _sessions.get(session_id)
+            if stages is None:
+                stages = _sessions[session_id] = {}
+                while len(_sessions) > MAX_SESSIONS:
+                    _sessions.popitem(last=False)
+            else:
+                _sessions.move_to_end(session_id)
+            stages.setdefault(name, StageStats()).add(seconds, peak_bytes)
+    _drop_ended_sessions()
+
+
+@contextmanager
+def stage(name):
+    """with stage("parse_excel"): ... 구간의 시간과 (추적 중이면) 구간 안에서의 최대 할당량을 기록한다.
+
+    안쪽 단계가 있어도 바깥 단계의 최대 할당량은 안쪽까지 포함한다.
+    여러 세션이 동시에 돌면 메모리 값은 다른 세션의 할당도 섞인 근사값이다.
+    """
+    if not ENABLED:
+        yield
+        return
+    tracing = tracemalloc.is_tracing()
+    frames = getattr(_local, "frames", None)
+    if frames is None:
+        frames = _local.frames = []
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if frames:
+            # reset_peak 를 하면 바깥 단계가 보던 최대값이 사라지므로 먼저 넘겨 둔다
+            frames[-1][1] = max(frames[-1][1], peak)
+        tracemalloc.reset_peak()
+        frames.append([current, current])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak_bytes = None
+        if tracing and tracemalloc.is_tracing() and frames:
+            base, seen = frames.pop()
+            peak = max(seen, tracemalloc.get_traced_memory()[1])
+            peak_bytes = max(peak - base, 0)
+            if frames:
+                frames[-1][1] = max(frames[-1][1], peak)
+        record(name, seconds, peak_bytes, session_id=current_session_id())
+
+
+def trace_memory(session_id, on):
+    """세션의 메모리 추적 켜기/끄기. 켠 세션이 하나라도 있으면 tracemalloc 을 켜 둔다."""
+    with _lock:
+        if on:
+            _memory_sessions.add(session_id)
+        else:
+            _memory_sessions.discard(session_id)
+    _apply_tracing()
+
+
+def _drop_ended_sessions():
+    # 토글을 켠 채로 브라우저를 닫은 세션이 tracemalloc 을 계속 켜 두지 않도록 (가끔 한 번씩만 확인)
+    if not _sweep.due():
+        return
+    with _lock:
+        session_ids = set(_sessions) | _memory_sessions
+    dead = ended_sessions(session_ids)
+    if not dead:
+        return
+    with _lock:
+        for session_id in dead:
+            _sessions.pop(session_id, None)
+            _memory_sessions.discard(session_id)
+    _apply_tracing()
+
+
+def _apply_tracing():
+    with _lock:
+        wanted = bool(_memory_sessions) or os.environ.get("GRAPH_TRACE_MEMORY") == "1"
+    if wanted and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not wanted and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def snapshot(session_id=None):
+    """{단계: summary} (session_id 를 주면 그 세션 것만)"""
+    with _lock:
+        stages = _process if session_id is None else _sessions.get(session_id, {})
+        return {name: stats.summary() for name, stats in stages.items()}
+
+
+def clear():
+    with _lock:
+        _process.clear()
+        _sessions.clear()
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(openmetrics=False):
+    """프로세스 전체 기록을 Prometheus 텍스트 (openmetrics 면 OpenMetrics) 형식으로"""
+    with _lock:
+        stages = {name: (list(stats.bucket_counts), stats.count, stats.total_seconds, stats.last_peak_bytes)
+                  for name, stats in sorted(_process.items())}
+    seconds = "graph_stage_duration_seconds"
+    peak = "graph_stage_peak_alloc_bytes"
+    lines = [f"# HELP {seconds} 단계별 실행 시간", f"# TYPE {seconds} histogram"]
+    if openmetrics:
+        lines.append(f"# UNIT {seconds} seconds")
+    for name, (counts, count, total, _) in stages.items():
+        label = f'stage="{_label_value(name)}"'
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            le = "+Inf" if math.isinf(bound) else repr(bound)
+            lines.append(f'{seconds}_bucket{{{label},le="{le}"}} {cumulative}')
+        lines.append(f"{seconds}_sum{{{label}}} {total!r}")
+        lines.append(f"{seconds}_count{{{label}}} {count}")
+    lines += [f"# HELP {peak} 단계 안에서 마지막으로 잰 최대 할당량 (메모리 추적을 켰을 때만)",
+              f"# TYPE {peak} gauge"]
+    if openmetrics:
+        lines.append(f"# UNIT {peak} bytes")
+    for name, (_, _, _, last_peak) in stages.items():
+        if last_peak is not None:
+            lines.append(f'{peak}{{stage="{_label_value(name)}"}} {last_peak}')
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path, openmetrics=False):
+    """prometheus_text 를 파일에 쓴다 (node_exporter textfile collector 등이 읽을 수 있게 통째로 바꿔 쓴다)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(openmetrics=openmetrics))
+    os.replace(tmp, path)
+
+
+_server = None
+
+
+def serve(port):
+    """port 에서 GET /metrics 로 Prometheus 텍스트를 내보내는 스레드를 띄운다 (한 번만)."""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            body = prometheus_text(openmetrics=openmetrics).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8"
+                             if openmetrics else "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("127.0.0.1", int(port)), Handler)
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
+
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart 와 같지만 걸린 시간을 'plotly_chart' 단계로 기록한다."""
+    import streamlit as st
+
+    with stage("plotly_chart"):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def _format_table(summaries):
+    rows = []
+    for name, s in summaries.items():
+        rows.append({
+            "단계": name,
+            "횟수": s["count"],
+            "마지막(ms)": round(s["last"] * 1000, 1) if s["last"] is not None else None,
+            "중앙값(ms)": round(s["p50"] * 1000, 1) if s["p50"] is not None else None,
+            "p95(ms)": round(s["p95"] * 1000, 1) if s["p95"] is not None else None,
+            "최대 할당(MB)": round(s["peak_bytes"] / 1e6, 2) if s["peak_bytes"] is not None else None,
+        })
+    return rows
+
+
+def debug_sidebar():
+    """Streamlit 페이지용: 사이드바의 '성능 기록' 토글과 단계별 기록 표. 페이지 맨 끝에서 부른다."""
+    import streamlit as st
+
+    if METRICS_PORT:
+        serve(METRICS_PORT)
+    session_id = current_session_id()
+    on = st.sidebar.toggle("🐞 성능 기록 보기", key="debug_instrument",
+                           help="단계별 실행 시간과 메모리 사용량을 봅니다. 켜 두면 메모리 추적 때문에 조금 느려집니다.")
+    trace_memory(session_id, on)
+    if METRICS_FILE:
+        write_metrics(METRICS_FILE)
+    if not on:
+        return
+    if not ENABLED:
+        st.sidebar.info("GRAPH_INSTRUMENT=0 이라서 기록하지 않고 있습니다.")
+        return
+    st.sidebar.caption("이 세션 (최근 기록 기준, 메모리는 토글을 켠 뒤부터)")
+    st.sidebar.dataframe(_format_table(snapshot(session_id)), hide_index=True)
+    st.sidebar.caption("서버 전체")
+    st.sidebar.dataframe(_format_table(snapshot()), hide_index=True)
+    st.sidebar.download_button("📈 Prometheus 텍스트 내려받기", prometheus_text(),
+                               file_name="graph_metrics.prom", mime="text/plain")
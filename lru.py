@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict
+
+# 여러 세션(스레드)이 같이 쓰는 LRU 캐시
+# 그래프/요약/통계 모듈의 결과 캐시와 data_cache.FrameCache 가 모두 이것을 쓴다.
+# 크기는 기본으로 항목 개수, sizeof 를 주면 그 값(예: 바이트)의 합으로 잰다.
+
+
+class LRUCache:
+    """크기 상한이 있는 LRU 캐시. 상한을 넘으면 오래 안 쓴 것부터 지운다.
+
+    sizeof(value) 는 항목 하나의 크기 (기본 1 = 항목 개수로 잰다).
+    상한보다 큰 항목 하나는 넣지 않고 그대로 돌려준다.
+    하위 클래스는 _keep(key) 로 지우면 안 되는 항목을 고를 수 있다.
+    """
+
+    def __init__(self, max_size, sizeof=None):
+        self.max_size = max_size
+        self._sizeof = sizeof
+        self._items = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _size(self, value):
+        return 1 if self._sizeof is None else self._sizeof(value)
+
+    def get(self, key):
+        """값 (없으면 None). 찾으면 가장 최근에 쓴 것으로 옮긴다."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        """value 를 넣고 그대로 돌려준다."""
+        size = self._size(value)
+        with self._lock:
+            if key in self._items:
+                self.total_size -= self._items.pop(key)[1]
+            if size > self.max_size:
+                return value
+            self._items[key] = (value, size)
+            self.total_size += size
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, compute):
+        """캐시에 있으면 그것을, 없으면 compute() 결과를 넣고 돌려준다.
+
+        compute 는 잠금 밖에서 부르므로 같은 키를 동시에 두 번 계산할 수는 있다 (결과는 같다).
+        """
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def pop(self, key):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is None:
+                return None
+            self.total_size -= item[1]
+            return item[0]
+
+    def _keep(self, key):
+        return False
+
+    def _evict(self):
+        # self._lock 을 잡은 채로 부른다
+        if self.total_size <= self.max_size:
+            return
+        for old_key in list(self._items):
+            if self._keep(old_key):
+                continue
+            self.total_size -= self._items.pop(old_key)[1]
+            self.evictions += 1
+            if self.total_size <= self.max_size:
+                return
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.total_size = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
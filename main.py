@@ -1,7 +1,15 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 import os
+from data_cache import load_csv, memory_caption, upload_digest
+from density import BINS, DENSITY_THRESHOLD, density
+from instrument import debug_sidebar
+from startup import PREWARM_MODULES, prewarm
+
+PROGRESS_MIN_BYTES = 20 * 1024 * 1024
+
+# matplotlib 은 불러오는 데 오래 걸리므로 페이지를 열 때는 백그라운드에서 불러 두고, 그래프를 그릴 때 쓴다
+prewarm(PREWARM_MODULES + ("matplotlib.figure", "matplotlib.colors"))
 
 st.title("CSV 파일 산점도 시각화")
 
@@ -15,17 +23,20 @@ if uploaded_file is not None:
         st.error("CSV 파일만 업로드할 수 있습니다.")
     else:
         try:
-            # CSV 읽기
-            try:
-                df = pd.read_csv(uploaded_file)
-            except UnicodeDecodeError:
-                df = pd.read_csv(uploaded_file, encoding="cp949")
+            # CSV 읽기 (한 번 읽은 파일은 캐시에서). 큰 파일은 읽는 동안 진행률을 보여준다
+            bar = None
+            if uploaded_file.size >= PROGRESS_MIN_BYTES:
+                bar = st.progress(0.0, text="CSV 읽는 중...")
+            df = load_csv(uploaded_file, progress=bar.progress if bar is not None else None)
+            if bar is not None:
+                bar.empty()
+            memory_caption(uploaded_file)
 
             st.subheader("데이터 미리보기")
             st.write(df.head())
 
-            # 숫자형 열 추출
-            numeric_cols = df.select_dtypes(include=["float64", "int64"]).columns.tolist()
+            # 숫자형 열 추출 (읽을 때 int8/float32 등으로 줄인 열도 포함)
+            numeric_cols = df.select_dtypes(include="number").columns.tolist()
 
             if len(numeric_cols) < 2:
                 st.warning("숫자형 열이 2개 이상 필요합니다.")
@@ -33,13 +44,29 @@ if uploaded_file is not None:
                 x_axis = st.selectbox("X축 선택", numeric_cols)
                 y_axis = st.selectbox("Y축 선택", numeric_cols, index=1)
 
-                fig, ax = plt.subplots()
-                ax.scatter(df[x_axis], df[y_axis], alpha=0.6)
+                from matplotlib.colors import LogNorm
+                from matplotlib.figure import Figure
+
+                # pyplot 을 거치지 않는 Figure 라서 plt.close 가 필요 없다
+                fig = Figure()
+                ax = fig.subplots()
+                if len(df) > DENSITY_THRESHOLD:
+                    # 점이 너무 많으면 칸마다 점 개수를 색으로 (행 수와 관계없이 그리는 시간이 일정)
+                    counts, x_edges, y_edges = density(df, x_axis, y_axis, data_key=upload_digest(uploaded_file)[1])
+                    mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts, 0), cmap="viridis",
+                                         norm=LogNorm(vmin=1, vmax=max(int(counts.max()), 1)))
+                    fig.colorbar(mesh, ax=ax, label="점 개수")
+                    ax.set_title(f"{x_axis} vs {y_axis} 밀도")
+                    st.caption(f"점이 {len(df):,}개라서 {BINS}×{BINS} 칸의 밀도 그림으로 보여줍니다.")
+                else:
+                    ax.scatter(df[x_axis], df[y_axis], alpha=0.6)
+                    ax.set_title(f"{x_axis} vs {y_axis} 산점도")
                 ax.set_xlabel(x_axis)
                 ax.set_ylabel(y_axis)
-                ax.set_title(f"{x_axis} vs {y_axis} 산점도")
                 st.pyplot(fig)
         except Exception as e:
             st.error(f"오류 발생: {e}")
 else:
     st.info("CSV 파일을 업로드해 주세요.")
+
+debug_sidebar()
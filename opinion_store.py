@@ -0,0 +1,146 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# 분석 의견 게시판 저장소 (SQLite, WAL 모드)
+# - 의견 등록은 INSERT 한 줄 (파일 전체를 다시 쓰지 않는다)
+# - 삭제는 순서 번호가 아니라 바뀌지 않는 id 로 한다
+# - WAL 모드라 여러 사람이 동시에 써도 글이 사라지지 않고, 읽기는 쓰기를 기다리지 않는다
+#
+# 예전 opinions.csv 가 있으면 처음 열 때 한 번만 옮겨 담고 opinions.csv.migrated 로 이름을 바꾼다.
+
+DB_PATH = os.environ.get("GRAPH_OPINIONS_DB", "opinions.db")
+LEGACY_CSV = "opinions.csv"
+BUSY_TIMEOUT = 5.0
+PAGE_SIZE = 10
+
+# 저장소 파일마다 연결을 하나만 두고 모든 세션(스레드)이 같이 쓴다.
+# sqlite3 연결은 동시에 여러 스레드가 쓰면 안 되므로 _lock 으로 한 번에 하나씩만 쓴다.
+_lock = threading.RLock()
+_conns = {}
+_pid = os.getpid()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS opinions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    name TEXT NOT NULL,
+    body TEXT NOT NULL
+)
+"""
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # WAL 은 파일에 남는 설정이라 연결을 만들 때 한 번만 켜면 된다
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    try:
+        conn.execute(_SCHEMA)
+        _migrate_csv(conn, path)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+def _conn(path=None):
+    # _lock 을 잡은 채로 부를 것
+    global _pid
+    if os.getpid() != _pid:
+        # fork 된 자식 프로세스는 부모의 연결을 쓰면 안 된다 (닫지도 않고 버린다)
+        _conns.clear()
+        _pid = os.getpid()
+    path = path or DB_PATH
+    conn = _conns.get(path)
+    if conn is None:
+        conn = _conns[path] = _connect(path)
+    return conn
+
+
+def close(path=None):
+    """열어 둔 연결을 닫는다. path 가 없으면 전부."""
+    with _lock:
+        paths = list(_conns) if path is None else [path]
+        for key in paths:
+            conn = _conns.pop(key, None)
+            if conn is not None:
+                conn.close()
+
+
+atexit.register(close)
+
+
+def _migrate_csv(conn, path):
+    legacy = os.path.join(os.path.dirname(os.path.abspath(path)), LEGACY_CSV)
+    if not os.path.exists(legacy):
+        return
+    import pandas as pd
+
+    old = pd.read_csv(legacy, dtype=str).fillna("")
+    rows = list(zip(old["작성시간"], old["이름"], old["의견"]))
+    with _transaction(conn):
+        # 다른 프로세스가 먼저 옮겼으면 건너뛴다 (확인과 INSERT 를 한 트랜잭션 안에서)
+        if conn.execute("SELECT 1 FROM opinions LIMIT 1").fetchone() is None:
+            conn.executemany("INSERT INTO opinions (created_at, name, body) VALUES (?, ?, ?)", rows)
+    try:
+        os.replace(legacy, legacy + ".migrated")
+    except FileNotFoundError:
+        pass
+
+
+@contextmanager
+def _transaction(conn):
+    # 쓰기 잠금을 처음부터 잡아서 동시에 쓰는 사람이 있으면 busy_timeout 만큼 기다린다
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def add(name, body, path=None):
+    """의견 하나를 등록하고 id 를 돌려준다."""
+    created_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    with _lock, _transaction(_conn(path)) as conn:
+        cur = conn.execute(
+            "INSERT INTO opinions (created_at, name, body) VALUES (?, ?, ?)",
+            (created_at, name, body),
+        )
+    return cur.lastrowid
+
+
+def delete(opinion_id, path=None):
+    """id 로 지운다. 지웠으면 True (이미 지워졌으면 False)."""
+    with _lock, _transaction(_conn(path)) as conn:
+        cur = conn.execute("DELETE FROM opinions WHERE id = ?", (int(opinion_id),))
+    return cur.rowcount > 0
+
+
+def page(before_id=None, limit=PAGE_SIZE, path=None):
+    """최신순으로 limit 개. before_id 를 주면 그 id 보다 오래된 것부터 (keyset 페이지).
+
+    (의견 목록, 더 오래된 의견이 남아 있는지) 를 돌려준다.
+    OFFSET 을 쓰지 않으므로 몇 번째 쪽이든 id 인덱스로 바로 찾아간다.
+    """
+    sql = "SELECT id, created_at, name, body FROM opinions"
+    params = []
+    if before_id is not None:
+        sql += " WHERE id < ?"
+        params.append(int(before_id))
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(int(limit) + 1)   # 한 개 더 읽어서 다음 쪽이 있는지 안다
+    with _lock:
+        rows = [dict(row) for row in _conn(path).execute(sql, params)]
+    return rows[:limit], len(rows) > limit
+
+
+def count(path=None):
+    with _lock:
+        return _conn(path).execute("SELECT COUNT(*) FROM opinions").fetchone()[0]
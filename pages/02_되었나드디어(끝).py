@@ -1,8 +1,16 @@
+import functools
 import os
-import pandas as pd
+import time
+from pathlib import Path
 import streamlit as st
-import plotly.graph_objects as go
-from scipy.stats import linregress
+import opinion_store
+from aggregate import DEFAULT_BINS, aggregate_controls
+from chart_engine import CHART_TYPES, ChartSpec, build_figure
+from data_cache import dataset_key, load_excel_columns, load_excel_preview, memory_caption, sheet_picker
+from export import png_download_button
+from instrument import debug_sidebar, plotly_chart
+from resample import WINDOWS, is_datetime
+from samples import upload_or_sample
 
 # 스타일
 st.markdown("""
@@ -24,26 +32,56 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-st.title("🌈 데이터 그래프 만들기")
 
-uploaded_file = st.file_uploader("📁 엑셀 파일을 업로드하세요", type=["xlsx"])
+# 페이지를 구역별로 나눠서, 위젯을 건드리면 그 위젯이 있는 구역만 다시 실행한다 (st.fragment)
+# - 업로드/시트 선택: 페이지 전체 (데이터가 바뀌면 모든 구역이 다시 그려져야 하므로)
+# - 그래프 만들기: 제목/축/옵션을 바꾸면 이 구역만
+#   - 내보내기: 그래프 구역 안에 있어서 그래프가 바뀌면 같이, 'PNG 만들기' 등은 이 구역만
+# - 의견 게시판: 데이터나 그래프는 건드리지 않는다
+def timed_section(name):
+    """구역 실행 시간을 재서 구역 맨 아래에 보여준다 (st.session_state.section_timings 에도 남긴다)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            timings = st.session_state.setdefault("section_timings", {})
+            runs = timings.get(name, (0, 0.0))[0] + 1
+            timings[name] = (runs, elapsed)
+            st.caption(f"⏱️ {name}: {elapsed * 1000:,.0f}ms ({runs}번째 실행)")
+            return result
+        return wrapper
+    return decorator
 
-if uploaded_file:
-    df = pd.read_excel(uploaded_file)
 
+@timed_section("데이터 불러오기")
+def ingest_section():
+    uploaded_file = upload_or_sample("📁 엑셀 파일을 업로드하세요", type=["xlsx"])
+    if not uploaded_file:
+        return None, None, None
+    # 열 목록은 미리보기만 읽어서 먼저 보여주고, 실제 데이터는 선택한 열만 읽는다
+    sheet = sheet_picker(uploaded_file)
+    preview = load_excel_preview(uploaded_file, sheet_name=sheet)
+    return uploaded_file, sheet, preview
+
+
+@st.fragment
+@timed_section("그래프 만들기")
+def chart_section(uploaded_file, sheet, preview):
     st.subheader("1️⃣ 그래프 제목 입력")
-    graph_title = st.text_input("여기에 제목을 입력하세요", value="나의 멋진 그래프")
+    graph_title = st.text_input("여기에 제목을 입력하세요", value="나의 멋진 그래프", key="graph_title")
 
     st.subheader("2️⃣ x축 데이터 선택")
-    x_col = st.selectbox("x축에 사용할 열을 선택하세요", df.columns, key="xcol")
+    x_col = st.selectbox("x축에 사용할 열을 선택하세요", preview.columns, key="xcol")
 
     st.subheader("3️⃣ y축 데이터 및 옵션")
     col1, col2 = st.columns(2)
 
     with col1:
-        st.markdown("✔️ y축에 사용할 열을 선택 (최대 2개)")
+        st.markdown("✔️ y축에 사용할 열을 선택 (여러 개 선택 가능)")
         y_selected = []
-        y_candidates = [col for col in df.columns if col != x_col]
+        y_candidates = [col for col in preview.columns if col != x_col]
 
         columns_per_row = 2
         rows = (len(y_candidates) + columns_per_row - 1) // columns_per_row
@@ -58,163 +96,207 @@ if uploaded_file:
                         y_selected.append(col)
 
     with col2:
-        use_dual_y = st.checkbox("▶ y축 2개로 나누기 (좌/우)", value=False)
+        use_dual_y = st.checkbox("▶ 단위별로 y축 나누기", value=False)
         chart_type = st.radio("▶ 그래프 형태", ["꺾은선 그래프", "산점도", "막대그래프"], horizontal=True)
         show_regression = False
+        agg, bucket, bins = None, None, DEFAULT_BINS
+        window = None
+        # 날짜 문자열은 읽을 때 datetime 으로 바뀌므로 미리보기가 아니라 읽은 x 열로 확인한다
+        x_values = load_excel_columns(uploaded_file, [x_col], sheet_name=sheet)[x_col]
+        x_is_time = is_datetime(x_values)
         if chart_type == "산점도":
             show_regression = st.checkbox("📈 회귀선 및 상관계수 표시")
-
-    pastel_colors = [
-        "#A0D8B3", "#AED9E0", "#FFB5E8", "#FFDAC1", "#CBAACB", "#F6DFEB",
-        "#C7CEEA", "#E0BBE4", "#B5EAD7", "#FFABAB"
-    ]
-
-    def extract_unit(col_name):
-        import re
-        match = re.search(r"\((.*?)\)", col_name)
-        return match.group(1) if match else ""
+        if x_is_time:
+            # 날짜 x 축은 시간 간격별 평균(+ 꺾은선이면 최솟값~최댓값 띠)으로
+            window = st.selectbox("▶ 시간 간격", ["auto", None] + list(WINDOWS),
+                                  format_func=lambda w: "자동 (보이는 기간에 맞게)" if w == "auto"
+                                  else "원래 데이터" if w is None else WINDOWS[w][0])
+        elif chart_type != "산점도":
+            # 같은 x 가 여러 행이면 묶어서 요약값만 그린다 (막대가 행마다 하나씩 생기지 않게)
+            agg, bucket, bins = aggregate_controls(x_values)
 
     if y_selected:
-        fig = go.Figure()
-
-        for i, col in enumerate(y_selected):
-            yaxis = "y2" if use_dual_y and i == 1 else "y"
-            mode = "lines+markers" if chart_type == "꺾은선 그래프" else "markers"
-            color = pastel_colors[i % len(pastel_colors)]
-
-            if chart_type == "막대그래프":
-                fig.add_trace(go.Bar(
-                    x=df[x_col],
-                    y=df[col],
-                    name=col,
-                    marker_color=color,
-                    yaxis=yaxis,
-                    offsetgroup=str(i),
-                    hovertemplate=f"{col}: %{{y}} {extract_unit(col)}<extra></extra>"
-                ))
-            else:
-                fig.add_trace(go.Scatter(
-                    x=df[x_col],
-                    y=df[col],
-                    mode=mode,
-                    name=col,
-                    marker=dict(color=color, size=8, opacity=0.6 if chart_type == "산점도" else 1),
-                    line=dict(color=color, width=2),
-                    yaxis=yaxis,
-                    hovertemplate=f"{col}: %{{y}} {extract_unit(col)}<extra></extra>"
-                ))
-
-                if chart_type == "산점도" and show_regression and i == 0:
-                    valid_data = df[[x_col, col]].dropna()
-                    if len(valid_data) > 1:
-                        slope, intercept, r_value, p_value, std_err = linregress(valid_data[x_col], valid_data[col])
-                        reg_line = slope * valid_data[x_col] + intercept
-                        fig.add_trace(go.Scatter(
-                            x=valid_data[x_col],
-                            y=reg_line,
-                            mode="lines",
-                            name=f"회귀선 ({col})",
-                            line=dict(color="#003366", dash="dot"),
-                            hoverinfo="skip"
-                        ))
-                        fig.add_annotation(
-                            xref="paper", yref="paper",
-                            x=0.98, y=0.98,
-                            text=f"<b>상관계수 r = {r_value:.2f}</b>",
-                            showarrow=False,
-                            font=dict(size=14, color="black"),
-                            bgcolor="rgba(255, 243, 211, 0.3)",
-                            bordercolor="#666",
-                            borderwidth=1,
-                            borderpad=6
-                        )
-
-        fig.update_layout(
-            title=dict(text=graph_title, x=0.5, y=0.95, font=dict(size=24)),
-            xaxis_title=x_col,
-            yaxis_title=y_selected[0],
-            yaxis2=dict(
-                title=y_selected[1] if use_dual_y and len(y_selected) > 1 else "",
-                overlaying="y",
-                side="right",
-                showgrid=False
-            ) if use_dual_y and len(y_selected) > 1 else None,
-            legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5),
-            height=500,
-            width=900,
-            margin=dict(t=80, b=100)
+        df = load_excel_columns(uploaded_file, [x_col] + y_selected, sheet_name=sheet)
+        x_range = None
+        if x_is_time and df[x_col].notna().any():
+            start, end = df[x_col].min().to_pydatetime(), df[x_col].max().to_pydatetime()
+            if start < end:
+                x_range = st.slider("🔍 보여줄 기간", min_value=start, max_value=end, value=(start, end),
+                                    format="YYYY-MM-DD HH:mm")
+        spec = ChartSpec(
+            x_col=x_col,
+            y_cols=tuple(y_selected),
+            chart_type=CHART_TYPES[chart_type],
+            dual_y=use_dual_y,
+            regression=show_regression,
+            correlation=show_regression,
+            title=graph_title,
+            agg=agg,
+            bucket=bucket,
+            bins=bins,
+            resample=window,
+            x_range=x_range,
         )
+        fig = build_figure(df, spec, data_key=dataset_key(uploaded_file, sheet))
 
-        st.plotly_chart(fig, use_container_width=True)
-
-        import kaleido
-        img_bytes = fig.to_image(format="png", engine="kaleido", width=1000, height=600)
-        st.download_button(
-            label="📅 그래프 PNG로 저장하기",
-            data=img_bytes,
-            file_name=f"{graph_title}.png",
-            mime="image/png"
-        )
+        plotly_chart(fig, use_container_width=True)
+        memory_caption(uploaded_file)
     else:
+        fig = None
         st.info("y축으로 사용할 데이터를 하나 이상 선택해주세요.")
 
-# 의견 기능 시작
-st.subheader("4️⃣ 📬 분석 의견을 남겨주세요")
-opinion_file = "opinions.csv"
-
-col1, col2 = st.columns([1, 3])
-with col1:
-    user_name = st.text_input("이름", max_chars=20)
-with col2:
-    user_opinion = st.text_area("분석 의견 (예: 상관관계 해석, 데이터 특이사항 등)", height=100)
-
-submit_button = st.button("✏️ 의견 등록")
-
-if submit_button and user_name.strip() and user_opinion.strip():
-    from datetime import datetime
-    new_entry = pd.DataFrame([{
-        "작성시간": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "이름": user_name.strip(),
-        "의견": user_opinion.strip()
-    }])
-    if os.path.exists(opinion_file):
-        old_data = pd.read_csv(opinion_file)
-        all_data = pd.concat([old_data, new_entry], ignore_index=True)
-    else:
-        all_data = new_entry
-    all_data.to_csv(opinion_file, index=False)
-    st.success("의견이 성공적으로 등록되었습니다!")
-elif submit_button:
-    st.warning("이름과 의견을 모두 입력해주세요.")
-
-# 의견 보여주기 + 삭제 확인
-if os.path.exists(opinion_file):
-    st.markdown("### 💬 등록된 의견 (최신순)")
-    opinion_data = pd.read_csv(opinion_file)
-    opinion_data = opinion_data[::-1].reset_index(drop=True)
-
-    if "pending_delete_index" not in st.session_state:
-        st.session_state.pending_delete_index = None
-
-    for i, row in opinion_data.iterrows():
-        with st.container():
-            st.markdown(f"**🧑‍💼 {row['이름']}** ({row['작성시간']})")
-            st.markdown(f"> {row['의견']}")
-
-            if st.session_state.pending_delete_index == i:
-                col_del1, col_del2 = st.columns([1, 2])
-                with col_del1:
-                    if st.button("✅ 예, 삭제", key=f"confirm_{i}"):
-                        opinion_data.drop(i, inplace=True)
-                        opinion_data[::-1].to_csv(opinion_file, index=False)
-                        st.session_state.pending_delete_index = None
-                        st.success("의견이 삭제되었습니다.")
-                        st.rerun()
-                with col_del2:
-                    if st.button("❌ 취소", key=f"cancel_{i}"):
-                        st.session_state.pending_delete_index = None
-                        st.rerun()
+    export_section(uploaded_file, sheet, fig, graph_title, x_col)
+
+
+@st.fragment
+@timed_section("내보내기")
+def export_section(uploaded_file, sheet, fig, graph_title, x_col):
+    if fig is not None:
+        png_download_button(fig, f"{graph_title}.png", label="📅 그래프 PNG로 저장하기")
+
+    # 숫자 열마다 그래프를 한 장씩 그려서 한 번에 저장
+    with st.expander("📦 여러 그래프 한 번에 저장하기"):
+        batch_type = st.radio("그래프 형태", ["꺾은선 그래프", "산점도", "막대그래프"],
+                              horizontal=True, key="batch_type")
+        batch_format = st.radio("저장 형식", ["ZIP (PNG)", "ZIP (SVG)", "PDF (여러 쪽)"],
+                                horizontal=True, key="batch_format")
+        if st.button("🚀 전체 그래프 만들기", key="batch_run"):
+            from batch_export import export_charts, format_report, new_output, remove_output, specs_per_column
+            from data_cache import load_excel
+
+            full_df = load_excel(uploaded_file, sheet_name=sheet)
+            specs = specs_per_column(full_df, x_col, CHART_TYPES[batch_type])
+            if not specs:
+                st.warning("그래프로 그릴 숫자 열이 없습니다.")
             else:
-                if st.button("🗑️ 삭제", key=f"delete_{i}"):
-                    st.session_state.pending_delete_index = i
-                    st.rerun()
+                as_pdf = batch_format.startswith("PDF")
+                suffix = ".pdf" if as_pdf else ".zip"
+                fmt = "svg" if "SVG" in batch_format else "png"
+                bar = st.progress(0.0, text=f"0 / {len(specs)}")
+                out_path = new_output(suffix)
+                try:
+                    report = export_charts(
+                        full_df, specs, out_path, fmt=fmt,
+                        progress=lambda done, total: bar.progress(done / total, text=f"{done} / {total}"),
+                    )
+                except Exception as e:
+                    remove_output(out_path)
+                    st.error(f"그래프를 저장하지 못했습니다: {e}")
+                else:
+                    # 세션에는 파일 경로와 요약만 둔다 (바이트는 내려받을 때 읽는다)
+                    if "batch_result" in st.session_state:
+                        remove_output(st.session_state.batch_result[1])
+                    st.session_state.batch_result = (f"{graph_title}{suffix}", out_path, format_report(report))
+        if "batch_result" in st.session_state:
+            name, path, summary = st.session_state.batch_result
+            if not os.path.exists(path):
+                # 오래되어 지워졌다
+                del st.session_state.batch_result
+            else:
+                st.caption(summary)
+                st.download_button(
+                    label=f"📥 {name} 내려받기",
+                    data=lambda: Path(path).read_bytes(),
+                    file_name=name,
+                    mime="application/pdf" if name.endswith(".pdf") else "application/zip"
+                )
+
+
+# 의견 게시판 버튼은 콜백으로 상태만 바꾼다. 콜백은 구역이 다시 실행되기 전에 불리므로 st.rerun 이 필요 없다.
+def ask_delete(opinion_id):
+    st.session_state.pending_delete_id = opinion_id
+
+
+def confirm_delete(opinion_id):
+    opinion_store.delete(opinion_id)
+    st.session_state.pending_delete_id = None
+    st.session_state.opinion_notice = "의견이 삭제되었습니다."
+
+
+def show_newer():
+    st.session_state.opinion_cursors.pop()
+
+
+def show_older(before_id):
+    st.session_state.opinion_cursors.append(before_id)
+
+
+def show_first():
+    st.session_state.opinion_cursors = [None]
+
+
+@st.fragment
+@timed_section("의견 게시판")
+def opinion_section():
+    st.subheader("4️⃣ 📬 분석 의견을 남겨주세요")
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        user_name = st.text_input("이름", max_chars=20, key="opinion_name")
+    with col2:
+        user_opinion = st.text_area("분석 의견 (예: 상관관계 해석, 데이터 특이사항 등)", height=100, key="opinion_body")
+
+    submit_button = st.button("✏️ 의견 등록", key="opinion_submit")
+
+    if submit_button and user_name.strip() and user_opinion.strip():
+        opinion_store.add(user_name.strip(), user_opinion.strip())
+        st.session_state.opinion_cursors = [None]     # 새 의견이 보이도록 첫 쪽으로
+        st.success("의견이 성공적으로 등록되었습니다!")
+    elif submit_button:
+        st.warning("이름과 의견을 모두 입력해주세요.")
+
+    # 의견 보여주기 + 삭제 확인
+    # 한 쪽(PAGE_SIZE 개)만 불러와서 그린다. 쪽 이동은 마지막 id 를 기준으로 한다 (keyset).
+    if "opinion_cursors" not in st.session_state:
+        st.session_state.opinion_cursors = [None]     # 각 쪽의 before_id (첫 쪽은 None)
+    if "pending_delete_id" not in st.session_state:
+        st.session_state.pending_delete_id = None
+
+    opinions, has_older = opinion_store.page(before_id=st.session_state.opinion_cursors[-1])
+    if not opinions and len(st.session_state.opinion_cursors) > 1:
+        # 보고 있던 쪽의 의견이 모두 지워졌으면 앞 쪽으로
+        st.session_state.opinion_cursors.pop()
+        opinions, has_older = opinion_store.page(before_id=st.session_state.opinion_cursors[-1])
+
+    if opinions:
+        page_no = len(st.session_state.opinion_cursors)
+        st.markdown(f"### 💬 등록된 의견 (최신순, {page_no}쪽 / 전체 {opinion_store.count()}개)")
+        notice = st.session_state.pop("opinion_notice", None)
+        if notice:
+            st.success(notice)
+
+        for row in opinions:
+            opinion_id = row["id"]
+            with st.container():
+                st.markdown(f"**🧑‍💼 {row['name']}** ({row['created_at']})")
+                st.markdown(f"> {row['body']}")
+
+                if st.session_state.pending_delete_id == opinion_id:
+                    col_del1, col_del2 = st.columns([1, 2])
+                    with col_del1:
+                        st.button("✅ 예, 삭제", key=f"confirm_{opinion_id}", on_click=confirm_delete, args=(opinion_id,))
+                    with col_del2:
+                        st.button("❌ 취소", key=f"cancel_{opinion_id}", on_click=ask_delete, args=(None,))
+                else:
+                    st.button("🗑️ 삭제", key=f"delete_{opinion_id}", on_click=ask_delete, args=(opinion_id,))
+
+        nav1, nav2, nav3 = st.columns([1, 1, 2])
+        with nav1:
+            st.button("⬅️ 최신 의견", disabled=page_no == 1, key="opinion_newer", on_click=show_newer)
+        with nav2:
+            st.button("이전 의견 ➡️", disabled=not has_older, key="opinion_older",
+                      on_click=show_older, args=(opinions[-1]["id"],))
+        with nav3:
+            if page_no > 1:
+                st.button("⏫ 처음으로", key="opinion_first", on_click=show_first)
+
+st.title("🌈 데이터 그래프 만들기")
+
+uploaded_file, sheet, preview = ingest_section()
+if uploaded_file:
+    chart_section(uploaded_file, sheet, preview)
+
+# 의견 기능 시작
+opinion_section()
+
+debug_sidebar()
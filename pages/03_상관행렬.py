@@ -0,0 +1,95 @@
+import streamlit as st
+import plotly.graph_objects as go
+from chart_engine import ChartSpec, build_figure
+from correlation import correlation_matrix, numeric_columns, top_pairs
+from data_cache import dataset_key, load_excel, memory_caption, sheet_picker
+from instrument import debug_sidebar, plotly_chart
+from samples import upload_or_sample
+from stats_service import regress
+
+st.title("🧮 상관행렬 한눈에 보기")
+
+uploaded_file = upload_or_sample("📁 엑셀 파일을 업로드하세요", type=["xlsx"])
+
+if uploaded_file:
+    sheet = sheet_picker(uploaded_file)
+    df = load_excel(uploaded_file, sheet_name=sheet)
+    memory_caption(uploaded_file)
+    data_key = dataset_key(uploaded_file, sheet)
+    num_cols = numeric_columns(df)
+
+    if len(num_cols) < 2:
+        st.warning("숫자형 열이 2개 이상 필요합니다.")
+    else:
+        st.subheader("1️⃣ 상관계수 종류")
+        method_label = st.radio("상관계수", ["피어슨", "스피어만(순위)"], horizontal=True)
+        method = "pearson" if method_label == "피어슨" else "spearman"
+
+        # 처음 계산할 때만 진행률을 보여 준다 (빈칸이 있으면 행 수 × 열 수² 에 비례해서 오래 걸릴 수 있다)
+        bar = []
+
+        def progress(done):
+            if not bar:
+                bar.append(st.progress(0.0))
+            bar[0].progress(done, text=f"상관행렬 계산 중... (열 {len(num_cols)}개 × 행 {len(df):,}개)")
+
+        corr, counts = correlation_matrix(df, num_cols, method=method, data_key=data_key, progress=progress)
+        if bar:
+            bar[0].empty()
+
+        st.subheader("2️⃣ 상관행렬")
+        heatmap = go.Figure(go.Heatmap(
+            z=corr.to_numpy(),
+            x=num_cols,
+            y=num_cols,
+            customdata=counts.to_numpy(),
+            zmin=-1,
+            zmax=1,
+            colorscale="RdBu_r",
+            hovertemplate="%{y} ↔ %{x}<br>r = %{z:.2f}<br>n = %{customdata}<extra></extra>",
+        ))
+        size = min(900, 200 + 25 * len(num_cols))
+        heatmap.update_layout(height=size, margin=dict(t=30, b=30), yaxis=dict(autorange="reversed"))
+        event = plotly_chart(heatmap, use_container_width=True, on_select="rerun", key="corr_heatmap")
+
+        st.markdown("🔎 상관이 강한 열 쌍")
+        pairs = top_pairs(corr, k=10)
+        st.dataframe(pairs.round(3), use_container_width=True, hide_index=True)
+
+        # 히트맵 칸을 누르면 그 쌍으로, 아니면 가장 강한 쌍으로 산점도를 보여준다
+        points = event.selection.points if event and event.selection else []
+        if points and points[0].get("x") in num_cols and points[0].get("y") in num_cols:
+            default_x, default_y = points[0]["x"], points[0]["y"]
+        elif len(pairs):
+            default_x, default_y = pairs.loc[0, "x"], pairs.loc[0, "y"]
+        else:
+            default_x, default_y = num_cols[0], num_cols[1]
+
+        st.subheader("3️⃣ 자세히 보기")
+        col1, col2 = st.columns(2)
+        with col1:
+            x_col = st.selectbox("x축", num_cols, index=num_cols.index(default_x))
+        with col2:
+            y_choices = [col for col in num_cols if col != x_col]
+            y_col = st.selectbox("y축", y_choices,
+                                 index=y_choices.index(default_y) if default_y in y_choices else 0)
+
+        spec = ChartSpec(
+            x_col=x_col,
+            y_cols=(y_col,),
+            chart_type="scatter",
+            regression=True,
+            correlation=True,
+            title=f"{x_col} vs {y_col}",
+        )
+        plotly_chart(build_figure(df, spec, data_key=data_key), use_container_width=True)
+
+        fit = regress(df, x_col, [y_col], data_key=data_key).loc[y_col]
+        st.markdown(
+            f"기울기 **{fit['slope']:.4g}**, 절편 **{fit['intercept']:.4g}**, "
+            f"r = **{fit['r']:.3f}**, p = **{fit['p']:.3g}**, n = **{int(fit['n'])}**"
+        )
+else:
+    st.info("엑셀 파일을 업로드해 주세요.")
+
+debug_sidebar()
@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
+from chart_engine import ChartSpec, build_figure
+from data_cache import dataset_key, load_excel, memory_caption, sheet_picker
+from instrument import debug_sidebar, plotly_chart
+from samples import upload_or_sample
 
 # 기본 설정
 st.set_page_config(page_title="📊 엑셀 그래프 시각화", layout="wide")
@@ -14,10 +16,12 @@ with col2:
     st.divider()
 
 # 파일 업로드
-uploaded_file = st.file_uploader("📂 엑셀 파일 업로드", type=["xlsx", "xls"])
+uploaded_file = upload_or_sample("📂 엑셀 파일 업로드", type=["xlsx", "xls"])
 
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
+    sheet = sheet_picker(uploaded_file)
+    df = load_excel(uploaded_file, sheet_name=sheet)
+    memory_caption(uploaded_file)
     st.success("✅ 파일 업로드 성공!")
     st.dataframe(df.head(), use_container_width=True)
 
@@ -28,66 +32,31 @@ if uploaded_file:
         # x축 선택
         x_col = st.selectbox("🧭 x축으로 사용할 열을 선택하세요", df.columns)
 
-        # y축 열 선택 (checkbox로 최대 2개)
-        st.markdown("📊 y축으로 사용할 열을 최대 2개까지 선택하세요:")
+        # y축 열 선택 (checkbox, 여러 개 가능)
+        st.markdown("📊 y축으로 사용할 열을 선택하세요 (여러 개 가능):")
         y_selected = []
         for col in df.columns:
             if col != x_col:
                 if st.checkbox(col, key=col):
                     y_selected.append(col)
 
-        # 이중 y축 여부
-        use_dual_y = st.checkbox("🔀 y축을 좌우 2개로 나눠서 보기 (단위가 다를 때 체크)", value=False)
+        # 단위별 y축 여부
+        use_dual_y = st.checkbox("🔀 단위별로 y축을 나눠서 보기 (단위가 다를 때 체크)", value=False)
 
         if len(y_selected) == 0:
             st.warning("최소 1개의 y축 열을 선택하세요.")
-        elif len(y_selected) > 2:
-            st.error("2개까지만 선택할 수 있어요.")
         else:
-            fig = go.Figure()
-
-            # 첫 번째 y축 데이터
-            fig.add_trace(go.Scatter(
-                x=df[x_col],
-                y=df[y_selected[0]],
-                mode='lines+markers',
-                name=y_selected[0],
-                yaxis='y1'
-            ))
-
-            # 두 번째 y축 데이터
-            if len(y_selected) == 2:
-                fig.add_trace(go.Scatter(
-                    x=df[x_col],
-                    y=df[y_selected[1]],
-                    mode='lines+markers',
-                    name=y_selected[1],
-                    yaxis='y2' if use_dual_y else 'y1'
-                ))
-
-            # 레이아웃 설정
-            layout = {
-                'title': {
-                    'text': f"<b>{graph_title}</b>",
-                    'x': 0.5,
-                    'xanchor': 'center',
-                    'font': {'size': 20, 'family': 'Nanum Gothic, sans-serif'}
-                },
-                'xaxis': {'title': x_col},
-                'yaxis': {'title': y_selected[0]},
-                'font': {'family': 'Nanum Gothic, sans-serif', 'size': 14},
-                'legend': {'x': 0, 'y': 1.15, 'orientation': "h"},
-                'margin': {'t': 100, 'b': 50, 'l': 60, 'r': 60}
-            }
-
-            if len(y_selected) == 2 and use_dual_y:
-                layout['yaxis2'] = {
-                    'title': y_selected[1],
-                    'overlaying': 'y',
-                    'side': 'right'
-                }
-
-            fig.update_layout(layout)
+            spec = ChartSpec(
+                x_col=x_col,
+                y_cols=tuple(y_selected),
+                chart_type="line",
+                dual_y=use_dual_y,
+                title=graph_title,
+                theme="basic",
+            )
+            fig = build_figure(df, spec, data_key=dataset_key(uploaded_file, sheet))
 
             with col2:
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
+
+debug_sidebar()
@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
+from chart_engine import ChartSpec, build_figure
+from data_cache import dataset_key, load_excel, memory_caption, sheet_picker
+from instrument import debug_sidebar, plotly_chart
+from samples import upload_or_sample
 
 # 페이지 설정 (기본 밝은 테마 유지)
 st.set_page_config(page_title="📊 엑셀 그래프 만들기", layout="wide")
@@ -53,10 +55,12 @@ with col2:
     st.markdown("<p style='text-align: center; font-size: 16px;'>엑셀 데이터를 올리고, x축과 y축을 선택해서 예쁜 그래프를 만들어보세요!</p>", unsafe_allow_html=True)
     st.divider()
 
-uploaded_file = st.file_uploader("📂 엑셀 파일 업로드", type=["xlsx", "xls"])
+uploaded_file = upload_or_sample("📂 엑셀 파일 업로드", type=["xlsx", "xls"])
 
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
+    sheet = sheet_picker(uploaded_file)
+    df = load_excel(uploaded_file, sheet_name=sheet)
+    memory_caption(uploaded_file)
     st.success("✅ 파일 업로드 성공!")
     st.dataframe(df.head(), use_container_width=True)
 
@@ -65,61 +69,29 @@ if uploaded_file:
 
         x_col = st.selectbox("🔹 x축으로 사용할 열 선택", df.columns)
 
-        st.markdown("🔸 y축으로 사용할 열을 <b>최대 2개</b>까지 체크하세요:", unsafe_allow_html=True)
+        st.markdown("🔸 y축으로 사용할 열을 <b>여러 개</b> 체크할 수 있어요:", unsafe_allow_html=True)
         y_selected = []
         for col in df.columns:
             if col != x_col:
                 if st.checkbox(col, key=col):
                     y_selected.append(col)
 
-        use_dual_y = st.checkbox("🔀 y축을 좌/우 2개로 나누기 (단위 다를 때 체크)", value=False)
+        use_dual_y = st.checkbox("🔀 단위별로 y축 나누기 (단위 다를 때 체크)", value=False)
 
         if len(y_selected) == 0:
             st.warning("y축으로 최소 1개 이상 선택하세요.")
-        elif len(y_selected) > 2:
-            st.error("y축은 최대 2개까지만 선택할 수 있어요.")
         else:
-            fig = go.Figure()
-
-            fig.add_trace(go.Scatter(
-                x=df[x_col],
-                y=df[y_selected[0]],
-                mode='lines+markers',
-                name=y_selected[0],
-                yaxis='y1'
-            ))
-
-            if len(y_selected) == 2:
-                fig.add_trace(go.Scatter(
-                    x=df[x_col],
-                    y=df[y_selected[1]],
-                    mode='lines+markers',
-                    name=y_selected[1],
-                    yaxis='y2' if use_dual_y else 'y1'
-                ))
-
-            layout = {
-                'title': {
-                    'text': f"<b>{graph_title}</b>",
-                    'x': 0.5,
-                    'xanchor': 'center',
-                    'font': {'size': 20, 'family': 'Nanum Gothic, sans-serif'}
-                },
-                'xaxis': {'title': x_col},
-                'yaxis': {'title': y_selected[0]},
-                'font': {'family': 'Nanum Gothic, sans-serif', 'size': 14},
-                'legend': {'x': 0, 'y': 1.15, 'orientation': "h"},
-                'margin': {'t': 100, 'b': 50, 'l': 60, 'r': 60}
-            }
-
-            if len(y_selected) == 2 and use_dual_y:
-                layout['yaxis2'] = {
-                    'title': y_selected[1],
-                    'overlaying': 'y',
-                    'side': 'right'
-                }
-
-            fig.update_layout(layout)
+            spec = ChartSpec(
+                x_col=x_col,
+                y_cols=tuple(y_selected),
+                chart_type="line",
+                dual_y=use_dual_y,
+                title=graph_title,
+                theme="basic",
+            )
+            fig = build_figure(df, spec, data_key=dataset_key(uploaded_file, sheet))
 
             with col2:
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
+
+debug_sidebar()
@@ -1,6 +1,9 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
+from aggregate import DEFAULT_BINS, aggregate_controls
+from chart_engine import CHART_TYPES, ChartSpec, build_figure
+from data_cache import dataset_key, load_excel, memory_caption, sheet_picker
+from instrument import debug_sidebar, plotly_chart
+from samples import upload_or_sample
 
 # 페이지 설정
 st.set_page_config(page_title="📊 엑셀 그래프 만들기", layout="wide")
@@ -46,9 +49,11 @@ with col2:
     st.markdown("<p style='text-align: center;'>데이터를 올리고 원하는 축을 선택하면, 예쁜 파스텔톤 그래프가 완성돼요!</p>", unsafe_allow_html=True)
 
 # ===== 📂 파일 업로드 =====
-uploaded_file = st.file_uploader("엑셀 파일 업로드", type=["xlsx", "xls"])
+uploaded_file = upload_or_sample("엑셀 파일 업로드", type=["xlsx", "xls"])
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
+    sheet = sheet_picker(uploaded_file)
+    df = load_excel(uploaded_file, sheet_name=sheet)
+    memory_caption(uploaded_file)
     st.success("✅ 업로드 성공! 아래에서 그래프 설정을 해보세요.")
     st.dataframe(df.head(), use_container_width=True)
 
@@ -56,88 +61,38 @@ if uploaded_file:
         graph_title = st.text_input("그래프 제목", value="그래프 제목")
         x_col = st.selectbox("x축 선택", df.columns)
 
-        # y축 선택 (최대 2개)
-        st.markdown("y축으로 사용할 열을 <b>최대 2개</b>까지 체크하세요:", unsafe_allow_html=True)
+        # y축 선택 (여러 개 가능)
+        st.markdown("y축으로 사용할 열을 <b>여러 개</b> 체크할 수 있어요:", unsafe_allow_html=True)
         y_selected = []
         for idx, col in enumerate(df.columns):
             if col != x_col:
                 if st.checkbox(col, key=f"y_{col}"):
                     y_selected.append(col)
 
-        use_dual_y = st.checkbox("y축 2개로 나누기 (좌/우)", value=False)
+        use_dual_y = st.checkbox("단위별로 y축 나누기", value=False)
         graph_type = st.radio("그래프 유형 선택", ["꺾은선 그래프", "막대 그래프"], horizontal=True)
+        agg, bucket, bins = None, None, DEFAULT_BINS
+        if CHART_TYPES[graph_type] == "bar":
+            # 같은 x 가 여러 행이면 막대를 행마다 그리지 않고 묶어서 요약값만 그린다
+            agg, bucket, bins = aggregate_controls(df[x_col])
 
-        if 0 < len(y_selected) <= 2:
-            fig = go.Figure()
-
-            # y축 1번째
-            fig.add_trace(go.Scatter(
-                x=df[x_col],
-                y=df[y_selected[0]],
-                mode='lines+markers' if graph_type == "꺾은선 그래프" else 'markers',
-                name=y_selected[0],
-                yaxis='y1',
-                marker=dict(color=colors[0], size=8),
-                line=dict(color=colors[0], width=3),
-                hovertemplate=f"{y_selected[0]}: %{y}<extra></extra>"
-            ) if graph_type == "꺾은선 그래프" else
-                go.Bar(
-                    x=df[x_col],
-                    y=df[y_selected[0]],
-                    name=y_selected[0],
-                    marker_color=colors[0],
-                    yaxis='y1',
-                    hovertemplate=f"{y_selected[0]}: %{y}<extra></extra>"
-                )
+        if y_selected:
+            spec = ChartSpec(
+                x_col=x_col,
+                y_cols=tuple(y_selected),
+                chart_type=CHART_TYPES[graph_type],
+                dual_y=use_dual_y,
+                title=graph_title,
+                agg=agg,
+                bucket=bucket,
+                bins=bins,
+                theme="basic",
+                colors=tuple(colors),
             )
-
-            # y축 2번째 (옵션)
-            if len(y_selected) == 2:
-                fig.add_trace(go.Scatter(
-                    x=df[x_col],
-                    y=df[y_selected[1]],
-                    mode='lines+markers' if graph_type == "꺾은선 그래프" else 'markers',
-                    name=y_selected[1],
-                    yaxis='y2' if use_dual_y else 'y1',
-                    marker=dict(color=colors[1], size=8),
-                    line=dict(color=colors[1], width=3),
-                    hovertemplate=f"{y_selected[1]}: %{y}<extra></extra>"
-                ) if graph_type == "꺾은선 그래프" else
-                    go.Bar(
-                        x=df[x_col],
-                        y=df[y_selected[1]],
-                        name=y_selected[1],
-                        marker_color=colors[1],
-                        yaxis='y2' if use_dual_y else 'y1',
-                        hovertemplate=f"{y_selected[1]}: %{y}<extra></extra>"
-                    )
-                )
-
-            layout = {
-                'title': {
-                    'text': f"<b>{graph_title}</b>",
-                    'x': 0.5,
-                    'xanchor': 'center',
-                    'font': {'size': 20, 'family': 'Nanum Gothic, sans-serif'}
-                },
-                'xaxis': {'title': x_col},
-                'yaxis': {'title': y_selected[0]},
-                'font': {'family': 'Nanum Gothic, sans-serif', 'size': 14},
-                'legend': {'x': 0, 'y': 1.15, 'orientation': "h"},
-                'margin': {'t': 100, 'b': 50, 'l': 60, 'r': 60}
-            }
-
-            if len(y_selected) == 2 and use_dual_y:
-                layout['yaxis2'] = {
-                    'title': y_selected[1],
-                    'overlaying': 'y',
-                    'side': 'right'
-                }
-
-            fig.update_layout(layout)
+            fig = build_figure(df, spec, data_key=dataset_key(uploaded_file, sheet))
             with col2:
-                st.plotly_chart(fig, use_container_width=True)
-        elif len(y_selected) == 0:
-            st.warning("y축으로 사용할 데이터를 선택하세요.")
+                plotly_chart(fig, use_container_width=True)
         else:
-            st.error("y축은 최대 2개까지 선택 가능합니다.")
+            st.warning("y축으로 사용할 데이터를 선택하세요.")
+
+debug_sidebar()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from aggregate import bucket_keys
+from lru import LRUCache
+
+# 날짜/시간 x 축을 시간 간격(시/일/주/월)으로 다시 묶는 모듈
+# 간격마다 평균/최솟값/최댓값을 한 번에 계산해서 (데이터 해시, 간격) 별로 저장해 두고,
+# 보이는 기간이 바뀌면 저장해 둔 결과에서 그 기간만 잘라 쓴다.
+
+# 촘촘한 것부터 (이름, 화면 문구, 대략 길이)
+WINDOWS = {
+    "H": ("시간별", pd.Timedelta(hours=1)),
+    "D": ("일별", pd.Timedelta(days=1)),
+    "W": ("주별", pd.Timedelta(weeks=1)),
+    "M": ("월별", pd.Timedelta(days=30)),
+}
+
+# 자동으로 고를 때, 보이는 기간에 이만큼 이상의 점이 있어야 그래프 가로를 채운다고 본다
+MIN_POINTS = 300
+MAX_CACHED = 32
+
+
+def is_datetime(series):
+    return pd.api.types.is_datetime64_any_dtype(series)
+
+
+def choose_window(start, end, min_points=MIN_POINTS):
+    """start~end 를 그릴 때 점이 min_points 개 이상 나오는 가장 굵은 간격.
+
+    가장 촘촘한 간격으로도 모자라면 None (원래 데이터를 그대로 그린다).
+    """
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for window, (_, length) in reversed(WINDOWS.items()):
+        if span / length >= min_points:
+            return window
+    return None
+
+
+def summarize(df, x_col, y_cols, window):
+    """간격별 요약. 열: x_col, 그리고 y 열마다 평균(col), 최솟값(band_columns(col)[0]), 최댓값(band_columns(col)[1])"""
+    y_cols = [col for col in y_cols if col != x_col]
+    keys = bucket_keys(df[x_col], window, None)
+    frame = df[y_cols].apply(lambda s: s if pd.api.types.is_numeric_dtype(s) else pd.to_numeric(s, errors="coerce"))
+    result = frame.groupby(keys.rename(x_col), sort=True).agg(["mean", "min", "max"])
+    result.columns = [col if stat == "mean" else f"{col}__{stat}" for col, stat in result.columns]
+    return result.reset_index()
+
+
+def band_columns(col):
+    """summarize 결과에서 col 의 (최솟값 열, 최댓값 열) 이름"""
+    return f"{col}__min", f"{col}__max"
+
+
+_results = LRUCache(MAX_CACHED)
+
+
+def resample(df, x_col, y_cols, window, data_key=None):
+    """summarize 결과를 (data_key, x, y 열, 간격) 별로 캐시한다. 돌려받은 DataFrame 은 고치지 말 것."""
+    if data_key is None:
+        return summarize(df, x_col, y_cols, window)
+    key = (data_key, x_col, tuple(y_cols), window)
+    return _results.get_or_compute(key, lambda: summarize(df, x_col, y_cols, window))
+
+
+def clip(frame, x_col, x_range):
+    """x 가 x_range(시작, 끝) 안에 있는 행만 (x 로 정렬되어 있다고 보고 이분 탐색)"""
+    if x_range is None:
+        return frame
+    x = frame[x_col].to_numpy()
+    if not np.all(x[:-1] <= x[1:]):
+        start, end = pd.Timestamp(x_range[0]), pd.Timestamp(x_range[1])
+        return frame[(frame[x_col] >= start) & (frame[x_col] <= end)]
+    lo = np.searchsorted(x, np.datetime64(pd.Timestamp(x_range[0])), side="left")
+    hi = np.searchsorted(x, np.datetime64(pd.Timestamp(x_range[1])), side="right")
+    return frame.iloc[lo:hi]
+
+
+def clear_cache():
+    _results.clear()
@@ -0,0 +1,173 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+import columnar_cache
+from frame_compact import compact
+from startup import prewarm
+
+# 저장소에 같이 들어 있는 예시 엑셀 파일을 업로드 없이 바로 여는 모듈
+# 예시 파일은 미리 Arrow(Feather v2) 파일로 바꿔 두고 memory-map 으로 연다 (XLSX 파싱 없음).
+# manifest 에 엑셀 파일의 sha256 을 적어 두고, 엑셀이 바뀌면 다음 build/prepare 때 다시 만든다.
+#
+# 사용법 (배포할 때 미리 만들어 두기):
+#   python samples.py build
+#   python samples.py build --force
+
+ROOT = Path(__file__).resolve().parent
+SAMPLES = {
+    "학생건강검사 (예시)": "교육부_학생건강검사 결과_20151201(예시파일).xlsx",
+    "날씨 데이터 (예시)": "날씨 데이터_예시.xlsx",
+}
+SAMPLE_DIR = Path(os.environ.get("GRAPH_SAMPLES_DIR", ROOT / ".cache" / "samples"))
+MANIFEST = "manifest.json"
+
+_lock = threading.Lock()
+_bytes = {}          # 파일 이름 -> (mtime, size, 바이트, sha256)
+_prepared = None
+
+
+def _read(file_name):
+    """예시 파일 바이트와 sha256 (파일이 바뀌지 않았으면 다시 읽지 않는다)"""
+    path = ROOT / file_name
+    st = path.stat()
+    with _lock:
+        hit = _bytes.get(file_name)
+        if hit is not None and hit[:2] == (st.st_mtime, st.st_size):
+            return hit[2], hit[3]
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    with _lock:
+        _bytes[file_name] = (st.st_mtime, st.st_size, data, digest)
+    return data, digest
+
+
+def _manifest():
+    try:
+        with open(SAMPLE_DIR / MANIFEST, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_manifest(manifest):
+    SAMPLE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=SAMPLE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, SAMPLE_DIR / MANIFEST)
+
+
+def _artifact_path(digest):
+    return SAMPLE_DIR / f"{digest}.arrow"
+
+
+def build(force=False):
+    """바뀐 예시 파일만 Arrow 로 다시 만든다. 새로 만든 파일 이름 목록을 돌려준다."""
+    if not columnar_cache.enabled():
+        return []
+    manifest = _manifest()
+    built = []
+    for file_name in SAMPLES.values():
+        if not (ROOT / file_name).exists():
+            continue
+        data, digest = _read(file_name)
+        path = _artifact_path(digest)
+        if not force and manifest.get(file_name, {}).get("sha256") == digest and path.exists():
+            continue
+        df = compact(pd.read_excel(ROOT / file_name, sheet_name=0))
+        if not columnar_cache.write_frame(df.reset_index(drop=True), path):
+            continue
+        old = manifest.get(file_name, {}).get("sha256")
+        if old and old != digest and _artifact_path(old).exists():
+            _artifact_path(old).unlink()
+        manifest[file_name] = {"sha256": digest, "rows": len(df), "columns": len(df.columns)}
+        built.append(file_name)
+    if built:
+        _write_manifest(manifest)
+    return built
+
+
+def prepare():
+    """서버가 뜰 때 한 번: 바뀐 예시 파일의 Arrow 파일을 백그라운드에서 만든다."""
+    global _prepared
+    with _lock:
+        if _prepared is None:
+            _prepared = threading.Thread(target=build, name="samples-build", daemon=True)
+            _prepared.start()
+    return _prepared
+
+
+def load(digest, columns=None):
+    """예시 파일(sha256 이 digest)의 미리 만든 Arrow 파일을 memory-map 으로. 없으면 None
+
+    잘렸거나 읽을 수 없는 파일은 지우고 None (엑셀을 읽고, 다음 build 때 다시 만든다).
+    """
+    if not columnar_cache.enabled():
+        return None
+    path = _artifact_path(digest)
+    try:
+        return columnar_cache.read_frame(path, columns)
+    except FileNotFoundError:
+        return None
+    except (KeyError, *columnar_cache.ARROW_ERRORS):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        return None
+
+
+class SampleFile:
+    """st.file_uploader 가 돌려주는 UploadedFile 처럼 쓸 수 있는 예시 파일"""
+
+    def __init__(self, file_name):
+        self.name = file_name
+        data, digest = _read(file_name)
+        self.size = len(data)
+        self.file_id = f"sample:{digest}"
+        self.type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def getvalue(self):
+        return _read(self.name)[0]
+
+
+def upload_or_sample(label, type=None, key=None):
+    """Streamlit 페이지용: 파일 업로드 칸 + '예시 데이터 열기'. 업로드가 있으면 그것을, 아니면 고른 예시 파일을 돌려준다."""
+    import streamlit as st
+
+    prepare()
+    prewarm()
+    uploaded_file = st.file_uploader(label, type=type, key=key)
+    if uploaded_file is not None:
+        return uploaded_file
+    names = [name for name, file_name in SAMPLES.items() if (ROOT / file_name).exists()]
+    choice = st.selectbox("📎 또는 예시 데이터 열기", [None] + names,
+                          format_func=lambda name: "선택 안 함" if name is None else name,
+                          key=f"{key}_sample" if key else "sample_choice")
+    return SampleFile(SAMPLES[choice]) if choice else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="예시 엑셀 파일을 Arrow 로 미리 바꿔 두기")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="바뀐 예시 파일만 다시 만들기")
+    build_cmd.add_argument("--force", action="store_true", help="바뀌지 않았어도 전부 다시 만들기")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if not columnar_cache.enabled():
+            print("pyarrow 가 없어서 만들 수 없습니다.")
+            return
+        built = build(force=args.force)
+        print(f"{len(built)}개 만들었습니다: {', '.join(built)}" if built else "모두 최신입니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import threading
+import time
+
+# 브라우저 세션(탭) 단위로 들고 있는 것을 정리하기 위한 도구
+# data_cache 의 pin, instrument 의 세션별 기록/메모리 추적이 같이 쓴다.
+# 세션이 끝났다는 알림은 없으므로 가끔 한 번씩 Streamlit runtime 에 살아 있는지 물어본다.
+
+SWEEP_SECONDS = 60
+
+
+def current_session_id():
+    """지금 스크립트를 돌리는 세션의 id (Streamlit 밖이면 None)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+def ended_sessions(session_ids):
+    """session_ids 중 이미 끝난(브라우저를 닫은) 세션. runtime 이 없으면 (스크립트로 돌 때) 빈 목록."""
+    try:
+        from streamlit import runtime
+        if not runtime.exists():
+            return []
+        rt = runtime.get_instance()
+    except ImportError:
+        return []
+    return [sid for sid in session_ids if not rt.is_active_session(sid)]
+
+
+class SessionSweep:
+    """due() 가 interval 초에 한 번만 True (여러 스레드가 불러도 한 번)"""
+
+    def __init__(self, interval=SWEEP_SECONDS):
+        self.interval = interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def due(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last < self.interval:
+                return False
+            self._last = now
+            return True
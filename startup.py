@@ -0,0 +1,122 @@
+import argparse
+import ast
+import importlib
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+# 서버 시작/첫 페이지 열기를 빠르게 하기 위한 도구
+# - 무거운 모듈은 쓰는 곳에서 필요할 때만 불러온다 (scipy 는 회귀/상관, kaleido 는 내보내기, matplotlib 은 main.py 그래프)
+# - 모든 페이지가 곧 쓰게 될 모듈은 prewarm() 으로 백그라운드 스레드에서 미리 불러 둔다
+# - 어떤 모듈이 시작 시간을 잡아먹는지는 importtime 명령으로 본다
+#
+# 사용법:
+#   python startup.py importtime                      # main.py + pages/*.py 가 불러오는 모듈
+#   python startup.py importtime "pages/02_되었나드디어(끝).py" --top 30
+#   python startup.py importtime scipy.stats kaleido
+
+ROOT = Path(__file__).resolve().parent
+
+# 업로드한 엑셀/CSV 를 읽을 때 바로 필요해지는 모듈 (페이지 import 때는 불러오지 않는다)
+PREWARM_MODULES = ("openpyxl", "pyarrow.feather", "pyarrow.csv")
+
+_lock = threading.Lock()
+_requested = set()
+
+
+def _import_all(modules):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:  # 없는 모듈은 쓰는 곳에서 다시 불러 보고 알아서 처리한다
+            pass
+
+
+def prewarm(modules=PREWARM_MODULES):
+    """modules 를 백그라운드 스레드에서 미리 불러온다. 이미 맡긴 모듈은 다시 맡기지 않는다."""
+    with _lock:
+        todo = [name for name in modules if name not in _requested and name not in sys.modules]
+        _requested.update(todo)
+    if not todo:
+        return None
+    thread = threading.Thread(target=_import_all, args=(todo,), name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def script_imports(path):
+    """스크립트 맨 위(들여쓰지 않은 곳)에서 불러오는 모듈 이름"""
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"))
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _importtime(modules):
+    """새 파이썬 프로세스에서 modules 를 불러오며 -X importtime 결과를 [(자체 us, 누적 us, 깊이, 이름)] 로"""
+    code = "".join(f"import {name}\n" for name in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def import_report(modules, baseline=("streamlit",)):
+    """baseline 을 불러온 뒤에 modules 가 더 불러오는 모듈들 (baseline 이 이미 불러온 것은 뺀다)"""
+    skip = {name for _, _, _, name in _importtime(baseline)} if baseline else set()
+    rows = _importtime(list(baseline) + [name for name in modules if name not in baseline])
+    return [row for row in rows if row[3] not in skip]
+
+
+def format_report(rows, top=20):
+    total = sum(row[0] for row in rows) / 1000
+    lines = [f"더 불러온 모듈 {len(rows)}개, 합계 {total:,.0f}ms", "", "바로 불러온 모듈 (누적 시간 순)"]
+    # 깊이가 가장 얕은 줄 = 스크립트가 직접 불러온 모듈 (baseline 이 먼저 불러온 부모는 빠져 있을 수 있다)
+    shallow = min((row[2] for row in rows), default=0)
+    direct = sorted((row for row in rows if row[2] == shallow), key=lambda row: -row[1])
+    lines += [f"  {cum / 1000:8,.1f}ms  {name}" for _, cum, _, name in direct[:top]]
+    lines += ["", "가장 오래 걸린 모듈 (자체 시간 순)"]
+    heaviest = sorted(rows, key=lambda row: -row[0])
+    lines += [f"  {own / 1000:8,.1f}ms  {name}" for own, _, _, name in heaviest[:top]]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="시작 시간 점검")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_cmd = sub.add_parser("importtime", help="어떤 모듈을 불러오는 데 오래 걸리는지 보기")
+    report_cmd.add_argument("targets", nargs="*",
+                            help="모듈 이름이나 .py 스크립트 (기본: main.py 와 pages/*.py)")
+    report_cmd.add_argument("--top", type=int, default=20, help="보여줄 줄 수")
+    report_cmd.add_argument("--no-baseline", action="store_true",
+                            help="streamlit 이 불러오는 모듈까지 포함해서 보기")
+    args = parser.parse_args(argv)
+
+    if args.command == "importtime":
+        targets = args.targets or ["main.py"] + sorted(str(p.relative_to(ROOT)) for p in (ROOT / "pages").glob("*.py"))
+        modules = []
+        for target in targets:
+            if target.endswith(".py"):
+                modules.extend(script_imports(ROOT / target))
+            else:
+                modules.append(target)
+        modules = list(dict.fromkeys(modules))
+        rows = import_report(modules, baseline=() if args.no_baseline else ("streamlit",))
+        print(format_report(rows, top=args.top))
+
+
+if __name__ == "__main__":
+    main()
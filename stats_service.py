@@ -0,0 +1,225 @@
+import warnings
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from lru import LRUCache
+
+# 회귀/상관 통계를 한 번에 계산하고 캐시하는 모듈
+# x 열 하나와 y 열 여러 개를 한 번의 벡터 연산으로 처리한다.
+# (x, y) 가 둘 다 있는 행만 쓰므로 dropna 를 따로 해서 행이 어긋나는 일이 없다.
+# 합계(n, Σx, Σy, Σxy, Σx², Σy²)를 들고 있어서 행이 추가되면 그 행만 더하면 된다.
+
+MAX_CACHED = 1024
+# 날짜 x 는 이 단위의 epoch 정수로 회귀한다. 같은 data_key 를 단위가 다른 프레임이 같이 쓰므로
+# (엑셀/Arrow 캐시와 열만 읽은 것) 열의 단위가 아니라 이 고정 단위로 맞춘다.
+DATETIME_UNIT = "us"
+
+
+@dataclass
+class SuffStats:
+    """y 열마다의 충분통계량 (배열 길이 = y 열 개수).
+
+    계산 오차를 줄이려고 x, y 에서 shift 를 뺀 값으로 합을 낸다.
+    """
+
+    shift_x: float
+    shift_y: np.ndarray
+    n: np.ndarray
+    sx: np.ndarray
+    sy: np.ndarray
+    sxy: np.ndarray
+    sxx: np.ndarray
+    syy: np.ndarray
+    x_min: np.ndarray
+    x_max: np.ndarray
+
+    @classmethod
+    def empty(cls, k, shift_x=0.0, shift_y=None):
+        zeros = np.zeros(k)
+        return cls(
+            shift_x=float(shift_x),
+            shift_y=np.zeros(k) if shift_y is None else np.asarray(shift_y, dtype="float64"),
+            n=np.zeros(k, dtype="int64"),
+            sx=zeros.copy(), sy=zeros.copy(), sxy=zeros.copy(),
+            sxx=zeros.copy(), syy=zeros.copy(),
+            x_min=np.full(k, np.inf), x_max=np.full(k, -np.inf),
+        )
+
+    def update(self, x, Y):
+        """새 행 (x: (m,), Y: (m, k)) 을 더한다."""
+        x = np.asarray(x, dtype="float64")
+        Y = np.asarray(Y, dtype="float64").reshape(len(x), -1)
+        mask = ~np.isnan(x)[:, None] & ~np.isnan(Y)
+        x0 = np.where(mask, (x - self.shift_x)[:, None], 0.0)
+        y0 = np.where(mask, Y - self.shift_y, 0.0)
+        self.n += mask.sum(axis=0)
+        self.sx += x0.sum(axis=0)
+        self.sy += y0.sum(axis=0)
+        self.sxy += (x0 * y0).sum(axis=0)
+        self.sxx += (x0 * x0).sum(axis=0)
+        self.syy += (y0 * y0).sum(axis=0)
+        if len(x):
+            xs = np.where(mask, x[:, None], np.nan)
+            with _quiet():
+                self.x_min = np.fmin(self.x_min, np.nanmin(xs, axis=0, initial=np.inf))
+                self.x_max = np.fmax(self.x_max, np.nanmax(xs, axis=0, initial=-np.inf))
+        return self
+
+    def take(self, j):
+        """j 번째 y 열만 떼어 낸 SuffStats"""
+        sl = slice(j, j + 1)
+        return SuffStats(
+            self.shift_x, self.shift_y[sl], self.n[sl], self.sx[sl], self.sy[sl],
+            self.sxy[sl], self.sxx[sl], self.syy[sl], self.x_min[sl], self.x_max[sl],
+        )
+
+    @classmethod
+    def concat(cls, parts):
+        """열 방향으로 붙인다 (shift_x 가 같은 것끼리만)."""
+        fields = ("shift_y", "n", "sx", "sy", "sxy", "sxx", "syy", "x_min", "x_max")
+        joined = {f: np.concatenate([getattr(p, f) for p in parts]) for f in fields}
+        return cls(shift_x=parts[0].shift_x, **joined)
+
+
+@contextmanager
+def _quiet():
+    # 빈 열에 대한 nanmean/nanmin 경고를 끈다
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        yield
+
+
+def sufficient_stats(x, Y):
+    x = np.asarray(x, dtype="float64")
+    Y = np.asarray(Y, dtype="float64").reshape(len(x), -1)
+    with _quiet():
+        shift_x = np.nanmean(x) if len(x) else 0.0
+        shift_y = np.nanmean(Y, axis=0) if len(x) else np.zeros(Y.shape[1])
+    shift_x = 0.0 if np.isnan(shift_x) else shift_x
+    shift_y = np.nan_to_num(shift_y)
+    return SuffStats.empty(Y.shape[1], shift_x, shift_y).update(x, Y)
+
+
+def regression_table(stats, y_cols):
+    """SuffStats 로 기울기/절편/r/p/표준오차 표를 만든다 (scipy.stats.linregress 와 같은 값)."""
+    n = stats.n.astype("float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx, my = stats.sx / n, stats.sy / n
+        ssxm = stats.sxx / n - mx * mx
+        ssym = stats.syy / n - my * my
+        ssxym = stats.sxy / n - mx * my
+        slope = ssxym / ssxm
+        r = np.clip(ssxym / np.sqrt(ssxm * ssym), -1.0, 1.0)
+        intercept = (my + stats.shift_y) - slope * (mx + stats.shift_x)
+        df = n - 2
+        t = r * np.sqrt(df / ((1.0 - r) * (1.0 + r)))
+        stderr = np.sqrt((1 - r * r) * ssym / ssxm / df)
+    # 점이 딱 두 개면 직선이 정확히 지나가므로 linregress 처럼 p = 0, 표준오차 = 0
+    stderr = np.where(df > 0, stderr, 0.0)
+    p = _two_sided_p(t, df)
+    bad = (n < 2) | ~(ssxm > 0)
+    table = pd.DataFrame({
+        "n": stats.n,
+        "slope": slope,
+        "intercept": intercept,
+        "r": r,
+        "p": p,
+        "stderr": stderr,
+        "x_min": stats.x_min,
+        "x_max": stats.x_max,
+    }, index=pd.Index(list(y_cols), name="y"))
+    table.loc[bad, ["slope", "intercept", "r", "p", "stderr"]] = np.nan
+    return table
+
+
+def _two_sided_p(t, df):
+    from scipy.stats import t as t_dist  # 통계를 계산할 때만 scipy 를 불러온다
+
+    with np.errstate(invalid="ignore"):
+        p = 2 * t_dist.sf(np.abs(t), np.maximum(df, 1))
+    return np.where(df > 0, p, 0.0)
+
+
+def _numeric(values):
+    values = pd.Series(values)
+    if values.dtype.kind == "M":
+        stamps = values.dt.as_unit(DATETIME_UNIT).to_numpy()
+        out = stamps.view("int64").astype("float64")
+        out[np.isnat(stamps)] = np.nan
+        return out
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+
+
+_stats = LRUCache(MAX_CACHED)   # (data_key, x_col, y_col) -> SuffStats (열 1개짜리)
+
+
+def regress(df, x_col, y_cols, data_key=None):
+    """x_col 에 대한 y_cols 각각의 단순회귀 결과 (y 열 이름을 index 로 하는 DataFrame).
+
+    data_key 를 주면 (data_key, x열, y열) 단위로 결과를 캐시한다.
+    """
+    y_cols = list(y_cols)
+    parts = {}
+    if data_key is not None:
+        for col in y_cols:
+            cached = _stats.get((data_key, x_col, col))
+            if cached is not None:
+                parts[col] = cached
+    missing = [col for col in y_cols if col not in parts]
+    if missing:
+        x = _numeric(df[x_col])
+        Y = np.column_stack([_numeric(df[col]) for col in missing])
+        fresh = sufficient_stats(x, Y)
+        for j, col in enumerate(missing):
+            parts[col] = fresh.take(j)
+            if data_key is not None:
+                _stats.put((data_key, x_col, col), parts[col])
+    return regression_table(_concat_any([parts[col] for col in y_cols]), y_cols)
+
+
+def append_rows(old_key, new_key, new_rows, x_col, y_cols):
+    """old_key 데이터 뒤에 new_rows 가 붙은 것이 new_key 데이터일 때,
+    캐시된 합계에 새 행만 더해서 new_key 결과를 만든다. 캐시에 없으면 None."""
+    x = _numeric(new_rows[x_col])
+    result = []
+    for col in y_cols:
+        old = _stats.get((old_key, x_col, col))
+        if old is None:
+            return None
+        fresh = SuffStats(**{f: np.copy(v) if isinstance(v, np.ndarray) else v for f, v in vars(old).items()})
+        fresh.update(x, _numeric(new_rows[col])[:, None])
+        _stats.put((new_key, x_col, col), fresh)
+        result.append(fresh)
+    return regression_table(_concat_any(result), y_cols)
+
+
+def _concat_any(parts):
+    # shift_x 가 서로 다르면 (다른 때 계산된 캐시) 기준을 맞춘 뒤 붙인다
+    base = parts[0].shift_x
+    aligned = []
+    for part in parts:
+        if part.shift_x != base:
+            part = _reshift(part, base)
+        aligned.append(part)
+    return SuffStats.concat(aligned)
+
+
+def _reshift(stats, shift_x):
+    # Σ(x - a) 를 Σ(x - b) 로 옮긴다: x - b = (x - a) + d, d = a - b
+    d = stats.shift_x - shift_x
+    n = stats.n
+    sx = stats.sx + d * n
+    return SuffStats(
+        shift_x=shift_x, shift_y=stats.shift_y, n=n,
+        sx=sx, sy=stats.sy,
+        sxy=stats.sxy + d * stats.sy,
+        sxx=stats.sxx + 2 * d * stats.sx + d * d * n,
+        syy=stats.syy, x_min=stats.x_min, x_max=stats.x_max,
+    )
+
+
+def clear_cache():
+    _stats.clear()
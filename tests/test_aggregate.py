@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregate
+from aggregate import aggregate as cached_aggregate
+from aggregate import bucket_choices, bucket_keys, summarize
+
+
+@pytest.fixture
+def students():
+    return pd.DataFrame({
+        "학년": [1, 1, 2, 2, 2, 3],
+        "키": [120.0, 124.0, 130.0, np.nan, 134.0, 140.0],
+        "몸무게": [25.0, 27.0, 30.0, 31.0, 32.0, 36.0],
+    })
+
+
+def test_summarize_matches_groupby(students):
+    out = summarize(students, "학년", ["키", "몸무게"], agg="mean")
+    expected = students.groupby("학년")[["키", "몸무게"]].mean().reset_index()
+    pd.testing.assert_frame_equal(out, expected)
+
+
+def test_percentile_and_count(students):
+    p90 = summarize(students, "학년", ["몸무게"], agg="p90")
+    assert p90["몸무게"].tolist() == pytest.approx(students.groupby("학년")["몸무게"].quantile(0.9).tolist())
+    count = summarize(students, "학년", ["키"], agg="count")
+    assert count["키"].tolist() == [2, 2, 1]
+
+
+def test_bins_cover_the_range():
+    df = pd.DataFrame({"x": np.arange(100, dtype="float64"), "y": np.ones(100)})
+    out = summarize(df, "x", ["y"], agg="count", bucket="bins", bins=10)
+    assert len(out) == 10
+    assert out["y"].sum() == 100
+    # 구간 가운데 값 (맨 끝 값 99 도 마지막 구간에)
+    assert out["x"].iloc[0] == pytest.approx(4.95)
+
+
+def test_time_buckets():
+    x = pd.Series(pd.date_range("2025-06-01", periods=72, freq="h"))
+    df = pd.DataFrame({"일시": x, "기온": np.arange(72, dtype="float64")})
+    daily = summarize(df, "일시", ["기온"], agg="mean", bucket="D")
+    assert daily["일시"].tolist() == list(pd.date_range("2025-06-01", periods=3, freq="D"))
+    assert daily["기온"].tolist() == [11.5, 35.5, 59.5]
+
+
+def test_bucket_choices_follow_x_dtype():
+    assert bucket_choices(pd.Series(pd.date_range("2025-01-01", periods=3))) == [None, "H", "D", "W", "M"]
+    assert bucket_choices(pd.Series([1, 2, 3])) == [None, "bins"]
+    assert bucket_choices(pd.Series(["1반", "2반"])) == [None]
+    assert bucket_choices(pd.Series([True, False])) == [None]
+
+
+@pytest.mark.parametrize("x", [pd.Series([1, 2, 3]), pd.Series(["1반", "2반", "3반"])])
+def test_time_bucket_on_non_datetime_x_is_rejected(x):
+    # 예전에는 숫자 x 는 전부 1970-01-01, 글자 x 는 전부 빈칸으로 묶여서 빈 그래프가 나왔다
+    with pytest.raises(ValueError):
+        bucket_keys(x, "M", 20)
+
+
+def test_bins_on_text_x_is_rejected():
+    with pytest.raises(ValueError):
+        bucket_keys(pd.Series(["1반", "2반"]), "bins", 20)
+
+
+def test_aggregate_caches_by_settings(students):
+    aggregate.clear_cache()
+    first = cached_aggregate(students, "학년", ["키"], agg="mean", data_key="students")
+    assert cached_aggregate(students, "학년", ["키"], agg="mean", data_key="students") is first
+    assert cached_aggregate(students, "학년", ["키"], agg="max", data_key="students") is not first
+    aggregate.clear_cache()
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import chart_engine
+from chart_engine import ChartSpec, build_figure
+
+
+@pytest.fixture(autouse=True)
+def _clear():
+    chart_engine.clear_cache()
+    yield
+    chart_engine.clear_cache()
+
+
+@pytest.mark.parametrize("unit", ["ns", "us", "s"])
+def test_regression_line_on_datetime_x(unit):
+    x = pd.date_range("2025-06-01", periods=72, freq="h").astype(f"datetime64[{unit}]")
+    df = pd.DataFrame({"일시": x, "기온": np.linspace(20, 27.1, 72)})
+    fig = build_figure(df, ChartSpec("일시", ("기온",), "scatter", regression=True), data_key=f"dt-{unit}")
+    data, line = fig.data
+    assert line.name == "회귀선 (기온)"
+    # 회귀선의 x 는 데이터 점과 같은 단위(epoch 밀리초)이고 양 끝이 데이터의 처음/끝
+    assert line.x[0] == pytest.approx(data.x[0])
+    assert line.x[-1] == pytest.approx(data.x[-1])
+    assert list(line.y) == pytest.approx([20, 27.1])
+
+
+def test_regression_cache_shared_across_datetime_units():
+    # 같은 data_key 를 열만 읽은 프레임(ns)과 전체를 읽은 프레임(us)이 같이 쓴다
+    x = pd.date_range("2025-06-01", periods=48, freq="h")
+    y = np.linspace(10, 20, 48)
+    spec = ChartSpec("일시", ("기온",), "scatter", regression=True)
+    first = build_figure(pd.DataFrame({"일시": x.astype("datetime64[ns]"), "기온": y}), spec, data_key="mixed")
+    chart_engine.clear_cache()   # 그래프 캐시만 비운다 (회귀 합계는 stats_service 에 남아 있다)
+    second = build_figure(pd.DataFrame({"일시": x.astype("datetime64[us]"), "기온": y}), spec, data_key="mixed")
+    for fig in (first, second):
+        data, line = fig.data
+        assert line.x[0] == pytest.approx(data.x[0])
+        assert line.x[-1] == pytest.approx(data.x[-1])
+
+
+def test_regression_line_on_numeric_x():
+    df = pd.DataFrame({"키": [150.0, 160.0, 170.0, 180.0], "몸무게": [45.0, 55.0, 65.0, 75.0]})
+    fig = build_figure(df, ChartSpec("키", ("몸무게",), "scatter", regression=True), data_key="num")
+    line = fig.data[-1]
+    assert list(line.x) == [150.0, 180.0]
+    assert list(line.y) == pytest.approx([45.0, 75.0])
+
+
+def _long_frame(n=20_000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "시각": np.arange(n, dtype="float64"),
+        "값": rng.normal(size=n).cumsum(),
+        "반": rng.choice(["1반", "2반", "3반"], size=n),
+    })
+
+
+def test_point_count_only_on_downsampled_traces():
+    df = _long_frame()
+    line = build_figure(df, ChartSpec("시각", ("값",), "line", max_points=1000), data_key="long")
+    assert line.data[0].name == "값 (20,000→1,000점)"
+    assert len(line.data[0].y) == 1000
+
+    # 산점도/막대는 줄이지 않으므로 점 개수를 붙이지 않는다
+    scatter = build_figure(df, ChartSpec("시각", ("값",), "scatter", max_points=1000), data_key="long")
+    assert scatter.data[0].name == "값"
+    assert len(scatter.data[0].y) == len(df)
+    bar = build_figure(df, ChartSpec("반", ("값",), "bar", agg="mean"), data_key="long")
+    assert bar.data[0].name == "값 (평균)"
+
+
+@pytest.mark.parametrize("resample", [None, "D"])
+def test_x_range_clips_raw_and_resampled_data(resample):
+    x = pd.date_range("2025-06-01", periods=24 * 10, freq="h")
+    df = pd.DataFrame({"일시": x, "기온": np.arange(len(x), dtype="float64")})
+    x_range = (pd.Timestamp("2025-06-03").to_pydatetime(), pd.Timestamp("2025-06-04 23:00").to_pydatetime())
+    full = build_figure(df, ChartSpec("일시", ("기온",), "line", resample=resample), data_key="range")
+    part = build_figure(df, ChartSpec("일시", ("기온",), "line", resample=resample, x_range=x_range), data_key="range")
+    expected = 48 if resample is None else 2
+    assert len(full.data[-1].y) == len(x) // (1 if resample is None else 24)
+    assert len(part.data[-1].y) == expected
+    assert part.data[-1].x[0] == pytest.approx(pd.Timestamp("2025-06-03").value / 1e6)
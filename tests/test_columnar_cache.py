@@ -0,0 +1,75 @@
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import columnar_cache
+import data_cache
+import samples
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar_cache, "CACHE_DIR", tmp_path)
+    data_cache.frame_cache.clear()
+    yield tmp_path
+    data_cache.frame_cache.clear()
+
+
+@pytest.fixture
+def year_workbook():
+    # 연도 머리행 (2016, 2017) 은 숫자로 읽힌다
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["지역", 2016, 2017])
+    for i in range(20):
+        ws.append([f"지역{i % 4}", 100 + i, 200.5 + i])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return io.BytesIO(buf.getvalue())
+
+
+def test_integer_headers_round_trip(year_workbook):
+    first = data_cache.load_excel(year_workbook)
+    assert list(first.columns) == ["지역", 2016, 2017]
+    data_cache.frame_cache.clear()
+    # 두 번째는 Arrow 캐시에서 읽는다
+    cached = data_cache.load_excel(year_workbook)
+    pd.testing.assert_frame_equal(cached, first)
+
+
+def test_project_integer_header_from_arrow_cache(year_workbook):
+    full = data_cache.load_excel(year_workbook)
+    data_cache.frame_cache.clear()
+    part = data_cache.load_excel_columns(year_workbook, [2017, "지역"])
+    assert list(part.columns) == [2017, "지역"]
+    pd.testing.assert_frame_equal(part, full[[2017, "지역"]])
+
+
+def test_read_frame_missing_column(tmp_path):
+    df = pd.DataFrame({"a": [1, 2], 2016: [3, 4]})
+    path = tmp_path / "x.arrow"
+    assert columnar_cache.write_frame(df, path)
+    pd.testing.assert_frame_equal(columnar_cache.read_frame(path, [2016]), df[[2016]], check_column_type=False)
+    with pytest.raises(KeyError):
+        columnar_cache.read_frame(path, ["2016"])
+
+
+def test_truncated_cache_file_falls_back_to_excel(year_workbook, cache_dir):
+    full = data_cache.load_excel(year_workbook)
+    data_cache.frame_cache.clear()
+    (path,) = cache_dir.glob("*.arrow")
+    path.write_bytes(path.read_bytes()[:200])
+    # 잘린 파일은 지우고 엑셀을 다시 읽어서 새로 저장한다
+    pd.testing.assert_frame_equal(data_cache.load_excel(year_workbook), full)
+    assert columnar_cache.read_frame(path).shape == full.shape
+
+
+def test_truncated_sample_artifact_is_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(samples, "SAMPLE_DIR", tmp_path)
+    path = samples._artifact_path("digest")
+    assert columnar_cache.write_frame(pd.DataFrame({"a": range(100)}), path)
+    path.write_bytes(path.read_bytes()[:100])
+    assert samples.load("digest") is None
+    assert not path.exists()
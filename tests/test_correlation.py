@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from correlation import BLOCK, correlation_matrix, pairwise_corr
+
+
+def _frame(rows=400, cols=6, seed=4):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(rows, 1))
+    data = base + rng.normal(scale=np.linspace(0.2, 3, cols), size=(rows, cols))
+    return pd.DataFrame(data, columns=[f"c{i}" for i in range(cols)])
+
+
+def test_pairwise_corr_without_missing_values():
+    df = _frame()
+    corr, counts = pairwise_corr(df.to_numpy())
+    np.testing.assert_allclose(corr, df.corr().to_numpy(), rtol=1e-10, atol=1e-12)
+    assert (counts == len(df)).all()
+
+
+def test_pairwise_corr_with_missing_values_matches_dataframe_corr():
+    df = _frame()
+    rng = np.random.default_rng(5)
+    df = df.mask(rng.random(df.shape) < 0.15)
+    corr, counts = pairwise_corr(df.to_numpy(), block=2)   # 블록 경계가 여러 번 생기도록
+    np.testing.assert_allclose(corr, df.corr().to_numpy(), rtol=1e-9, atol=1e-12)
+    both = df.notna().astype(int)
+    np.testing.assert_array_equal(counts, (both.T @ both).to_numpy())
+
+
+def test_correlation_matrix_frames():
+    df = _frame(cols=BLOCK + 3)
+    corr, counts = correlation_matrix(df)
+    assert list(corr.columns) == list(df.columns)
+    pd.testing.assert_frame_equal(corr, df.corr(), rtol=1e-9)
+    assert np.allclose(np.diag(corr), 1.0)
+
+
+def test_constant_column_is_nan():
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0, 4.0], "b": [5.0] * 4})
+    corr, _ = pairwise_corr(df.to_numpy())
+    assert np.isnan(corr[0, 1]) and np.isnan(corr[1, 0])
+
+
+def test_progress_reaches_one():
+    df = _frame(cols=7)
+    df.iloc[::5, 2] = np.nan
+    seen = []
+    pairwise_corr(df.to_numpy(), block=3, progress=seen.append)
+    # 열 묶음 3개 -> 위쪽 삼각형 쌍 6개
+    assert len(seen) == 6 and seen[-1] == 1.0
+    assert seen == sorted(seen)
+
+
+def test_progress_only_on_cache_miss():
+    df = _frame(cols=4)
+    df.iloc[::3, 1] = np.nan
+    seen = []
+    correlation_matrix(df, method="spearman", data_key="progress", progress=seen.append)
+    assert seen[0] == 0.0 and seen[-1] == 1.0
+    seen.clear()
+    correlation_matrix(df, method="spearman", data_key="progress", progress=seen.append)
+    assert seen == []
@@ -0,0 +1,52 @@
+import io
+
+import pandas as pd
+import pytest
+
+import csv_ingest
+from csv_ingest import SNIFF_BYTES, read_csv, sniff_encoding
+
+TEXT = "지역,학년,키(cm)\n" + "".join(f"{'서울' if i % 2 else '부산'},{i % 6 + 1},{150 + i % 30}.5\n" for i in range(200))
+
+
+def _expected():
+    return pd.read_csv(io.StringIO(TEXT))
+
+
+@pytest.mark.parametrize("encoding, sniffed", [
+    ("utf-8", "utf-8"),
+    ("utf-8-sig", "utf-8-sig"),
+    ("cp949", "cp949"),
+    ("utf-16", "utf-16"),
+])
+def test_sniff_and_read(encoding, sniffed):
+    data = TEXT.encode(encoding)
+    assert sniff_encoding(data[:SNIFF_BYTES]) == sniffed
+    df = read_csv(data, compact_dtypes=False)
+    pd.testing.assert_frame_equal(df.astype({"지역": object}), _expected(), check_dtype=False)
+
+
+def test_cp949_after_ascii_prefix_falls_back():
+    # 앞부분(SNIFF_BYTES)은 ASCII 뿐이라 UTF-8 로 짐작하지만 뒤에 cp949 한글이 나오는 파일
+    head = "id,name\n" + "".join(f"{i},abc\n" for i in range(SNIFF_BYTES // 6))
+    tail = "".join(f"{i},김철수\n" for i in range(10))
+    data = (head + tail).encode("cp949")
+    assert sniff_encoding(data[:SNIFF_BYTES]) == "utf-8"
+    df = read_csv(data, compact_dtypes=False, block_size=4096)
+    assert df["name"].iloc[-1] == "김철수"
+    assert len(df) == head.count("\n") - 1 + 10
+
+
+def test_pandas_path_matches(monkeypatch):
+    monkeypatch.setattr(csv_ingest, "pa_csv", None)
+    data = TEXT.encode("cp949")
+    df = read_csv(data, compact_dtypes=False)
+    pd.testing.assert_frame_equal(df, _expected(), check_dtype=False)
+
+
+def test_explicit_encoding_is_not_retried():
+    data = TEXT.encode("cp949")
+    # 인코딩을 직접 준 경우에는 cp949 로 다시 읽지 않는다
+    with pytest.raises(csv_ingest._DECODE_ERRORS):
+        read_csv(data, encoding="utf-8", compact_dtypes=False)
+
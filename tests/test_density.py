@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from density import density, histogram2d
+
+
+def _points(rows=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=rows)
+    return x, 2 * x + rng.normal(size=rows)
+
+
+def test_counts_match_numpy():
+    x, y = _points()
+    counts, x_edges, y_edges = histogram2d(x, y, bins=40)
+    expected, ex, ey = np.histogram2d(x, y, bins=40)
+    # 그림 순서(y 행, x 열)로 뒤집혀 있다
+    np.testing.assert_array_equal(counts, expected.T)
+    np.testing.assert_allclose(x_edges, ex)
+    np.testing.assert_allclose(y_edges, ey)
+    assert counts.sum() == len(x)
+
+
+def test_missing_values_are_dropped():
+    x, y = _points(rows=1000)
+    x[::10] = np.nan
+    y[5::10] = np.inf
+    counts, _, _ = histogram2d(x, y, bins=20)
+    keep = np.isfinite(x) & np.isfinite(y)
+    expected, _, _ = np.histogram2d(x[keep], y[keep], bins=20)
+    np.testing.assert_array_equal(counts, expected.T)
+
+
+def test_empty_input():
+    counts, x_edges, _ = histogram2d([np.nan], [1.0], bins=5)
+    assert counts.shape == (5, 5) and counts.sum() == 0
+    assert len(x_edges) == 6
+
+
+def test_density_of_frame_with_nullable_column():
+    x, y = _points(rows=500)
+    df = pd.DataFrame({"x": pd.array(np.round(x * 10), dtype="Int64"), "y": y})
+    df.loc[3, "x"] = pd.NA
+    counts, _, _ = density(df, "x", "y", bins=10, data_key="test-density")
+    assert counts.sum() == len(df) - 1
+    # 같은 키는 캐시에서 같은 결과
+    assert density(df, "x", "y", bins=10, data_key="test-density")[0] is counts
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsample import downsample, downsample_many, lttb_indices, lttb_indices_many
+
+
+@pytest.mark.parametrize("n, n_out", [(10_000, 500), (1001, 3), (50, 10)])
+def test_lttb_keeps_endpoints_and_budget(n, n_out):
+    rng = np.random.default_rng(1)
+    x = np.sort(rng.uniform(0, 100, n))
+    y = rng.normal(size=n).cumsum()
+    idx = lttb_indices(x, y, n_out)
+    assert len(idx) == n_out
+    assert idx[0] == 0 and idx[-1] == n - 1
+    # 구간마다 하나씩이므로 순서대로, 중복 없이
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_short_input_is_unchanged():
+    x = np.arange(5.0)
+    assert list(lttb_indices(x, x * 2, 10)) == [0, 1, 2, 3, 4]
+
+
+def test_lttb_keeps_spike():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[437] = 50.0
+    assert 437 in lttb_indices(x, y, 20)
+
+
+def test_many_columns_match_single():
+    rng = np.random.default_rng(2)
+    x = np.arange(5000.0)
+    ys = rng.normal(size=(5000, 3)).cumsum(axis=0)
+    many = lttb_indices_many(x, ys, 300)
+    for j in range(3):
+        assert np.array_equal(many[:, j], lttb_indices(x, ys[:, j], 300))
+
+
+def test_downsample_drops_missing_and_reports_count():
+    x = pd.Series(pd.date_range("2025-01-01", periods=3000, freq="min"))
+    y = pd.Series(np.sin(np.arange(3000) / 50.0))
+    y[::3] = np.nan
+    x_kept, y_kept, n = downsample(x, y, 200)
+    assert n == 2000
+    assert len(x_kept) == len(y_kept) == 200
+    assert not np.isnan(y_kept).any()
+    assert x_kept[0] == x[1] and x_kept[-1] == x[2999]
+
+    # 빈칸이 다른 열끼리도 열마다 따로 줄인다
+    full = pd.Series(np.cos(np.arange(3000) / 50.0))
+    (_, y1, n1), (_, y2, n2) = downsample_many(x, [y, full], 200)
+    assert (n1, n2) == (2000, 3000)
+    assert len(y1) == len(y2) == 200
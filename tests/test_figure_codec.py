@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from figure_codec import MAX_TICK_LABELS, XEncoder
+
+
+def test_category_codes_and_ticks():
+    x = np.array(["1반", "2반", "3반"] * 4, dtype=object)
+    encode = XEncoder(x, enabled=True)
+    assert encode.kind == "category"
+    assert encode(x).tolist() == [0, 1, 2] * 4
+    assert encode.axis["ticktext"] == ["1반", "2반", "3반"]
+    # 다운샘플링된 일부 x 도 같은 코드로
+    assert encode(x[[2, 4]]).tolist() == [2, 1]
+
+
+def test_many_categories_get_evenly_spaced_ticks():
+    labels = [f"학교{i:03d}" for i in range(400)]
+    x = np.array(labels * 2, dtype=object)
+    encode = XEncoder(x, enabled=True)
+    assert encode.kind == "category"
+    ticks = encode.axis["tickvals"]
+    assert len(ticks) <= MAX_TICK_LABELS
+    assert ticks[0] == 0 and np.all(np.diff(ticks) == ticks[1])
+    assert encode.axis["ticktext"] == [labels[i] for i in ticks]
+
+
+def test_dates_become_epoch_milliseconds():
+    x = pd.date_range("2025-06-01", periods=3, freq="D").to_numpy().copy()
+    x[1] = np.datetime64("NaT")
+    out = XEncoder(x, enabled=True)(x)
+    assert out[0] == pd.Timestamp("2025-06-01").value / 1e6
+    assert np.isnan(out[1])
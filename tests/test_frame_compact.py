@@ -0,0 +1,52 @@
+import pandas as pd
+
+from frame_compact import _parse_dates, compact
+
+
+def test_parse_korean_dates():
+    series = pd.Series(["2015년 12월 1일", "2015.12.02", None, "2025.06.09 오후 1:00"])
+    dates = _parse_dates(series)
+    assert dates is not None
+    assert dates.isna().tolist() == [False, False, True, False]
+    assert dates[3] == pd.Timestamp("2025-06-09 13:00")
+
+
+def test_trailing_invalid_values_keep_strings():
+    # 앞 DATE_SAMPLE 개는 날짜라도 뒤에 날짜가 아닌 값이 있으면 잃지 않는다
+    values = [f"2020-01-{day % 28 + 1:02d}" for day in range(300)] + ["미측정"] * 20
+    series = pd.Series(values)
+    assert _parse_dates(series) is None
+    out = compact(pd.DataFrame({"측정일": series}))
+    assert (out["측정일"].astype(str) == "미측정").sum() == 20
+
+
+def test_mixed_invalid_values_keep_strings():
+    series = pd.Series(["2020-01-01", "2020-01-02", "2020-13-45"] * 10)
+    assert _parse_dates(series) is None
+
+
+def test_compact_keeps_values():
+    df = pd.DataFrame({"학년": [1, 2, 3] * 10, "키": [150.5, 160.25, 170.0] * 10, "지역": ["서울", "부산", "대구"] * 10})
+    out = compact(df)
+    assert str(out["학년"].dtype) == "int8"
+    assert str(out["키"].dtype) == "float32"
+    assert str(out["지역"].dtype) == "category"
+    pd.testing.assert_frame_equal(out.astype(df.dtypes.to_dict()), df)
+
+
+def test_short_numbers_are_not_dates():
+    # "10-1" 을 1년 10월 1일로 읽으면 datetime64[ns] 로 바꿀 때 OutOfBoundsDatetime 이 난다
+    df = pd.DataFrame({"번호": ["10-1", "01-02", "11-3", "12-12"] * 5})
+    assert _parse_dates(df["번호"]) is None
+    out = compact(df)
+    assert out["번호"].astype(str).tolist() == df["번호"].tolist()
+
+
+def test_out_of_range_years_keep_strings():
+    series = pd.Series(["1000-01-01", "1000-01-02"] * 5)
+    assert _parse_dates(series) is None
+
+
+def test_two_digit_years_with_nyeon():
+    dates = _parse_dates(pd.Series(["2015년 12월 1일", "15년 3월 2일"]))
+    assert dates.tolist() == [pd.Timestamp("2015-12-01"), pd.Timestamp("2015-03-02")]
@@ -0,0 +1,42 @@
+import tracemalloc
+
+import instrument
+
+
+def test_ended_session_stops_memory_tracing(monkeypatch):
+    monkeypatch.delenv("GRAPH_TRACE_MEMORY", raising=False)
+    alive = {"a"}
+    monkeypatch.setattr(instrument, "ended_sessions", lambda ids: [sid for sid in ids if sid not in alive])
+    monkeypatch.setattr(instrument._sweep, "interval", 0)
+    try:
+        instrument.trace_memory("a", True)
+        instrument.record("parse_excel", 0.01, session_id="a")
+        assert tracemalloc.is_tracing()
+        assert "parse_excel" in instrument.snapshot("a")
+
+        # 토글을 켠 채로 세션이 끝나면 다음 기록 때 정리된다
+        alive.clear()
+        instrument.record("parse_excel", 0.01)
+        assert not tracemalloc.is_tracing()
+        assert instrument.snapshot("a") == {}
+    finally:
+        instrument.trace_memory("a", False)
+        instrument.clear()
+
+
+def test_stage_records_nested_peaks():
+    instrument.clear()
+    tracemalloc.start()
+    try:
+        with instrument.stage("outer"):
+            with instrument.stage("inner"):
+                block = bytearray(2_000_000)
+            del block
+    finally:
+        tracemalloc.stop()
+    stats = instrument.snapshot()
+    assert stats["outer"]["count"] == stats["inner"]["count"] == 1
+    # 안쪽에서 잡은 할당은 바깥 단계의 최대값에도 들어간다
+    assert stats["inner"]["peak_bytes"] >= 2_000_000
+    assert stats["outer"]["peak_bytes"] >= stats["inner"]["peak_bytes"]
+    instrument.clear()
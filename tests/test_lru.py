@@ -0,0 +1,76 @@
+import threading
+
+import pandas as pd
+
+from data_cache import FrameCache, frame_nbytes
+from lru import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1          # a 를 최근으로
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_sizeof_and_oversized_items():
+    cache = LRUCache(10, sizeof=len)
+    cache.put("a", "x" * 6)
+    cache.put("b", "x" * 4)
+    assert cache.total_size == 10
+    cache.put("c", "x" * 3)
+    assert "a" not in cache and cache.total_size == 7
+    # 상한보다 큰 것은 넣지 않고 그대로 돌려준다
+    assert cache.put("big", "x" * 11) == "x" * 11
+    assert "big" not in cache and cache.total_size == 7
+
+
+def test_replace_keeps_size():
+    cache = LRUCache(10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("a", "xx")
+    assert cache.total_size == 2 and len(cache) == 1
+    assert cache.pop("a") == "xx" and cache.total_size == 0
+
+
+def test_get_or_compute():
+    cache = LRUCache(4)
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_compute("k", lambda: calls.append(1) or 42) == 42
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_concurrent_puts_stay_bounded():
+    cache = LRUCache(50)
+
+    def work(offset):
+        for i in range(500):
+            cache.put((offset, i), i)
+            cache.get((offset, i - 1))
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
+
+
+def test_frame_cache_keeps_pinned_datasets():
+    df = pd.DataFrame({"a": range(100)})
+    cache = FrameCache(frame_nbytes(df) * 2)
+    cache.put(("pinned", "opts"), df)
+    cache.pin("pinned", "session-1")
+    cache.put(("b", "opts"), df.copy())
+    cache.put(("c", "opts"), df.copy())
+    assert ("pinned", "opts") in cache
+    assert ("b", "opts") not in cache
+    cache.unpin("pinned", "session-1")
+    cache.put(("d", "opts"), df.copy())
+    assert ("pinned", "opts") not in cache
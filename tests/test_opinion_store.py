@@ -0,0 +1,80 @@
+import multiprocessing
+import threading
+
+import pandas as pd
+import pytest
+
+import opinion_store
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "opinions.db")
+    yield path
+    opinion_store.close()
+
+
+def _write_legacy(tmp_path, n=3):
+    pd.DataFrame({
+        "작성시간": ["2024-03-01 09:00:00"] * n,
+        "이름": [f"학생{i}" for i in range(n)],
+        "의견": [f"의견 {i}" for i in range(n)],
+    }).to_csv(tmp_path / opinion_store.LEGACY_CSV, index=False)
+
+
+def test_pages_walk_every_opinion_once_with_equal_timestamps(db, monkeypatch):
+    # 같은 초에 여러 개가 등록돼도 id 로 페이지를 나누므로 빠지거나 겹치는 글이 없다
+    monkeypatch.setattr(opinion_store.time, "strftime", lambda fmt: "2025-06-01 12:00:00")
+    ids = [opinion_store.add("학생", f"의견 {i}", path=db) for i in range(25)]
+    opinion_store.delete(ids[7], path=db)
+
+    seen, cursor, has_older = [], None, True
+    while has_older:
+        rows, has_older = opinion_store.page(before_id=cursor, limit=10, path=db)
+        seen += [row["id"] for row in rows]
+        cursor = rows[-1]["id"]
+    assert seen == sorted(set(ids) - {ids[7]}, reverse=True)
+
+
+def test_csv_migration_runs_once(db, tmp_path):
+    _write_legacy(tmp_path)
+    assert opinion_store.count(path=db) == 3
+    assert (tmp_path / (opinion_store.LEGACY_CSV + ".migrated")).exists()
+
+    # 다른 프로세스가 CSV 를 다시 놓고 새로 열어도 이미 데이터가 있으면 다시 넣지 않는다
+    opinion_store.close()
+    _write_legacy(tmp_path)
+    rows, _ = opinion_store.page(path=db)
+    assert opinion_store.count(path=db) == 3
+    assert [row["name"] for row in rows] == ["학생2", "학생1", "학생0"]
+
+
+def _add_many(path, n):
+    for i in range(n):
+        opinion_store.add("학생", f"의견 {i}", path=path)
+    opinion_store.close()
+
+
+def test_concurrent_processes_lose_no_opinions(db):
+    # 프로세스마다 연결이 따로라 BEGIN IMMEDIATE 의 쓰기 잠금으로만 순서가 정해진다
+    opinion_store.count(path=db)
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_add_many, args=(db, 30)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(timeout=60)
+    assert [proc.exitcode for proc in procs] == [0] * 4
+    assert opinion_store.count(path=db) == 120
+
+
+def test_concurrent_threads_share_one_connection(db):
+    threads = [threading.Thread(target=lambda: [opinion_store.add("학생", "의견", path=db) for _ in range(30)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    rows, _ = opinion_store.page(limit=200, path=db)
+    assert len(rows) == 120
+    assert len({row["id"] for row in rows}) == 120
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import linregress
+
+import stats_service
+from stats_service import append_rows, regress, regression_table, sufficient_stats
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    x = rng.normal(160, 10, 500)
+    df = pd.DataFrame({
+        "키": x,
+        "몸무게": 0.8 * x - 80 + rng.normal(0, 5, 500),
+        "나이": rng.integers(7, 19, 500).astype("float64"),
+    })
+    df.loc[::7, "몸무게"] = np.nan
+    df.loc[::11, "키"] = np.nan
+    return df
+
+
+def _expected(df, x_col, y_col):
+    both = df[[x_col, y_col]].dropna()
+    return linregress(both[x_col], both[y_col]), len(both)
+
+
+def test_regression_table_matches_linregress(frame):
+    x = frame["키"].to_numpy()
+    Y = frame[["몸무게", "나이"]].to_numpy()
+    table = regression_table(sufficient_stats(x, Y), ["몸무게", "나이"])
+    for col in ("몸무게", "나이"):
+        fit, n = _expected(frame, "키", col)
+        row = table.loc[col]
+        assert row["n"] == n
+        assert row["slope"] == pytest.approx(fit.slope, rel=1e-9)
+        assert row["intercept"] == pytest.approx(fit.intercept, rel=1e-9)
+        assert row["r"] == pytest.approx(fit.rvalue, rel=1e-9)
+        assert row["p"] == pytest.approx(fit.pvalue, rel=1e-6, abs=1e-300)
+        assert row["stderr"] == pytest.approx(fit.stderr, rel=1e-9)
+
+
+def test_append_rows_matches_full_fit(frame):
+    stats_service.clear_cache()
+    head, tail = frame.iloc[:300], frame.iloc[300:]
+    regress(head, "키", ["몸무게"], data_key="head")
+    table = append_rows("head", "all", tail, "키", ["몸무게"])
+    fit, _ = _expected(frame, "키", "몸무게")
+    assert table.loc["몸무게", "slope"] == pytest.approx(fit.slope, rel=1e-9)
+    assert table.loc["몸무게", "r"] == pytest.approx(fit.rvalue, rel=1e-9)
+    stats_service.clear_cache()
+
+
+def test_degenerate_columns_give_nan():
+    x = np.array([1.0, 1.0, 1.0])
+    table = regression_table(sufficient_stats(x, np.array([[1.0], [2.0], [3.0]])), ["y"])
+    assert np.isnan(table.loc["y", "slope"])
+
+
+def test_datetime_x_is_unit_independent():
+    x = pd.Series(pd.date_range("2025-06-01", periods=30, freq="D"))
+    x[4] = pd.NaT
+    y = np.arange(30, dtype="float64")
+    tables = [regress(pd.DataFrame({"날짜": x.astype(f"datetime64[{unit}]"), "값": y}), "날짜", ["값"])
+              for unit in ("ns", "us", "s")]
+    for table in tables[1:]:
+        pd.testing.assert_frame_equal(table, tables[0])
+    # 빈 날짜(NaT) 행은 빼고 맞춘다
+    assert tables[0].loc["값", "n"] == 29
+    assert tables[0].loc["값", "x_min"] == pd.Timestamp("2025-06-01").value / 1000
+
+
+@pytest.mark.parametrize("y", [[3.0, 5.0], [5.0, 3.0]])
+def test_two_points_match_linregress(y):
+    fit = linregress([1.0, 2.0], y)
+    row = regression_table(sufficient_stats(np.array([1.0, 2.0]), np.array(y)[:, None]), ["y"]).loc["y"]
+    assert row["slope"] == pytest.approx(fit.slope)
+    assert row["intercept"] == pytest.approx(fit.intercept)
+    assert row["r"] == pytest.approx(fit.rvalue)
+    assert (row["p"], row["stderr"]) == (fit.pvalue, fit.stderr) == (0.0, 0.0)
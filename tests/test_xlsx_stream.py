@@ -0,0 +1,53 @@
+import datetime
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from xlsx_stream import read_columns
+
+
+@pytest.fixture
+def workbook_bytes():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["학년", "키(cm)", "메모"])
+    for i in range(30):
+        # 키는 뒤쪽 5행이 비어 있고, 메모는 마지막 행에만 있다
+        ws.append([i % 6 + 1, 150.5 + i if i < 25 else None, "재측정" if i == 29 else None])
+    # 서식만 있는 빈 행 (read_only 로 읽으면 값이 전부 None 인 행이 나온다)
+    ws.cell(row=40, column=1).number_format = "0.0"
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_same_length_for_any_projection(workbook_bytes):
+    expected = pd.read_excel(io.BytesIO(workbook_bytes))
+    assert len(expected) == 30
+    for columns in (["학년"], ["키(cm)"], ["메모"], ["키(cm)", "학년"]):
+        df = read_columns(workbook_bytes, columns)
+        assert list(df.columns) == columns
+        assert len(df) == len(expected)
+
+
+def test_values_match_read_excel(workbook_bytes):
+    expected = pd.read_excel(io.BytesIO(workbook_bytes))
+    df = read_columns(workbook_bytes, ["학년", "키(cm)"])
+    assert df["학년"].dtype == "int64"
+    pd.testing.assert_series_equal(df["학년"], expected["학년"])
+    pd.testing.assert_series_equal(df["키(cm)"], expected["키(cm)"])
+
+
+def test_datetime_unit_matches_read_excel():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["일시", "기온"])
+    for i in range(10):
+        ws.append([datetime.datetime(2025, 6, 1, i) if i != 3 else None, 20.5 + i])
+    buf = io.BytesIO()
+    wb.save(buf)
+    expected = pd.read_excel(io.BytesIO(buf.getvalue()))
+    df = read_columns(buf.getvalue(), ["일시"], kinds={"일시": "datetime"})
+    pd.testing.assert_series_equal(df["일시"], expected["일시"])
@@ -0,0 +1,271 @@
+import datetime as dt
+import io
+import posixpath
+import re
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+# openpyxl read_only 모드로 필요한 열만 읽어 오는 엑셀 리더
+# 1단계: 머리행 + 앞부분 몇 줄만 읽어서 열 이름/타입 미리보기
+# 2단계: 사용자가 고른 열만 타입별 NumPy 버퍼에 채워 넣기
+# 시트 목록/크기는 셀을 읽지 않고 xlsx(zip) 안의 workbook.xml 과 각 시트의 <dimension> 만 본다.
+
+PREVIEW_ROWS = 200
+CHUNK_ROWS = 65536
+# 날짜 열은 pd.read_excel 과 같은 단위로 (pandas 3 은 us, 그 전은 ns).
+# 열만 읽은 것과 시트 전체를 읽은 것이 같은 캐시 키를 같이 쓰기 때문이다.
+DATETIME_DTYPE = pd.Series([dt.datetime(2000, 1, 1)]).dtype
+
+
+def _open_sheet(data, sheet_name=0):
+    from openpyxl import load_workbook  # 셀을 읽을 때만 불러온다 (시트 목록은 openpyxl 없이)
+
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    if isinstance(sheet_name, int):
+        ws = wb.worksheets[sheet_name]
+    else:
+        ws = wb[sheet_name]
+    return wb, ws
+
+
+_NS = {
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_DIMENSION = re.compile(rb'<(?:\w+:)?dimension\s+ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"')
+_DIMENSION_SCAN_BYTES = 64 * 1024
+_ROW_NUMBER = re.compile(rb'<(?:\w+:)?row\b[^>]*?\br="(\d+)"')
+_FIRST_ROW = re.compile(rb"<(?:\w+:)?row\b.*?</(?:\w+:)?row>", re.S)
+_CELL_REF = re.compile(rb'<(?:\w+:)?c\b[^>]*?\br="([A-Z]+)\d+"')
+
+
+def _column_number(letters):
+    number = 0
+    for ch in letters:
+        number = number * 26 + ord(ch) - ord("A") + 1
+    return number
+
+
+def _dimension(zf, member):
+    # <dimension> 은 시트 XML 맨 앞쪽에 있으므로 앞부분만 풀어서 찾는다
+    with zf.open(member) as f:
+        head = f.read(_DIMENSION_SCAN_BYTES)
+        match = _DIMENSION.search(head)
+        if match is None:
+            # <dimension> 이 없는 파일(구글 시트 등)은 <row r="..."> 와 첫 행의 셀 주소만 훑어본다
+            return _scan_dimension(f, head)
+    col1, row1, col2, row2 = match.groups()
+    if col2 is None:
+        col2, row2 = col1, row1
+    return int(row2) - int(row1) + 1, _column_number(col2.decode()) - _column_number(col1.decode()) + 1
+
+
+def _scan_dimension(f, head):
+    first_row = _FIRST_ROW.search(head)
+    cols = None
+    if first_row is not None:
+        cells = _CELL_REF.findall(first_row.group(0))
+        cols = max(_column_number(ref.decode()) for ref in cells) if cells else None
+    last = None
+    chunk = head
+    while chunk:
+        rows = _ROW_NUMBER.findall(chunk)
+        if rows:
+            last = int(rows[-1])
+        # 태그가 조각 경계에 걸릴 수 있으므로 끝부분을 조금 남겨서 이어 붙인다
+        tail = chunk[-64:]
+        more = f.read(1024 * 1024)
+        chunk = tail + more if more else b""
+    return last, cols
+
+
+def sheet_info(data):
+    """시트마다 (이름, 행 수, 열 수). 행 수는 머리행 포함, 알 수 없으면 None.
+
+    <dimension> 은 서식만 있는 빈 행/열까지 포함하므로 실제 데이터보다 클 수 있다 (최댓값으로 볼 것).
+
+    셀은 읽지 않는다. xlsx 가 아니면 (예: xls) 이름만 pandas 로 읽는다.
+    """
+    try:
+        zf = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        return [(name, None, None) for name in pd.ExcelFile(io.BytesIO(data)).sheet_names]
+    with zf:
+        workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+        rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels.findall("rel:Relationship", _NS)}
+        info = []
+        for sheet in workbook.findall("main:sheets/main:sheet", _NS):
+            target = targets.get(sheet.get(_REL_ID), "")
+            member = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            try:
+                rows, cols = _dimension(zf, member)
+            except KeyError:
+                rows, cols = None, None
+            info.append((sheet.get("name"), rows, cols))
+    return info
+
+
+def _header_names(raw_header):
+    # pd.read_excel 과 같은 규칙으로 열 이름을 만든다 (빈칸 -> Unnamed: i, 중복 -> 이름.1)
+    names = []
+    seen = {}
+    for i, value in enumerate(raw_header):
+        name = f"Unnamed: {i}" if value is None else value
+        base = name
+        while name in seen:
+            seen[base] += 1
+            name = f"{base}.{seen[base]}"
+        seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _kind(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "object"
+    if isinstance(value, (int, float, np.number)):
+        return "number"
+    if isinstance(value, (dt.datetime, dt.date)):
+        return "datetime"
+    return "object"
+
+
+def _merge_kind(current, new):
+    if new is None or current == new:
+        return current
+    if current is None:
+        return new
+    return "object"
+
+
+def read_preview(data, sheet_name=0, n_rows=PREVIEW_ROWS):
+    """머리행과 앞부분 n_rows 줄만 읽어서 DataFrame으로 돌려준다 (열 목록/타입 확인용)."""
+    wb, ws = _open_sheet(data, sheet_name)
+    try:
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        names = _header_names(header)
+        width = len(names)
+        sample = []
+        for row in rows:
+            sample.append(tuple(row[:width]) + (None,) * (width - len(row)))
+            if len(sample) >= n_rows:
+                break
+    finally:
+        wb.close()
+    return pd.DataFrame.from_records(sample, columns=names) if sample else pd.DataFrame(columns=names)
+
+
+class _ColumnBuffer:
+    """한 열의 값을 타입에 맞는 NumPy 배열 조각(chunk)에 쌓는다."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.chunks = []
+        self._new_chunk()
+
+    def _new_chunk(self):
+        if self.kind == "number":
+            self.buf = np.full(CHUNK_ROWS, np.nan, dtype="float64")
+        elif self.kind == "datetime":
+            self.buf = np.full(CHUNK_ROWS, np.datetime64("NaT"), dtype=DATETIME_DTYPE)
+        else:
+            self.buf = np.empty(CHUNK_ROWS, dtype=object)
+        self.pos = 0
+
+    def _to_object(self):
+        # 타입이 섞여 있으면 지금까지 모은 값을 object 배열로 바꾼다
+        values = self.finish()
+        self.kind = "object"
+        self.chunks = [values.astype(object)]
+        self._new_chunk()
+
+    def append(self, value):
+        if value is not None and self.kind != "object" and _kind(value) != self.kind:
+            self._to_object()
+        if self.pos == CHUNK_ROWS:
+            self.chunks.append(self.buf)
+            self._new_chunk()
+        if value is not None:
+            self.buf[self.pos] = value
+        self.pos += 1
+
+    def __len__(self):
+        return CHUNK_ROWS * len(self.chunks) + self.pos
+
+    def finish(self):
+        parts = self.chunks + [self.buf[:self.pos]]
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+
+def read_columns(data, columns, sheet_name=0, kinds=None):
+    """선택한 열만 한 줄씩 읽어서 DataFrame을 만든다.
+
+    kinds 는 {열 이름: "number" | "datetime" | "object"} 로 미리보기에서 얻은 타입 힌트.
+    힌트가 없는 열은 첫 값을 보고 정한다.
+    """
+    wb, ws = _open_sheet(data, sheet_name)
+    try:
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame(columns=list(columns))
+        names = _header_names(header)
+        positions = [names.index(col) for col in columns]
+        # 맨 아래의 빈 행은 고른 열이 아니라 시트 전체(모든 열)를 보고 자른다.
+        # 그래야 어떤 열을 골라 읽어도 행 수가 pd.read_excel 과 같아서 열 단위 캐시를 그대로 붙일 수 있다.
+        rows = ws.iter_rows(min_row=2, values_only=True)
+        kinds = kinds or {}
+        buffers = [_ColumnBuffer(kinds.get(col) or "number") for col in columns]
+        decided = [col in kinds for col in columns]
+        n_rows = 0
+        for i, row in enumerate(rows, 1):
+            width = len(row)
+            if any(value is not None for value in row):
+                n_rows = i
+            for j, off in enumerate(positions):
+                value = row[off] if off < width else None
+                if not decided[j] and value is not None:
+                    kind = _kind(value)
+                    if kind != buffers[j].kind:
+                        # 앞쪽은 전부 빈칸이었으므로 새 타입 버퍼에 빈칸을 다시 채운다
+                        blanks = len(buffers[j])
+                        buffers[j] = _ColumnBuffer(kind)
+                        for _ in range(blanks):
+                            buffers[j].append(None)
+                    decided[j] = True
+                buffers[j].append(value)
+    finally:
+        wb.close()
+
+    out = {}
+    for col, buffer in zip(columns, buffers):
+        values = buffer.finish()[:n_rows]
+        # 빈칸 없는 정수 열은 int64 로
+        if buffer.kind == "number" and values.size and not np.isnan(values).any() \
+                and np.array_equal(values, np.round(values)):
+            values = values.astype("int64")
+        out[col] = values
+    return pd.DataFrame(out, columns=list(columns))
+
+
+def preview_kinds(preview):
+    """read_preview 결과에서 열별 타입 힌트를 뽑는다."""
+    kinds = {}
+    for col in preview.columns:
+        kind = None
+        for value in preview[col]:
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            kind = _merge_kind(kind, _kind(value))
+        kinds[col] = kind or "number"
+    return kinds